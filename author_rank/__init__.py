@@ -10,20 +10,62 @@ See https://github.com/adidier17/AuthorRank.
 """
 
 import sys
-if sys.version_info[:2] < (3, 5):
-    m = "Python 3.5 or later is required for AuthorRank (%d.%d detected)."
+if sys.version_info[:2] < (3, 7):
+    m = "Python 3.7 or later is required for AuthorRank (%d.%d detected)."
     raise ImportError(m % sys.version_info[:2])
 del sys
 
 __author__ = "Valentino Constantinou, Annie Didier"
 __version__ = "0.1.4"
 
-import author_rank.graph
-from author_rank.graph import *
+# submodules, and with them NumPy, SciPy and NetworkX, are only imported when one of their
+# names is first accessed, so that importing the package itself costs almost nothing
+_SUBMODULES = ("authors", "batch", "cli", "graph", "index", "profiling", "reader", "score", "service", "storage",
+               "utils", "window")
+_NAMES = {
+    "AuthorTable": "authors",
+    "HashedAuthorTable": "authors",
+    "Profile": "profiling",
+    "profiled": "profiling",
+    "ENGINES": "graph",
+    "WRITE_BLOCK": "graph",
+    "LARGE_DOCUMENT_POLICIES": "graph",
+    "CHUNK_PAIRS": "graph",
+    "PERSONALIZATION_BLOCK": "graph",
+    "Graph": "graph",
+    "adjacency_matrix": "score",
+    "pagerank": "score",
+    "pagerank_many": "score",
+    "block_pagerank": "score",
+    "warm_start": "score",
+    "top_n": "score",
+    "top_authors": "score",
+    "select_top": "score",
+    "AuthorIndex": "index",
+    "NameIndex": "index",
+    "batch_top_authors": "batch",
+    "normalize": "utils",
+    "normalize_name": "utils",
+    "emit_progress_bar": "utils",
+    "ProgressReporter": "utils",
+    "check_author_count": "utils",
+    "read_documents": "reader",
+    "RankingService": "service",
+    "sliding_windows": "window",
+}
+__all__ = list(_NAMES)
 
-import author_rank.score
-from author_rank.score import *
 
-import author_rank.utils
-from author_rank.utils import *
+def __getattr__(name):
+    import importlib
+    if name in _SUBMODULES:
+        return importlib.import_module("author_rank." + name)
+    if name in _NAMES:
+        value = getattr(importlib.import_module("author_rank." + _NAMES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES) | set(_NAMES))
@@ -0,0 +1,6 @@
+# imports
+from author_rank.cli import main
+import sys
+
+
+sys.exit(main())
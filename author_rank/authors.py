@@ -0,0 +1,602 @@
+# imports
+import hashlib
+import json
+import numpy as np
+from typing import Hashable, Iterable, List, Tuple
+
+
+class AuthorTable:
+    """
+    An interning table that maps author UIDs to contiguous integer ids, in
+    order of first appearance, and back. Each distinct UID is stored once, so
+    that the edges of an AuthorRank graph can be kept in integer arrays and
+    translated back to UIDs only when results are returned.
+    """
+
+    dtype = np.int32
+
+    def __init__(self):
+        self._ids = dict()
+        self._uids = list()
+        # UIDs loaded from a saved graph, decoded on first use
+        self._offsets = None
+        self._encoded = None
+
+    def __len__(self) -> int:
+        if self._encoded is not None:
+            return len(self._offsets) - 1
+        return len(self._uids)
+
+    def __contains__(self, uid: Hashable) -> bool:
+        self._decode()
+        return uid in self._ids
+
+    def __iter__(self):
+        self._decode()
+        return iter(self._uids)
+
+    def __getitem__(self, author_id: int) -> Hashable:
+        """
+        Returns the UID of an author id.
+        :param author_id: an integer author id.
+        :return: the author UID.
+        """
+
+        if self._encoded is not None:
+            return self._decode_one(author_id)
+        return self._uids[author_id]
+
+    def get(self, uid: Hashable, default: int = None) -> int:
+        """
+        Returns the id of an author UID without adding it to the table.
+        :param uid: an author UID.
+        :param default: the value returned if the UID is not in the table.
+        :return: the integer author id, or the default.
+        """
+
+        self._decode()
+        return self._ids.get(uid, default)
+
+    def intern(self, uid: Hashable) -> int:
+        """
+        Returns the id of an author UID, adding it to the table if it is new.
+        :param uid: an author UID.
+        :return: the integer author id.
+        """
+
+        if self._encoded is not None:
+            self._decode()
+        author_id = self._ids.get(uid)
+        if author_id is None:
+            author_id = len(self._uids)
+            if author_id > np.iinfo(self.dtype).max:
+                raise OverflowError("AuthorTable cannot hold more than %d authors." % np.iinfo(self.dtype).max)
+            self._ids[uid] = author_id
+            self._uids.append(uid)
+
+        return author_id
+
+    def intern_many(self, uids: Iterable[Hashable]) -> np.ndarray:
+        """
+        Returns the ids of several author UIDs, adding new UIDs to the table.
+        :param uids: an iterable of author UIDs.
+        :return: an integer array of author ids.
+        """
+
+        self._decode()
+        intern = self.intern
+        return np.asarray([intern(uid) for uid in uids], dtype=self.dtype)
+
+    def intern_documents(self, doc_authors_tuples: List[list]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the ids of the authors of every document, adding new UIDs to the
+        table.
+        :param doc_authors_tuples: a list of lists - a list of author UIDs by document.
+        :return: a tuple which contains a flat array of author ids, document by
+        document, and an array with the number of authors in each document.
+        """
+
+        self._decode()
+        intern = self.intern
+        author_ids = [intern(uid) for doc in doc_authors_tuples for uid in doc]
+        lengths = np.fromiter((len(doc) for doc in doc_authors_tuples), dtype=np.int64, count=len(doc_authors_tuples))
+
+        return np.asarray(author_ids, dtype=self.dtype), lengths
+
+    def ids(self, uids: Iterable[Hashable]) -> np.ndarray:
+        """
+        Returns the ids of several author UIDs that are in the table.
+        :param uids: an iterable of author UIDs.
+        :return: an integer array of author ids.
+        """
+
+        self._decode()
+        return np.asarray([self._ids[uid] for uid in uids], dtype=self.dtype)
+
+    def uids(self, author_ids: Iterable[int]) -> List[Hashable]:
+        """
+        Returns the UIDs of several author ids.
+        :param author_ids: an iterable of integer author ids.
+        :return: a list of author UIDs.
+        """
+
+        if self._encoded is not None:
+            return [self._decode_one(i) for i in author_ids]
+        uids = self._uids
+        return [uids[i] for i in author_ids]
+
+    def subset(self, author_ids: Iterable[int]) -> 'AuthorTable':
+        """
+        Creates a table of some of the authors of this table, such as those
+        that remain after documents are removed from a graph.
+        :param author_ids: an iterable of integer author ids, in the order of
+        their new ids.
+        :return: an AuthorTable.
+        """
+
+        table = type(self)()
+        table._uids = self.uids(author_ids)
+        table._ids = {uid: author_id for author_id, uid in enumerate(table._uids)}
+
+        return table
+
+    def encode(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Encodes the UIDs of the table, in id order, as a string table: the
+        UTF-8 JSON encoding of every UID concatenated into a byte array, and
+        the offsets at which each UID starts and ends.
+        :return: a tuple which contains an array of n + 1 offsets and a byte array.
+        """
+
+        if self._encoded is not None:
+            return self._offsets, self._encoded
+
+        encoded = [json.dumps(list(uid)).encode("utf-8") for uid in self._uids]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+
+        return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    @classmethod
+    def from_encoded(cls, offsets: np.ndarray, encoded: np.ndarray) -> 'AuthorTable':
+        """
+        Creates a table from a string table created by encode. UIDs are decoded
+        one at a time as they are looked up by id, and all at once only when a
+        UID is looked up or added, so that the arrays may be memory-mapped.
+        :param offsets: an array of n + 1 offsets.
+        :param encoded: a byte array.
+        :return: an AuthorTable.
+        """
+
+        table = cls()
+        table._offsets = offsets
+        table._encoded = encoded
+
+        return table
+
+    def _decode_one(self, author_id: int) -> Hashable:
+        """
+        Decodes the UID of an author id from the string table.
+        :param author_id: an integer author id.
+        :return: the author UID.
+        """
+
+        n_authors = len(self)
+        if author_id < 0:
+            author_id += n_authors
+        if not 0 <= author_id < n_authors:
+            raise IndexError("author id out of range")
+        start, end = self._offsets[author_id], self._offsets[author_id + 1]
+        return tuple(json.loads(self._encoded[start:end].tobytes().decode("utf-8")))
+
+    def _decode(self) -> None:
+        """
+        Decodes every UID in the string table, if any, into the table.
+        :return: None
+        """
+
+        if self._encoded is None:
+            return
+
+        offsets, encoded = self._offsets.tolist(), self._encoded.tobytes()
+        self._uids = [tuple(json.loads(encoded[offsets[i]:offsets[i + 1]])) for i in range(len(offsets) - 1)]
+        self._ids = {uid: i for i, uid in enumerate(self._uids)}
+        self._offsets = None
+        self._encoded = None
+
+
+def _encode_uid(uid: Hashable) -> bytes:
+    """
+    Encodes an author UID as in the string table of AuthorTable.encode.
+    :param uid: an author UID.
+    :return: the UTF-8 JSON encoding of the UID.
+    """
+
+    return json.dumps(list(uid) if isinstance(uid, tuple) else uid).encode("utf-8")
+
+
+def _uid_key(encoded: bytes) -> int:
+    """
+    Hashes an encoded author UID to a 64-bit key that is the same in every
+    process and Python session, unlike the built-in hash of strings.
+    :param encoded: the encoded UID.
+    :return: an integer key between 0 and 2 ** 64 - 1.
+    """
+
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little")
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    """
+    Returns a writable copy of an array with room for at least size elements,
+    at least doubling its capacity so that appending is amortized.
+    :param array: a one-dimensional array, which may be a read-only memory map.
+    :param size: the number of elements needed.
+    :return: a new array whose first elements are those of the array.
+    """
+
+    grown = np.empty(max(size, 2 * len(array), 64), dtype=array.dtype)
+    grown[:len(array)] = array
+
+    return grown
+
+
+class HashedAuthorTable(AuthorTable):
+    """
+    An author table for very large author pools that does not hold a Python
+    tuple or dictionary entry per author. Each UID is stored once, in the
+    string table format of encode, and hashed to a stable 64-bit key. Keys
+    are found in an open-addressing hash table of integer arrays, so that a
+    distinct author takes tens of bytes rather than hundreds. Two different
+    UIDs that hash to the same key are told apart by comparing their
+    encodings, and the later one is kept in a small overflow dictionary.
+    UIDs are decoded as they are returned, and looking up or adding UIDs one
+    at a time is slower than with an AuthorTable, so UIDs are best looked up
+    and added in batches with ids and intern_many.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._size = 0
+        self._n_bytes = 0
+        self._starts = np.zeros(1, dtype=np.int64)
+        self._bytes = np.zeros(0, dtype=np.uint8)
+        self._hashes = np.zeros(0, dtype=np.uint64)
+        # the id of the author in each slot of the hash table, or -1; built on first use for loaded tables
+        self._slots = np.full(64, -1, dtype=self.dtype)
+        # the ids of UIDs whose key is also that of an earlier, different UID, by encoded UID
+        self._overflow = dict()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, uid: Hashable) -> bool:
+        return self.get(uid) is not None
+
+    def __iter__(self):
+        encoded, offsets = self._bytes[:self._n_bytes].tobytes(), self._starts[:self._size + 1].tolist()
+        for i in range(self._size):
+            yield tuple(json.loads(encoded[offsets[i]:offsets[i + 1]]))
+
+    def __getitem__(self, author_id: int) -> Hashable:
+        """
+        Returns the UID of an author id.
+        :param author_id: an integer author id.
+        :return: the author UID.
+        """
+
+        return self._decode_one(author_id)
+
+    def get(self, uid: Hashable, default: int = None) -> int:
+        """
+        Returns the id of an author UID without adding it to the table.
+        :param uid: an author UID.
+        :param default: the value returned if the UID is not in the table.
+        :return: the integer author id, or the default.
+        """
+
+        try:
+            author_id = int(self._lookup([_encode_uid(uid)])[0][0])
+        except TypeError:
+            # values that cannot be encoded are not the UID of any author
+            return default
+        return default if author_id < 0 else author_id
+
+    def intern(self, uid: Hashable) -> int:
+        """
+        Returns the id of an author UID, adding it to the table if it is new.
+        :param uid: an author UID.
+        :return: the integer author id.
+        """
+
+        return int(self.intern_many([uid])[0])
+
+    def intern_many(self, uids: Iterable[Hashable]) -> np.ndarray:
+        """
+        Returns the ids of several author UIDs, adding new UIDs to the table in
+        order of first appearance.
+        :param uids: an iterable of author UIDs.
+        :return: an integer array of author ids.
+        """
+
+        encoded = [_encode_uid(uid) for uid in uids]
+        ids, keys = self._lookup(encoded)
+        missing = np.flatnonzero(ids < 0)
+        if len(missing) == 0:
+            return ids.astype(self.dtype)
+
+        # the new UIDs, in order of first appearance, and their ids
+        n = self._size
+        new_ids = dict()
+        for i in missing.tolist():
+            new_ids.setdefault(encoded[i], n + len(new_ids))
+        m = len(new_ids)
+        if n + m - 1 > np.iinfo(self.dtype).max:
+            raise OverflowError("AuthorTable cannot hold more than %d authors." % np.iinfo(self.dtype).max)
+        new_encoded = list(new_ids)
+        new_keys = np.fromiter(map(_uid_key, new_encoded), dtype=np.uint64, count=m)
+
+        # append the new UIDs to the string table and their keys to the key array
+        lengths = np.fromiter(map(len, new_encoded), dtype=np.int64, count=m)
+        n_bytes = self._n_bytes + int(lengths.sum())
+        if len(self._starts) < n + m + 1 or not self._starts.flags.writeable:
+            self._starts = _grow(self._starts[:n + 1], n + m + 1)
+        if len(self._bytes) < n_bytes or not self._bytes.flags.writeable:
+            self._bytes = _grow(self._bytes[:self._n_bytes], n_bytes)
+        if len(self._hashes) < n + m:
+            self._hashes = _grow(self._hashes[:n], n + m)
+        self._bytes[self._n_bytes:n_bytes] = np.frombuffer(b"".join(new_encoded), dtype=np.uint8)
+        self._starts[n + 1:n + m + 1] = self._n_bytes + np.cumsum(lengths)
+        self._hashes[n:n + m] = new_keys
+
+        # a new UID whose key is already taken, by an earlier author or an earlier new UID, is kept aside
+        _, first = np.unique(new_keys, return_index=True)
+        aside = self._probe(new_keys) >= 0
+        aside[np.setdiff1d(np.arange(m), first)] = True
+        for j in np.flatnonzero(aside).tolist():
+            self._overflow[new_encoded[j]] = n + j
+
+        self._size, self._n_bytes = n + m, n_bytes
+        if len(self._slots) < 2 * self._size:
+            self._rebuild()
+        else:
+            self._insert(np.arange(n, n + m)[~aside])
+
+        ids[missing] = [new_ids[encoded[i]] for i in missing.tolist()]
+
+        return ids.astype(self.dtype)
+
+    def intern_documents(self, doc_authors_tuples: List[list]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the ids of the authors of every document, adding new UIDs to the
+        table.
+        :param doc_authors_tuples: a list of lists - a list of author UIDs by document.
+        :return: a tuple which contains a flat array of author ids, document by
+        document, and an array with the number of authors in each document.
+        """
+
+        # each distinct UID of the documents is encoded and hashed once
+        local = AuthorTable()
+        local_ids, lengths = local.intern_documents(doc_authors_tuples)
+
+        return self.intern_many(local)[local_ids], lengths
+
+    def ids(self, uids: Iterable[Hashable]) -> np.ndarray:
+        """
+        Returns the ids of several author UIDs that are in the table.
+        :param uids: an iterable of author UIDs.
+        :return: an integer array of author ids.
+        """
+
+        uids = list(uids)
+        ids, _ = self._lookup([_encode_uid(uid) for uid in uids])
+        missing = np.flatnonzero(ids < 0)
+        if len(missing) > 0:
+            raise KeyError(uids[missing[0]])
+
+        return ids.astype(self.dtype)
+
+    def uids(self, author_ids: Iterable[int]) -> List[Hashable]:
+        """
+        Returns the UIDs of several author ids.
+        :param author_ids: an iterable of integer author ids.
+        :return: a list of author UIDs.
+        """
+
+        author_ids = np.asarray(author_ids if isinstance(author_ids, np.ndarray) else list(author_ids),
+                                dtype=np.int64)
+        # decode each distinct author once, such as the source authors of many edges
+        distinct, inverse = np.unique(author_ids, return_inverse=True)
+        decoded = [self._decode_one(i) for i in distinct.tolist()]
+
+        return [decoded[i] for i in inverse.tolist()]
+
+    def subset(self, author_ids: Iterable[int]) -> 'HashedAuthorTable':
+        """
+        Creates a table of some of the authors of this table, such as those
+        that remain after documents are removed from a graph.
+        :param author_ids: an iterable of integer author ids, in the order of
+        their new ids.
+        :return: a HashedAuthorTable.
+        """
+
+        author_ids = np.asarray(author_ids if isinstance(author_ids, np.ndarray) else list(author_ids),
+                                dtype=np.int64)
+        self._index()
+        starts, lengths = self._starts[author_ids], np.diff(self._starts[:self._size + 1])[author_ids]
+        positions = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(int(lengths.sum()))
+
+        table = type(self)()
+        table._size, table._n_bytes = len(author_ids), len(positions)
+        table._starts = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        table._bytes = self._bytes[positions]
+        table._hashes = self._hashes[author_ids]
+        table._slots = None
+        table._index()
+
+        return table
+
+    def encode(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the string table of the UIDs of the table, in id order: the
+        UTF-8 JSON encoding of every UID concatenated into a byte array, and
+        the offsets at which each UID starts and ends.
+        :return: a tuple which contains an array of n + 1 offsets and a byte array.
+        """
+
+        return self._starts[:self._size + 1], self._bytes[:self._n_bytes]
+
+    @classmethod
+    def from_encoded(cls, offsets: np.ndarray, encoded: np.ndarray) -> 'HashedAuthorTable':
+        """
+        Creates a table from a string table created by encode, which may be
+        memory-mapped. The UIDs are only hashed when a UID is first looked up or
+        added, and the arrays are only copied when a UID is added.
+        :param offsets: an array of n + 1 offsets.
+        :param encoded: a byte array.
+        :return: a HashedAuthorTable.
+        """
+
+        table = cls()
+        table._size, table._n_bytes = len(offsets) - 1, int(offsets[-1])
+        table._starts, table._bytes = offsets, encoded
+        table._hashes = None
+        table._slots = None
+
+        return table
+
+    def _decode_one(self, author_id: int) -> Hashable:
+        """
+        Decodes the UID of an author id from the string table.
+        :param author_id: an integer author id.
+        :return: the author UID.
+        """
+
+        if author_id < 0:
+            author_id += self._size
+        if not 0 <= author_id < self._size:
+            raise IndexError("author id out of range")
+        start, end = self._starts[author_id], self._starts[author_id + 1]
+        return tuple(json.loads(self._bytes[start:end].tobytes().decode("utf-8")))
+
+    def _decode(self) -> None:
+        """
+        UIDs are always decoded as they are returned.
+        :return: None
+        """
+
+    def _index(self) -> None:
+        """
+        Hashes the UIDs of a table created by from_encoded or subset and
+        builds its hash table and overflow dictionary, if they have yet to be.
+        :return: None
+        """
+
+        if self._slots is not None:
+            return
+
+        encoded, offsets = self._bytes[:self._n_bytes].tobytes(), self._starts[:self._size + 1].tolist()
+        if self._hashes is None:
+            self._hashes = np.fromiter(
+                (_uid_key(encoded[offsets[i]:offsets[i + 1]]) for i in range(self._size)), dtype=np.uint64,
+                count=self._size
+            )
+
+        # authors whose key is that of an earlier author are kept aside
+        _, first = np.unique(self._hashes[:self._size], return_index=True)
+        self._overflow = {
+            encoded[offsets[i]:offsets[i + 1]]: i for i in np.setdiff1d(np.arange(self._size), first).tolist()
+        }
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        """
+        Recreates the hash table with room for at least twice as many authors
+        as the table holds, so that at most half of its slots are taken.
+        :return: None
+        """
+
+        capacity = 64
+        while capacity < 2 * self._size:
+            capacity *= 2
+        self._slots = np.full(capacity, -1, dtype=self.dtype)
+        _, first = np.unique(self._hashes[:self._size], return_index=True)
+        self._insert(np.sort(first))
+
+    def _insert(self, author_ids: np.ndarray) -> None:
+        """
+        Adds authors with distinct keys, none of which is in the hash table, to
+        the hash table by linear probing, all of them at once.
+        :param author_ids: an integer array of author ids.
+        :return: None
+        """
+
+        slots, mask = self._slots, np.uint64(len(self._slots) - 1)
+        positions = (self._hashes[author_ids] & mask).astype(np.int64)
+        pending = np.arange(len(author_ids))
+        while len(pending) > 0:
+            # of the authors that reach a free slot, the first takes it and the others probe on
+            free = pending[slots[positions[pending]] < 0]
+            _, first = np.unique(positions[free], return_index=True)
+            placed = free[first]
+            slots[positions[placed]] = author_ids[placed]
+            pending = np.setdiff1d(pending, placed, assume_unique=True)
+            positions[pending] = (positions[pending] + 1) & int(mask)
+
+    def _probe(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Finds the authors of several keys in the hash table by linear probing,
+        all of them at once.
+        :param keys: an array of 64-bit keys.
+        :return: an integer array with the id of the author in the hash table
+        with each key, or -1.
+        """
+
+        self._index()
+        slots, hashes, mask = self._slots, self._hashes, np.uint64(len(self._slots) - 1)
+        ids = np.full(len(keys), -1, dtype=np.int64)
+        positions = (keys & mask).astype(np.int64)
+        pending = np.arange(len(keys))
+        while len(pending) > 0:
+            slot_ids = slots[positions[pending]].astype(np.int64)
+            occupied = slot_ids >= 0
+            hit = np.zeros(len(pending), dtype=bool)
+            hit[occupied] = hashes[slot_ids[occupied]] == keys[pending[occupied]]
+            ids[pending[hit]] = slot_ids[hit]
+            pending = pending[occupied & ~hit]
+            positions[pending] = (positions[pending] + 1) & int(mask)
+
+        return ids
+
+    def _lookup(self, encoded: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the ids of several encoded UIDs. An author found by the key of a
+        UID is only returned if its encoding is that of the UID; otherwise,
+        which happens only when two UIDs collide, the UID is looked up in the
+        overflow dictionary.
+        :param encoded: a list of encoded UIDs.
+        :return: a tuple which contains an integer array with the id of each
+        UID, or -1 if it is not in the table, and an array with their keys.
+        """
+
+        keys = np.fromiter(map(_uid_key, encoded), dtype=np.uint64, count=len(encoded))
+        ids = self._probe(keys)
+        found = np.flatnonzero(ids >= 0)
+
+        # compare the encodings of the found authors with those of the UIDs, byte by byte
+        lengths = np.fromiter((len(encoded[i]) for i in found.tolist()), dtype=np.int64, count=len(found))
+        starts = self._starts[ids[found]]
+        same = self._starts[ids[found] + 1] - starts == lengths
+        checked, lengths = found[same], lengths[same]
+        mismatched = np.zeros(len(checked), dtype=bool)
+        if len(checked) > 0:
+            positions = np.repeat(starts[same] - (np.cumsum(lengths) - lengths), lengths)
+            positions += np.arange(len(positions))
+            query = np.frombuffer(b"".join(encoded[i] for i in checked.tolist()), dtype=np.uint8)
+            differs = (self._bytes[positions] != query).astype(np.int64)
+            mismatched = np.add.reduceat(differs, np.cumsum(lengths) - lengths) > 0
+
+        for i in np.concatenate([found[~same], checked[mismatched]]).tolist():
+            ids[i] = self._overflow.get(encoded[i], -1)
+
+        return ids, keys
@@ -0,0 +1,129 @@
+# imports
+from author_rank.authors import AuthorTable
+from author_rank.graph import CHUNK_PAIRS, _author_uids, _exclusivity_matrix
+from author_rank.score import block_pagerank, select_top
+import numpy as np
+from scipy import sparse
+from typing import Iterable, List, Sequence, Tuple
+import warnings
+
+
+def _batches(pairs: np.ndarray, max_pairs: int) -> List[slice]:
+    """
+    Groups consecutive subsets into batches whose number of co-author pairs
+    stays within max_pairs, so that the memory needed to expand a batch is
+    bounded. A subset with more pairs than max_pairs forms a batch of its own.
+    :param pairs: an integer array with the number of pairs of each subset.
+    :param max_pairs: the maximum number of pairs per batch.
+    :return: a list of slices of subsets.
+    """
+
+    batches, start, total = list(), 0, 0
+    for i, n_pairs in enumerate(pairs.tolist()):
+        if total + n_pairs > max_pairs and i > start:
+            batches.append(slice(start, i))
+            start, total = i, 0
+        total += n_pairs
+    if start < len(pairs):
+        batches.append(slice(start, len(pairs)))
+
+    return batches
+
+
+def batch_top_authors(documents: Sequence[dict], subsets: Iterable[Iterable[int]], n: int = 10,
+                      normalize_scores: bool = False, authorship_key: str = "authors",
+                      keys: Iterable[str] = None, alpha: float = 0.85, max_iter: int = 100,
+                      tol: float = 1.0e-6, max_pairs: int = CHUNK_PAIRS) -> List[Tuple[List, List]]:
+    """
+    Calculates the top N authors of many subsets of a corpus at once, such as
+    the documents that match each of thousands of topic queries, with the
+    same results as fitting a Graph to each subset and calling top_authors:
+    the authors of a subset are numbered in order of their first appearance
+    in its documents, so that tied authors are returned in the same order.
+    The authors of the corpus are parsed and interned once, the graphs of the
+    subsets are built together as the blocks of one block-diagonal matrix,
+    and all of the blocks are scored together by a single power iteration.
+    No Graph or NetworkX graph is created.
+    :param documents: a list of dictionaries which represent documents.
+    :param subsets: an iterable of subsets, each an iterable of the positions
+    of its documents in documents.
+    :param n: an integer to specify the maximum number of authors to be
+    returned for each subset.
+    :param normalize_scores: a boolean to indicate whether or not to normalize
+    the scores between 0 and 1.
+    :param authorship_key: the key in the document which contains a list
+    of dictionaries representing authors.
+    :param keys: the keys to be used to create a UID for authors.
+    :param alpha: the PageRank damping parameter.
+    :param max_iter: the maximum number of PageRank power iterations.
+    :param tol: the PageRank error tolerance used to check convergence.
+    :param max_pairs: the maximum number of co-author pairs expanded at once.
+    Subsets are scored in batches within this bound.
+    :return: a list with a tuple for each subset, which contains two lists, one
+    for authors and the other for their scores. Subsets with fewer than two
+    authors have no top authors.
+    """
+
+    if keys is None:
+        keys = {"first_name", "last_name"}
+
+    # parse and intern the authors of every document once
+    authors = AuthorTable()
+    author_ids, lengths = authors.intern_documents(list(_author_uids(documents, authorship_key, keys)))
+    author_ids = author_ids.astype(np.int64)
+    doc_starts = np.cumsum(lengths) - lengths
+
+    subsets = [np.asarray(list(subset), dtype=np.int64) for subset in subsets]
+    pairs = np.array([(lengths[subset] ** 2).sum() for subset in subsets], dtype=np.int64)
+
+    results, n_skipped = list(), 0
+    for batch in _batches(pairs, max_pairs):
+        # the documents of each subset of the batch, and the subset of each document
+        docs = np.concatenate([np.zeros(0, dtype=np.int64)] + subsets[batch])
+        doc_subsets = np.repeat(np.arange(len(subsets[batch])), [len(subset) for subset in subsets[batch]])
+
+        # the author mentions of those documents, each with its author's id in its subset's block,
+        # in which authors are numbered in order of their first appearance in the subset, as by Graph.fit
+        doc_lengths = lengths[docs]
+        mentions = np.repeat(doc_starts[docs] - (np.cumsum(doc_lengths) - doc_lengths), doc_lengths)
+        mentions += np.arange(len(mentions))
+        keyed = np.repeat(doc_subsets, doc_lengths) * len(authors) + author_ids[mentions]
+        block_keys, first, block_ids = np.unique(keyed, return_index=True, return_inverse=True)
+        # the mentions of each subset follow those of the previous one, so this order keeps the blocks in order
+        order = np.argsort(first, kind="stable")
+        block_keys = block_keys[order]
+        block_ids = np.argsort(order)[block_ids.ravel()]
+        blocks = np.searchsorted(block_keys // max(len(authors), 1), np.arange(len(subsets[batch]) + 1))
+
+        # weigh the edges of every subset at once, as the blocks of one matrix
+        n_nodes = len(block_keys)
+        numerators = _exclusivity_matrix(block_ids, doc_lengths, n_nodes)
+        counts = np.bincount(block_ids, minlength=n_nodes)
+        matrix = sparse.diags(1. / np.maximum(counts, 1)).dot(numerators)
+
+        # subsets with fewer than two authors are not scored, as by Graph.fit
+        sizes = np.diff(blocks)
+        scored = sizes > 1
+        n_skipped += int((~scored).sum())
+        nodes = np.repeat(scored, sizes)
+        rank = np.zeros(n_nodes)
+        if scored.all():
+            rank = block_pagerank(matrix, blocks, alpha=alpha, max_iter=max_iter, tol=tol)
+        elif scored.any():
+            scored_blocks = np.concatenate([[0], np.cumsum(sizes[scored])])
+            rank[nodes] = block_pagerank(matrix.tocsr()[nodes][:, nodes], scored_blocks, alpha=alpha,
+                                         max_iter=max_iter, tol=tol)
+
+        block_authors = block_keys % max(len(authors), 1)
+        for b in range(len(sizes)):
+            if not scored[b]:
+                results.append((list(), list()))
+                continue
+            block = slice(blocks[b], blocks[b + 1])
+            top_ids, top_scores = select_top(rank[block], block_authors[block], n=n, normalize_scores=normalize_scores)
+            results.append((authors.uids(top_ids), top_scores))
+
+    if n_skipped > 0:
+        warnings.warn("%d subsets have fewer than two authors and were not scored." % n_skipped, UserWarning)
+
+    return results
@@ -0,0 +1,187 @@
+# imports
+import argparse
+from author_rank.graph import ENGINES, LARGE_DOCUMENT_POLICIES, Graph
+from author_rank.profiling import Profile
+from author_rank.reader import _is_json_lines, read_documents
+from author_rank.utils import ProgressReporter
+import json
+import sys
+from typing import List, TextIO
+
+
+def _parser() -> argparse.ArgumentParser:
+    """
+    Creates the parser of the command-line arguments.
+    :return: an ArgumentParser.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="author-rank",
+        description="Fits an AuthorRank graph to a JSON or JSON Lines file of documents, streamed one document "
+                    "at a time, and writes the top authors and their scores."
+    )
+    parser.add_argument("documents", help="a JSON file with an array of documents, or a JSON Lines file "
+                                          "(.jsonl, .ndjson or .jsonlines) with one document per line.")
+    parser.add_argument("--documents-key", default="documents",
+                        help="the top-level key which contains the array of documents of a JSON file whose "
+                             "top-level value is an object (default: %(default)s).")
+    parser.add_argument("--authorship-key", default="authors",
+                        help="the key in each document which contains its authors (default: %(default)s).")
+    parser.add_argument("--keys", nargs="+", default=["first_name", "last_name"],
+                        help="the keys of each author, in order, used to create its UID (default: %(default)s).")
+    parser.add_argument("--engine", choices=ENGINES, default="sparse", help="the fit engine (default: %(default)s).")
+    parser.add_argument("--n-jobs", type=int, default=1,
+                        help="the number of processes used by the sparse engine, -1 for all CPUs "
+                             "(default: %(default)s).")
+    parser.add_argument("--large-documents", choices=LARGE_DOCUMENT_POLICIES, default="expand",
+                        help="how documents with more than --max-document-authors authors are handled "
+                             "(default: %(default)s).")
+    parser.add_argument("--max-document-authors", type=int, default=500,
+                        help="the number of authors above which a document is large (default: %(default)s).")
+    parser.add_argument("--hash-uids", action="store_true",
+                        help="keep author UIDs in a compact table of 64-bit hashes, for very large author pools.")
+    parser.add_argument("-n", "--top", type=int, default=10,
+                        help="the number of top authors to write (default: %(default)s).")
+    parser.add_argument("--normalize-scores", action="store_true", help="normalize the scores between 0 and 1.")
+    parser.add_argument("--alpha", type=float, default=0.85, help="the PageRank damping parameter "
+                                                                  "(default: %(default)s).")
+    parser.add_argument("--max-iter", type=int, default=100,
+                        help="the maximum number of PageRank power iterations (default: %(default)s).")
+    parser.add_argument("--tol", type=float, default=1.0e-6, help="the PageRank error tolerance "
+                                                                 "(default: %(default)s).")
+    parser.add_argument("-o", "--output", default="-",
+                        help="the file to which the top authors are written, as JSON Lines if it has a JSON "
+                             "Lines extension and as a JSON array otherwise (default: stdout).")
+    parser.add_argument("--graph", help="a file to which the graph is also written.")
+    parser.add_argument("--graph-format", choices=("binary", "json"), default="binary",
+                        help="the format of --graph: the binary format of Graph.save, which can be loaded with "
+                             "Graph.load, or node-link JSON streamed with Graph.write_json (default: %(default)s).")
+    parser.add_argument("--progress-bar", action="store_true", help="draw a progress bar on stderr while fitting.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="record the peak memory allocated in each phase with tracemalloc, which slows "
+                             "fitting down.")
+    parser.add_argument("--report", help="a file to which the timings and peak memory of the run are written "
+                                         "as JSON.")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="do not print the timings and peak memory of the run on stderr.")
+
+    return parser
+
+
+def _peak_rss() -> int:
+    """
+    Returns the peak resident memory of the process, where the platform
+    reports it.
+    :return: the peak resident memory in bytes, or None if it is unavailable.
+    """
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _write_top(f: TextIO, authors: List, scores: List, json_lines: bool) -> None:
+    """
+    Writes the top authors and their scores, one record per author.
+    :param f: a file-like object opened for writing text.
+    :param authors: the list of top authors.
+    :param scores: the list of their scores.
+    :param json_lines: a boolean to indicate whether to write JSON Lines or a
+    JSON array.
+    :return: None
+    """
+
+    records = [json.dumps({"rank": i + 1, "author": author, "score": score})
+               for i, (author, score) in enumerate(zip(authors, scores))]
+    if json_lines:
+        f.writelines(record + "\n" for record in records)
+    else:
+        f.write("[" + ",\n ".join(records) + "]\n")
+
+
+def _write_report(f: TextIO, report: dict) -> None:
+    """
+    Prints the timings of each run and phase and the peak memory.
+    :param f: a file-like object opened for writing text.
+    :param report: the report of the run.
+    :return: None
+    """
+
+    for run in report["runs"]:
+        f.write("%-24s %10.3f s%s\n" % (run["operation"], run["seconds"], _megabytes(run.get("peak_bytes"))))
+        for name, phase in run["phases"].items():
+            f.write("  %-22s %10.3f s%s  %d items\n" % (name, phase["seconds"], _megabytes(phase.get("peak_bytes")),
+                                                       phase["items"]))
+    if report["peak_rss_bytes"] is not None:
+        f.write("%-24s %10.1f MB\n" % ("peak resident memory", report["peak_rss_bytes"] / 2 ** 20))
+
+
+def _megabytes(n_bytes: int) -> str:
+    """
+    Formats a number of bytes, if recorded, as megabytes.
+    :param n_bytes: the number of bytes, or None.
+    :return: a string.
+    """
+
+    return "" if n_bytes is None else " %10.1f MB" % (n_bytes / 2 ** 20)
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Runs AuthorRank from the command line, as the author-rank console script:
+    fits a graph to a file of documents, streamed one document at a time,
+    writes the top authors and their scores and, optionally, the graph, and
+    reports the time spent in each phase and the peak memory.
+    :param argv: the command-line arguments, default sys.argv[1:].
+    :return: the exit status.
+    """
+
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.engine != "sparse" and (args.n_jobs != 1 or args.large_documents != "expand" or args.hash_uids):
+        parser.error("--n-jobs, --large-documents and --hash-uids are only supported by the sparse engine.")
+    profile = Profile(memory=args.trace_memory)
+
+    ar_graph = Graph()
+    progress_bar = ProgressReporter(stream=sys.stderr) if args.progress_bar else False
+    ar_graph.fit(
+        documents=read_documents(args.documents, key=args.documents_key), authorship_key=args.authorship_key,
+        keys=args.keys, progress_bar=progress_bar, engine=args.engine, n_jobs=args.n_jobs, profile=profile,
+        large_documents=args.large_documents, max_document_authors=args.max_document_authors,
+        hash_uids=args.hash_uids, build_graph=False
+    )
+
+    authors, scores = list(), list()
+    if ar_graph._is_fit:
+        authors, scores = ar_graph.top_authors(n=args.top, normalize_scores=args.normalize_scores, alpha=args.alpha,
+                                               max_iter=args.max_iter, tol=args.tol, profile=profile)
+
+    with profile.run("write_top"):
+        json_lines = _is_json_lines(args.output)
+        if args.output == "-":
+            _write_top(sys.stdout, authors, scores, json_lines)
+        else:
+            with open(args.output, "w") as f:
+                _write_top(f, authors, scores, json_lines)
+
+    if args.graph is not None and ar_graph._is_fit:
+        with profile.run("write_graph"):
+            if args.graph_format == "binary":
+                ar_graph.save(args.graph)
+            else:
+                with open(args.graph, "w") as f:
+                    ar_graph.write_json(f)
+
+    report = dict(profile.as_dict(), peak_rss_bytes=_peak_rss())
+    if args.report is not None:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    if not args.quiet:
+        _write_report(sys.stderr, report)
+
+    return 0 if ar_graph._is_fit else 1
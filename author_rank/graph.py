@@ -1,160 +1,1253 @@
 # imports
-from author_rank.score import top_authors as top
-from author_rank.utils import emit_progress_bar, check_author_count
-from collections import Counter
-import copy
+from array import array
+from author_rank.authors import AuthorTable, HashedAuthorTable
+from author_rank.profiling import Profile, profiled
+from author_rank.score import pagerank, pagerank_many, select_top, top_n, warm_start as start_vector
+from author_rank.storage import read_arrays, write_arrays
+from author_rank.utils import ProgressReporter, check_author_count
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import functools
 import itertools
-import networkx as nx
-from typing import List, Tuple
+import json
+import numpy as np
+import operator
+import os
+from scipy import sparse
+from typing import Callable, Iterable, Iterator, List, Optional, Sized, TextIO, Tuple, TYPE_CHECKING, Union
 import warnings
+import zlib
+if TYPE_CHECKING:
+    import networkx as nx
+
+
+ENGINES = ("sparse", "python")
+
+# the number of authors whose links are gathered at once by write_json
+WRITE_BLOCK = 4096
+
+# how the sparse engine handles documents with more than max_document_authors authors
+LARGE_DOCUMENT_POLICIES = ("expand", "clique", "sample")
+
+# the maximum number of co-author pairs expanded at once by the sparse engine
+CHUNK_PAIRS = 2 ** 22
+
+# the number of personalization vectors scored at once by personalized_top_authors
+PERSONALIZATION_BLOCK = 64
+
+# summed exclusivity below which an edge is considered removed, rather than left with a rounding error
+_ZERO_TOLERANCE = 1e-9
+
+
+def _progress_reporter(progress_bar: Union[bool, Callable, ProgressReporter]) -> Optional[ProgressReporter]:
+    """
+    Creates the progress reporter requested by the progress_bar parameter of
+    fit and partial_fit.
+    :param progress_bar: a boolean to indicate whether or not to draw a progress
+    bar, a callback that receives the progress instead, or a ProgressReporter.
+    :return: a ProgressReporter, or None if progress is not reported.
+    """
+
+    if isinstance(progress_bar, ProgressReporter):
+        return progress_bar
+    if callable(progress_bar):
+        return ProgressReporter(display=False, callback=progress_bar)
+    return ProgressReporter() if progress_bar else None
+
+
+def _check_large_documents(large_documents: str, max_document_authors: int) -> None:
+    """
+    Validates a policy for large documents.
+    :param large_documents: the policy for documents with more than
+    max_document_authors authors.
+    :param max_document_authors: the number of authors above which a document
+    is large.
+    :return: None
+    """
+
+    if large_documents not in LARGE_DOCUMENT_POLICIES:
+        raise ValueError("large_documents must be one of %s, got %r."
+                         % (", ".join(LARGE_DOCUMENT_POLICIES), large_documents))
+    if max_document_authors < 2:
+        raise ValueError("max_document_authors must be at least 2, got %r." % max_document_authors)
+
+
+def _phase(profile: Optional[Profile], name: str) -> contextlib.AbstractContextManager:
+    """
+    Records a phase of the current run of a profile, if any.
+    :param profile: a Profile, or None.
+    :param name: the name of the phase.
+    :return: a context manager which yields the dictionary of the phase.
+    """
+
+    return profile.phase(name) if profile is not None else contextlib.nullcontext({"items": 0})
+
+
+def _run(profile: Optional[Profile], operation: str) -> contextlib.AbstractContextManager:
+    """
+    Records a run of an operation in a profile, if any.
+    :param profile: a Profile, or None.
+    :param operation: the name of the operation.
+    :return: a context manager.
+    """
+
+    return profile.run(operation) if profile is not None else contextlib.nullcontext()
+
+
+def _rank_key(alpha: float, personalization: Optional[dict], max_iter: int, tol: float) -> tuple:
+    """
+    Creates the key under which the PageRank scores of a set of PageRank
+    parameters are cached.
+    :param alpha: the PageRank damping parameter.
+    :param personalization: a dictionary keyed by author UID with teleport
+    weights, or None for uniform weights.
+    :param max_iter: the maximum number of PageRank power iterations.
+    :param tol: the PageRank error tolerance used to check convergence.
+    :return: a hashable key.
+    """
+
+    return alpha, max_iter, tol, None if personalization is None else frozenset(personalization.items())
+
+
+def _exclusivity_matrix(author_ids: np.ndarray, lengths: np.ndarray, n_authors: int) -> sparse.csr_matrix:
+    """
+    Builds the summed exclusivity (g_i_j_k) matrix for a set of documents in
+    a single batch of array operations. Each document contributes a weight
+    of 1 / (k - 1) to every ordered pair of its k authors, or a self-edge of
+    weight 1 when it has a single author.
+    :param author_ids: a flat integer array of author ids, document by document.
+    :param lengths: an integer array with the number of authors in each document.
+    :param n_authors: the total number of distinct authors.
+    :return: a SciPy CSR matrix of summed exclusivity values.
+    """
+
+    # the number of authors of the document each author mention belongs to
+    k = np.repeat(lengths, lengths)
+    # the flat position of the first author of that document
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    # expand every author mention into k (source, target) position pairs
+    src = np.repeat(np.arange(len(author_ids)), k)
+    offsets = np.arange(len(src)) - np.repeat(np.cumsum(k) - k, k)
+    dst = np.repeat(starts, k) + offsets
+    k = np.repeat(k, k)
+
+    # drop pairs of an author mention with itself, unless it is a sole author
+    keep = (src != dst) | (k == 1)
+    src, dst, k = src[keep], dst[keep], k[keep]
+    weights = np.where(k == 1, 1., 1. / np.maximum(k - 1, 1))
+
+    # duplicate (source, target) entries are summed on conversion
+    matrix = sparse.coo_matrix(
+        (weights, (author_ids[src], author_ids[dst])), shape=(n_authors, n_authors)
+    )
+
+    return matrix.tocsr()
+
+
+def _key_order(keys: Iterable) -> tuple:
+    """
+    Returns the keys used to create author UIDs in a deterministic order:
+    sorted for a set, otherwise in the order given.
+    :param keys: a set, list or tuple of keys.
+    :return: a tuple of keys.
+    """
+
+    if isinstance(keys, (set, frozenset)):
+        return tuple(sorted(keys))
+    return tuple(keys)
+
+
+def _author_uids(documents: Iterable[dict], authorship_key: str, keys: Iterable) -> Iterator[list]:
+    """
+    Creates a UID for each author of each document from the values of the
+    specified keys, one document at a time, without modifying the documents.
+    :param documents: an iterable of dictionaries which represent documents.
+    :param authorship_key: the key in the document which contains a list
+    of dictionaries representing authors.
+    :param keys: the keys to be used to create a UID for authors. The values
+    of a set are taken in sorted order, those of a list or tuple in the order
+    given.
+    :return: an iterator of lists - the author UIDs of each document.
+    """
+
+    keys = _key_order(keys)
+    getter = operator.itemgetter(*keys)
+
+    def uid(author: dict) -> tuple:
+        try:
+            values = getter(author)
+        except KeyError:
+            # keys that an author does not have are left out of their UID
+            return tuple(author[k] for k in keys if k in author)
+        return (values,) if len(keys) == 1 else values
+
+    for document in documents:
+        yield [uid(author) for author in document[authorship_key]]
+
+
+def _document_pairs(n_authors: int, large_documents: str = "expand", max_document_authors: int = None) -> int:
+    """
+    Returns the number of co-author pairs a document is expanded into.
+    :param n_authors: the number of authors of the document.
+    :param large_documents: the policy for documents with more than
+    max_document_authors authors.
+    :param max_document_authors: the number of authors above which a document
+    is large.
+    :return: the number of pairs, at least 1.
+    """
+
+    if large_documents == "expand" or n_authors <= max_document_authors:
+        return max(n_authors ** 2, 1)
+    if large_documents == "clique":
+        return n_authors
+    return n_authors * (max_document_authors - 1)
+
+
+def _chunks(doc_authors_tuples: Iterable, max_pairs: int = CHUNK_PAIRS, large_documents: str = "expand",
+            max_document_authors: int = None, n_authors: Callable = len) -> Iterator[list]:
+    """
+    Groups the documents of an iterable into lists whose authors expand into
+    at most max_pairs co-author pairs, so that the pairs of a corpus are never
+    held in memory at once. A document with more pairs forms its own group.
+    :param doc_authors_tuples: an iterable of lists - author UIDs by document -
+    or of documents, given n_authors.
+    :param max_pairs: the maximum number of pairs per group of documents.
+    :param large_documents: the policy for documents with more than
+    max_document_authors authors.
+    :param max_document_authors: the number of authors above which a document
+    is large.
+    :param n_authors: a function that returns the number of authors of an item,
+    default len.
+    :return: an iterator of lists of items.
+    """
+
+    chunk, pairs = list(), 0
+    for doc in doc_authors_tuples:
+        k = _document_pairs(n_authors(doc), large_documents, max_document_authors)
+        if chunk and pairs + k > max_pairs:
+            yield chunk
+            chunk, pairs = list(), 0
+        chunk.append(doc)
+        pairs += k
+
+    if chunk:
+        yield chunk
+
+
+def _sampled_exclusivity(author_ids: np.ndarray, lengths: np.ndarray, n_authors: int, n_samples: int,
+                         seeds: List[int]) -> sparse.csr_matrix:
+    """
+    Approximates the summed exclusivity matrix of a set of large documents.
+    Rather than to all of its k - 1 co-authors, each author of a document is
+    linked to n_samples of them, those at a set of distinct offsets in the
+    author list drawn at random for the document, with a weight of 1 / n_samples.
+    Every co-author is equally likely to be drawn, so the expected weight of
+    each pair is the exact weight of 1 / (k - 1), and the total weight of each
+    author's edges is exact.
+    :param author_ids: a flat integer array of author ids, document by document.
+    :param lengths: an integer array with the number of authors in each document.
+    :param n_authors: the total number of distinct authors.
+    :param n_samples: the number of co-authors each author is linked to.
+    :param seeds: a seed for the random offsets of each document.
+    :return: a SciPy CSR matrix of summed exclusivity values.
+    """
+
+    src, dst, weights = [np.zeros(0, dtype=author_ids.dtype)], [np.zeros(0, dtype=author_ids.dtype)], [np.zeros(0)]
+    starts = np.cumsum(lengths) - lengths
+    for start, k, seed in zip(starts.tolist(), lengths.tolist(), seeds):
+        ids = author_ids[start:start + k]
+        m = min(n_samples, k - 1)
+        offsets = np.random.default_rng(seed).choice(np.arange(1, k), size=m, replace=False)
+        src.append(np.repeat(ids, m))
+        dst.append(ids[(np.arange(k)[:, None] + offsets).ravel() % k])
+        weights.append(np.full(k * m, 1. / m))
+
+    matrix = sparse.coo_matrix(
+        (np.concatenate(weights), (np.concatenate(src), np.concatenate(dst))), shape=(n_authors, n_authors)
+    )
+
+    return matrix.tocsr()
+
+
+def _partial_sums(doc_authors_tuples: list, large_documents: str = "expand",
+                  max_document_authors: int = None) -> Tuple[list, np.ndarray, sparse.csr_matrix, int, tuple]:
+    """
+    Computes the author document counts and summed exclusivity matrix of a
+    group of documents, using author ids local to the group so that groups can
+    be processed independently, such as in separate processes.
+    :param doc_authors_tuples: a list of lists - a list of author UIDs by document.
+    :param large_documents: the policy for documents with more than
+    max_document_authors authors: "expand" them like any other document,
+    "clique" to return them as cliques rather than pairs, or "sample" to
+    link each author to a random sample of co-authors.
+    :param max_document_authors: the number of authors above which a document
+    is large.
+    :return: a tuple which contains the author UIDs in order of their local ids,
+    their document counts, the summed exclusivity matrix over local ids, the
+    number of documents, and the cliques of the documents added as cliques: an
+    incidence matrix over local ids and the weight of each clique.
+    """
+
+    authors = AuthorTable()
+    author_ids, lengths = authors.intern_documents(doc_authors_tuples)
+    n_authors = len(authors)
+    counts = np.bincount(author_ids, minlength=n_authors)
+
+    is_large = np.zeros(len(lengths), dtype=bool)
+    if large_documents != "expand":
+        is_large = lengths > max_document_authors
+    incidence, weights = sparse.csr_matrix((0, n_authors)), np.zeros(0)
+
+    if not is_large.any():
+        numerators = _exclusivity_matrix(author_ids, lengths, n_authors)
+    else:
+        in_large = np.repeat(is_large, lengths)
+        numerators = _exclusivity_matrix(author_ids[~in_large], lengths[~is_large], n_authors)
+        large_ids, large_lengths = author_ids[in_large], lengths[is_large]
+        if large_documents == "clique":
+            # the number of times each author appears in each document, summed on conversion
+            incidence = sparse.csr_matrix(
+                (np.ones(len(large_ids)), large_ids, np.concatenate([[0], np.cumsum(large_lengths)])),
+                shape=(len(large_lengths), n_authors)
+            )
+            incidence.sum_duplicates()
+            weights = 1. / (large_lengths - 1)
+        else:
+            seeds = [zlib.crc32(repr(doc_authors_tuples[i]).encode("utf-8")) for i in np.flatnonzero(is_large)]
+            numerators = numerators + _sampled_exclusivity(
+                large_ids, large_lengths, n_authors, max_document_authors - 1, seeds
+            )
+
+    return list(authors), counts, numerators, len(doc_authors_tuples), (incidence, weights)
+
+
+def _document_sums(documents: list, authorship_key: str, keys: Iterable, large_documents: str = "expand",
+                   max_document_authors: int = None) -> Tuple[list, np.ndarray, sparse.csr_matrix, int, tuple]:
+    """
+    Creates the author UIDs of a group of documents and computes their partial
+    sums, so that a worker process does both rather than the parent.
+    :param documents: a list of dictionaries which represent documents.
+    :param authorship_key: the key in the document which contains a list
+    of dictionaries representing authors.
+    :param keys: the keys to be used to create a UID for authors.
+    :param large_documents: the policy for documents with more than
+    max_document_authors authors.
+    :param max_document_authors: the number of authors above which a document
+    is large.
+    :return: the tuple returned by _partial_sums.
+    """
+
+    return _partial_sums(list(_author_uids(documents, authorship_key, keys)), large_documents, max_document_authors)
+
+
+def _chunk_pairs(n_jobs: int, total_pairs: int = None) -> int:
+    """
+    Returns the maximum number of co-author pairs per chunk: CHUNK_PAIRS in a
+    single process, and otherwise a share of the pairs small enough for every
+    process to be given a chunk, even when the corpus holds fewer than
+    CHUNK_PAIRS pairs.
+    :param n_jobs: the number of processes.
+    :param total_pairs: the number of pairs of the corpus, if known.
+    :return: the maximum number of pairs per chunk.
+    """
+
+    if n_jobs == 1:
+        return CHUNK_PAIRS
+    if total_pairs is None:
+        return max(CHUNK_PAIRS // n_jobs, 1)
+    return max(min(CHUNK_PAIRS, -(-total_pairs // n_jobs)), 1)
+
+
+def _sums(documents: Iterable[dict], authorship_key: str, keys: Iterable, n_jobs: int = 1,
+          large_documents: str = "expand", max_document_authors: int = None,
+          profile: Profile = None) -> Iterator[tuple]:
+    """
+    Computes the partial sums of a corpus in chunks of bounded size. In a
+    single process the author UIDs are created as the documents are read;
+    across several processes the documents themselves are sent to the workers,
+    which create the UIDs, and chunks are sized so that every process has work.
+    :param documents: an iterable of dictionaries which represent documents.
+    :param authorship_key: the key in the document which contains a list
+    of dictionaries representing authors.
+    :param keys: the keys to be used to create a UID for authors.
+    :param n_jobs: the number of processes across which chunks are processed.
+    :param large_documents: the policy for documents with more than
+    max_document_authors authors.
+    :param max_document_authors: the number of authors above which a document
+    is large.
+    :param profile: a Profile with a current run, or None.
+    :return: an iterator of the tuples returned by _partial_sums, in order.
+    """
+
+    policy = {"large_documents": large_documents, "max_document_authors": max_document_authors}
+    if n_jobs == 1:
+        doc_authors_tuples = _author_uids(documents, authorship_key, keys)
+        if profile is not None:
+            doc_authors_tuples = profiled(doc_authors_tuples, profile, "extract_uids")
+        function = functools.partial(_partial_sums, **policy)
+        chunks = _chunks(doc_authors_tuples, CHUNK_PAIRS, **policy)
+    else:
+        total_pairs = None
+        if isinstance(documents, (list, tuple)):
+            total_pairs = sum(_document_pairs(len(document[authorship_key]), **policy) for document in documents)
+        if profile is not None:
+            documents = profiled(documents, profile, "read_documents")
+        function = functools.partial(_document_sums, authorship_key=authorship_key, keys=keys, **policy)
+        chunks = _chunks(documents, _chunk_pairs(n_jobs, total_pairs), n_authors=lambda document: len(
+            document[authorship_key]), **policy)
+
+    partial_sums = _parallel_map(function, chunks, n_jobs)
+    if profile is not None:
+        partial_sums = profiled(partial_sums, profile, "expand_pairs")
+    return partial_sums
+
+
+def _clique_keys(incidence: sparse.csr_matrix) -> Iterator[tuple]:
+    """
+    Creates a key for each clique of an incidence matrix, made of its author
+    ids and the number of times each author appears in it, so that the same
+    clique can be found again when its document is removed.
+    :param incidence: a SciPy CSR incidence matrix with a row for each clique.
+    :return: an iterator of hashable keys, one per clique.
+    """
+
+    for start, end in zip(incidence.indptr[:-1].tolist(), incidence.indptr[1:].tolist()):
+        order = np.argsort(incidence.indices[start:end])
+        yield (incidence.indices[start:end][order].astype(np.int64).tobytes(),
+               incidence.data[start:end][order].astype(np.float64).tobytes())
+
+
+def _effective_n_jobs(n_jobs: int) -> int:
+    """
+    Returns the number of processes to use, where negative values count back
+    from the number of CPUs, as in scikit-learn: -1 uses all of them.
+    :param n_jobs: the requested number of processes.
+    :return: a positive number of processes.
+    """
+
+    if n_jobs == 0:
+        raise ValueError("n_jobs must be a positive or negative integer, got 0.")
+    if n_jobs < 0:
+        return max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def _parallel_map(function: Callable, iterable: Iterable, n_jobs: int) -> Iterator:
+    """
+    Applies a function to each item of an iterable in a pool of processes and
+    yields the results in order. Only a few items per process are submitted
+    ahead of the results being consumed, so that the iterable can be streamed.
+    :param function: a function that can be pickled.
+    :param iterable: an iterable of arguments to the function.
+    :param n_jobs: the number of processes, where 1 applies the function in
+    the current process.
+    :return: an iterator of results.
+    """
+
+    if n_jobs == 1:
+        yield from map(function, iterable)
+        return
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        pending = deque()
+        for item in iterable:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _resize(matrix: sparse.csr_matrix, n_authors: int, square: bool = True) -> sparse.csr_matrix:
+    """
+    Grows a square CSR matrix to n_authors rows and columns without copying
+    its values, so that new authors start with empty rows and columns.
+    :param matrix: a square SciPy CSR matrix.
+    :param n_authors: the new number of rows and columns.
+    :param square: a boolean to indicate whether or not to grow the rows along
+    with the columns, or only the columns of a matrix such as an incidence matrix.
+    :return: a SciPy CSR matrix.
+    """
+
+    if not square:
+        return sparse.csr_matrix((matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], n_authors))
+
+    indptr = np.concatenate([matrix.indptr, np.full(n_authors - matrix.shape[0], matrix.indptr[-1])])
+
+    return sparse.csr_matrix((matrix.data, matrix.indices, indptr), shape=(n_authors, n_authors))
+
+
+class _Edges:
+    """
+    Edges of the AuthorRank graph stored in typed arrays of source author ids,
+    target author ids and exclusivity weights, rather than one object per edge.
+    """
+
+    def __init__(self):
+        self.src = array("i")
+        self.dst = array("i")
+        self.weight = array("d")
+
+    def __len__(self) -> int:
+        return len(self.weight)
+
+    def extend(self, pairs: Iterable[Tuple[int, int]], weight: float) -> None:
+        """
+        Adds edges between pairs of authors with the same weight.
+        :param pairs: an iterable of (source, target) author id pairs.
+        :param weight: the exclusivity weight of each edge.
+        :return: None
+        """
+
+        n_edges = len(self.weight)
+        for src, dst in pairs:
+            self.src.append(src)
+            self.dst.append(dst)
+        self.weight.extend([weight] * (len(self.src) - n_edges))
 
 
 class Graph:
 
     def __init__(self):
-        self.graph = nx.DiGraph()
+        self._reset()
+
+    def _reset(self) -> None:
+        """
+        Clears the graph and all state accumulated by previous calls to fit or
+        partial_fit.
+        :return: None
+        """
+
+        # the NetworkX graph, and NetworkX itself, are only loaded when the graph is first accessed
+        self._graph = None
         self._is_fit = False
-        self._progress = "="
-        self._edges_all = list()
+        self._edges_all = _Edges()
         self._normalized = dict()
-        self._author_list = list()
-        self._counter = 0
-        self._gb_object_len = 0
+        self._authorship_key = "authors"
+        self._keys = None
+        self._authors = AuthorTable()
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._numerators = sparse.csr_matrix((0, 0))
+        self._matrix = sparse.csr_matrix((0, 0))
+        self._large_documents = "expand"
+        self._max_document_authors = 500
+        self._cliques = sparse.csr_matrix((0, 0))
+        self._clique_weights = np.zeros(0)
+        self._rank_cache = dict()
+        self._last_scores = None
+
+    @property
+    def graph(self) -> 'nx.DiGraph':
+        """
+        The AuthorRank graph, as a NetworkX DiGraph object. Scores are computed
+        from the sparse adjacency matrix that Graph keeps, so the NetworkX graph
+        is only built when it is first accessed, such as by fit unless
+        build_graph is False. Once built, it is kept up to date as documents
+        are added.
+        :return: a NetworkX DiGraph object.
+        """
+
+        if self._graph is None:
+            import networkx as nx
+            self._graph = nx.DiGraph()
+            if self._is_fit:
+                matrix = self._weights().tocoo()
+                edge_list = zip(self._authors.uids(matrix.row), self._authors.uids(matrix.col), matrix.data.tolist())
+                self._graph.add_weighted_edges_from(edge_list)
+
+        return self._graph
+
+    @graph.setter
+    def graph(self, graph: Optional['nx.DiGraph']) -> None:
+        """
+        Replaces the NetworkX view of the graph. Scores are still computed from
+        the sparse adjacency matrix, so they are not changed by the new view,
+        which is updated as documents are added like a built one. None discards
+        the view, which is built again on next access.
+        :param graph: a NetworkX DiGraph object, or None.
+        :return: None
+        """
+
+        self._graph = graph
 
-    def _extend_graph(self, authors_by_document: list, doc_index: int, progress_bar: bool) -> list:
+    def _build_graph(self, profile: Optional[Profile]) -> 'nx.DiGraph':
+        """
+        Builds the NetworkX graph, if it has yet to be, as a phase of the current run.
+        :param profile: a Profile with a current run, or None.
+        :return: a NetworkX DiGraph object.
+        """
+
+        with _phase(profile, "build_graph") as record:
+            if self._graph is None:
+                record["items"] += self.graph.number_of_edges()
+
+        return self._graph
+
+    def _weights(self, rows: np.ndarray = None) -> sparse.csr_matrix:
+        """
+        Returns the normalized edge weights of the graph, including those of
+        the documents added as cliques, which are only expanded into pairs here.
+        :param rows: an integer array with the ids of the source authors whose
+        edges are returned, default all authors.
+        :return: a SciPy CSR matrix with a row for each of the source authors.
+        """
+
+        n_authors = len(self._authors)
+        matrix = _resize(self._matrix, n_authors)
+        if rows is not None:
+            matrix = matrix[rows]
+        if len(self._clique_weights) == 0:
+            return matrix
+
+        # row i of the cliques is the sum of w * (c - e_i) over the cliques c that contain i
+        incidence = _resize(self._cliques, n_authors, square=False)
+        incidence_t = incidence.T.tocsr()
+        if rows is None:
+            rows = np.arange(n_authors)
+        else:
+            incidence_t = incidence_t[rows]
+        weighted = incidence_t.dot(sparse.diags(self._clique_weights))
+        cliques = weighted.dot(incidence).tocoo()
+        # replace the self-edges, so that authors who appear once in each of their cliques have none
+        repeats = incidence_t.copy()
+        repeats.data = repeats.data * (repeats.data - 1)
+        self_weight = repeats.dot(self._clique_weights)
+        is_self = cliques.col == rows[cliques.row]
+        cliques.data[is_self] = self_weight[cliques.row[is_self]]
+        cliques = cliques.tocsr()
+        cliques.eliminate_zeros()
+
+        return (matrix + sparse.diags(1. / np.maximum(self._counts[rows], 1)).dot(cliques)).tocsr()
+
+    def _invalidate(self) -> None:
+        """
+        Clears the PageRank results computed for the current graph. Must be
+        called whenever the graph changes.
+        :return: None
+        """
+
+        self._rank_cache = dict()
+
+    def _extend_graph(self, authors_by_document: list, doc_index: int) -> int:
         """
         Creates the AuthorRank graph based on the relationships between the
-        authors and returns the created edges.
-        :param authors_by_document: a list of lists - a list of authors by document.
+        authors and returns the number of created edges.
+        :param authors_by_document: a list of lists - a list of author ids by document.
         :param doc_index: the integer position of the document to be processed.
-        :param progress_bar: a boolean indicating whether or not to use the progress bar.
-        :return: a list of edges based on the document's authorship.
+        :return: the number of edges based on the document's authorship.
         """
 
-        edge = None
+        n_edges = len(self._edges_all)
         if len(authors_by_document[doc_index]) > 1:
-            # author_ids = [tuple(d.values()) for d in self._author_list]
-            pairs = (list(itertools.permutations(authors_by_document[doc_index], 2)))
+            pairs = itertools.permutations(authors_by_document[doc_index], 2)
             # calculate g_i_j_k
             exclusivity = 1 / (len(authors_by_document[doc_index]) - 1)
-            edge = [{"edge": (x[0], x[1]), "weight": exclusivity} for x in pairs]
+            self._edges_all.extend(pairs, exclusivity)
         elif len(authors_by_document[doc_index]) == 1:
-            edge = [{"edge": (authors_by_document[doc_index][0], authors_by_document[doc_index][0]), "weight": 1}]
-
-        if edge is not None:
-            self._edges_all.extend(edge)
-
-        if progress_bar:
-            self._progress = emit_progress_bar(self._progress, doc_index + 1, int(len(authors_by_document) * 2.))
+            author = authors_by_document[doc_index][0]
+            self._edges_all.extend([(author, author)], 1.)
 
-        return edge
+        return len(self._edges_all) - n_edges
 
-    def _weigh_graph(self, groupby: itertools.groupby, progress_bar: bool, author_counts: Counter) -> None:
+    def _weigh_graph(self, groupby: tuple, author_counts: Counter) -> int:
         """
         Weighs the edges in the AuthorRank graph according to the approach outlined in the paper and
         updates a normalization dictionary.
-        :param groupby: An itertools.groupby object.
-        :param progress_bar: a boolean indicating whether or not to use the progress bar.
+        :param groupby: a (key, group) pair from an itertools.groupby object, where the key is a
+        (source, target) pair of author ids and the group contains positions in the edge arrays.
         :param author_counts: A collections Counter object that provides the document counts
-        for each author.
-        :return: None
+        for each author id.
+        :return: the number of edges in the group.
         """
 
         # normalize the edge weights and create the directed graph
-        v = groupby[1]
+        v = list(groupby[1])
         k = groupby[0]
+        weights = self._edges_all.weight
+        numerator = sum(weights[i] for i in v)
+        denominator = author_counts[k[0]]
+        self._normalized[k] = numerator / denominator
+
+        return len(v)
+
+    def _renormalize(self, rows: np.ndarray) -> None:
+        """
+        Recomputes the normalized edge weights of the given source authors by
+        dividing their summed exclusivity by their document counts, leaving the
+        weights of all other authors untouched.
+        :param rows: an integer array with the ids of the authors to be updated.
+        :return: None
+        """
+
+        n_authors = len(self._authors)
+        touched = np.zeros(n_authors, dtype=bool)
+        touched[rows] = True
+
+        kept = _resize(self._matrix, n_authors).tocoo()
+        kept_rows = ~touched[kept.row]
+        updated = self._numerators[rows].tocoo()
+        updated_rows = rows[updated.row]
+
+        self._matrix = sparse.csr_matrix(
+            (
+                np.concatenate([kept.data[kept_rows], updated.data / self._counts[updated_rows]]),
+                (np.concatenate([kept.row[kept_rows], updated_rows]), np.concatenate([kept.col[kept_rows], updated.col]))
+            ),
+            shape=(n_authors, n_authors)
+        )
+
+    def _fit_sparse(self, documents: Iterable[dict], authorship_key: str, keys: Iterable,
+                    reporter: Optional[ProgressReporter], total: int = None, n_jobs: int = 1, profile: Profile = None,
+                    subtract: bool = False) -> None:
+        """
+        Weighs the edges in the AuthorRank graph according to the approach outlined in the paper
+        using sparse matrix operations over integer author ids, rather than one Python object
+        per pair of co-authors. Documents are consumed in chunks of bounded size and added to any
+        previously fit documents, and only the edges of their authors are reweighed.
+        :param documents: an iterable of dictionaries which represent documents.
+        :param authorship_key: the key in the document which contains a list
+        of dictionaries representing authors.
+        :param keys: the keys to be used to create a UID for authors.
+        :param reporter: a ProgressReporter, or None.
+        :param total: the number of documents, if known, used by the progress reporter.
+        :param n_jobs: the number of processes across which chunks are processed.
+        :param profile: a Profile with a current run, or None.
+        :param subtract: a boolean to indicate whether or not to remove the documents
+        from the graph rather than add them.
+        :return: None
+        """
+
+        if reporter is not None:
+            reporter.start("documents", total)
         try:
-            v = list(v)  # need to reassign
-            numerator = sum(d["weight"] for d in list(v))
-            denominator = author_counts[k[0]]
-            self._normalized[k] = numerator / denominator
-        except TypeError:
-            # this occurs when an author is compared to one-self, which is
-            # not a valid scenario for the graph
-            pass
+            partial_sums = _sums(documents, authorship_key, keys, n_jobs, self._large_documents,
+                                 self._max_document_authors, profile)
+            self._apply_sums(partial_sums, reporter, profile, subtract)
+        finally:
+            # end the line of the progress bar, even when the graph is not fit
+            if reporter is not None:
+                reporter.close()
+
+    def _apply_sums(self, partial_sums: Iterable[tuple], reporter: Optional[ProgressReporter] = None,
+                    profile: Profile = None, subtract: bool = False) -> None:
+        """
+        Adds the partial sums of groups of documents, created by _partial_sums, to
+        the graph, or subtracts them, and reweighs the edges of their authors.
+        Authors left without documents after subtracting are removed from the graph.
+        :param partial_sums: an iterable of the tuples returned by _partial_sums.
+        :param reporter: a ProgressReporter, or None.
+        :param profile: a Profile with a current run, or None.
+        :param subtract: a boolean to indicate whether or not to subtract the sums.
+        :return: None
+        """
+
+        counts = np.zeros(len(self._authors), dtype=np.int64)
+        numerators = sparse.csr_matrix((len(self._authors), len(self._authors)))
+        cliques = list()
+        processed = 0
+        for uids, chunk_counts, chunk_numerators, n_documents, chunk_cliques in partial_sums:
+            with _phase(profile, "merge") as record:
+                # map the ids local to the chunk to ids in the author table, in order of appearance
+                if subtract:
+                    try:
+                        author_ids = self._authors.ids(uids).astype(np.int64)
+                    except KeyError as e:
+                        raise ValueError("Author %r of a removed document is not in the graph; only documents "
+                                         "that were added to the graph can be removed." % (e.args[0],))
+                else:
+                    author_ids = self._authors.intern_many(uids).astype(np.int64)
+                n_authors = len(self._authors)
 
-        if progress_bar:
-            self._progress = emit_progress_bar(self._progress, self._counter, self._gb_object_len, percent_offset=0.5)
+                # add up the document counts and summed exclusivity of the chunks
+                counts = np.concatenate([counts, np.zeros(n_authors - len(counts), dtype=np.int64)])
+                counts[author_ids] += chunk_counts
+                chunk_numerators = chunk_numerators.tocoo()
+                chunk_numerators = sparse.csr_matrix(
+                    (chunk_numerators.data, (author_ids[chunk_numerators.row], author_ids[chunk_numerators.col])),
+                    shape=(n_authors, n_authors)
+                )
+                numerators = _resize(numerators, n_authors) + chunk_numerators
+                record["items"] += chunk_numerators.nnz
 
-        self._counter += 1
+                # keep the cliques of the chunk's large documents
+                incidence, weights = chunk_cliques
+                if len(weights) > 0:
+                    incidence = sparse.csr_matrix(
+                        (incidence.data, author_ids[incidence.indices], incidence.indptr),
+                        shape=(len(weights), n_authors)
+                    )
+                    cliques.append((incidence, weights))
 
-    def fit(self, documents: List[dict], authorship_key: str = "authors",
-            keys: set = None, progress_bar: bool = False) -> 'nx.classes.digraph.DiGraph':
+            processed += n_documents
+            if reporter is not None:
+                reporter.update(processed)
 
+        with _phase(profile, "normalize") as record:
+            n_authors = len(self._authors)
+            numerators = _resize(numerators, n_authors)
+            cliques = [(_resize(incidence, n_authors, square=False), weights) for incidence, weights in cliques]
+            rows = np.flatnonzero(counts)
+            if subtract:
+                self._subtract_sums(counts, numerators, cliques)
+            else:
+                self._counts = np.concatenate([self._counts, np.zeros(n_authors - len(self._counts), dtype=np.int64)])
+                self._counts += counts
+                self._numerators = _resize(self._numerators, n_authors) + numerators
+                if cliques:
+                    self._cliques = sparse.vstack(
+                        [_resize(self._cliques, n_authors, square=False)] + [incidence for incidence, _ in cliques]
+                    ).tocsr()
+                    self._clique_weights = np.concatenate([self._clique_weights] + [weights for _, weights in cliques])
+
+            # divide by the document count of each source author whose edges changed
+            self._renormalize(rows)
+            if subtract:
+                # drop the authors left without documents, so that the graph is that of the remaining documents
+                self._drop_authors(self._counts > 0)
+            self._invalidate()
+            record["items"] += len(rows)
+
+        # a built graph still has the edges of removed documents, or of cliques, whose edges are not
+        # expanded until the graph is accessed, so it is rebuilt when it is next accessed
+        if len(self._clique_weights) > 0 or subtract:
+            self._graph = None
+
+        # a graph from which every document has been removed is empty, rather than fit
+        if subtract and len(self._authors) == 0:
+            self._is_fit = False
+            return
+
+        acceptable_author_count = check_author_count(self._authors)
+        if acceptable_author_count is False:
+            warnings.warn("Number of authors in document set must be greater than one. "
+                          "AuthorRank not fit to the data, please try again.", UserWarning)
+            self._is_fit = False
+            self._graph = None
+            return
+
+        # update the directed graph if it has been built
+        with _phase(profile, "build_graph") as record:
+            if self._graph is not None:
+                if self._is_fit:
+                    matrix = self._matrix[rows].tocoo()
+                    matrix.row = rows[matrix.row]
+                else:
+                    matrix = self._matrix.tocoo()
+                edge_list = zip(self._authors.uids(matrix.row), self._authors.uids(matrix.col), matrix.data.tolist())
+                self._graph.add_weighted_edges_from(edge_list)
+                record["items"] += matrix.nnz
+
+        if reporter is not None:
+            reporter.finish(processed)
+
+        self._is_fit = True
+
+    def _subtract_sums(self, counts: np.ndarray, numerators: sparse.csr_matrix, cliques: List[tuple]) -> None:
         """
-        Creates a directed graph object from the list of input documents which
-        are represented as dictionaries.
-        :param documents: a list of dictionaries which represent documents.
+        Subtracts the author document counts, summed exclusivity and cliques of
+        removed documents from those of the graph, checking that the documents
+        were added to the graph before changing it: no document count or summed
+        exclusivity may become negative, and every removed edge and clique must
+        be in the graph.
+        :param counts: an array with the document counts of the removed documents.
+        :param numerators: the summed exclusivity matrix of the removed documents.
+        :param cliques: a list of the incidence matrices and weights of the
+        removed cliques.
+        :return: None
+        """
+
+        remaining = self._counts - counts
+        if (remaining < 0).any():
+            raise ValueError("Only documents that were added to the graph can be removed.")
+
+        # documents that were never added may only have authors of the graph, but not all of their edges
+        difference = (self._numerators - numerators).tocsr()
+        removed_edges = abs(numerators) > _ZERO_TOLERANCE
+        missing_edges = removed_edges - removed_edges.multiply(abs(self._numerators) > _ZERO_TOLERANCE)
+        if (difference.data < -_ZERO_TOLERANCE).any() or missing_edges.count_nonzero() > 0:
+            raise ValueError("Only documents that were added to the graph can be removed.")
+
+        # a removed clique must match a clique of the graph, author for author
+        removed = list()
+        if cliques:
+            existing = dict()
+            for i, key in enumerate(_clique_keys(self._cliques)):
+                existing.setdefault(key, list()).append(i)
+            for key in _clique_keys(sparse.vstack([incidence for incidence, _ in cliques]).tocsr()):
+                if not existing.get(key):
+                    raise ValueError("Only documents that were added to the graph can be removed.")
+                removed.append(existing[key].pop())
+
+        self._counts = remaining
+        numerators = difference
+        numerators.data[np.abs(numerators.data) < _ZERO_TOLERANCE] = 0.
+        numerators.eliminate_zeros()
+        self._numerators = numerators
+        if removed:
+            keep = np.ones(len(self._clique_weights), dtype=bool)
+            keep[removed] = False
+            self._cliques = self._cliques[keep]
+            self._clique_weights = self._clique_weights[keep]
+
+    def _drop_authors(self, keep: np.ndarray) -> None:
+        """
+        Removes authors from the graph, renumbering the remaining authors in order.
+        The authors must not have any edges.
+        :param keep: a boolean array that is True for the authors to be kept.
+        :return: None
+        """
+
+        if keep.all():
+            return
+
+        author_ids = np.flatnonzero(keep)
+        n_authors = len(keep)
+        self._authors = self._authors.subset(author_ids)
+        self._counts = self._counts[author_ids]
+        self._numerators = _resize(self._numerators, n_authors)[author_ids][:, author_ids]
+        self._matrix = _resize(self._matrix, n_authors)[author_ids][:, author_ids]
+        self._cliques = _resize(self._cliques, n_authors, square=False)[:, author_ids]
+        if self._last_scores is not None:
+            # dropped authors leave the previous scores, and new authors start with their mean
+            last_scores = np.full(n_authors, np.nan)
+            n_scored = min(len(self._last_scores), n_authors)
+            last_scores[:n_scored] = self._last_scores[:n_scored]
+            self._last_scores = last_scores[author_ids]
+
+    def _fit_python(self, doc_authors_tuples: list, reporter: Optional[ProgressReporter],
+                    profile: Profile = None) -> None:
+        """
+        Weighs the edges in the AuthorRank graph according to the approach outlined in the paper
+        by generating, sorting and grouping one edge per ordered pair of co-authors.
+        :param doc_authors_tuples: a list of lists - a list of author UIDs by document.
+        :param reporter: a ProgressReporter, or None.
+        :param profile: a Profile with a current run, or None.
+        :return: None
+        """
+
+        try:
+            # map each author to an integer id and get overall counts of each author
+            with _phase(profile, "count_authors") as record:
+                doc_author_ids = [[self._authors.intern(author) for author in doc] for doc in doc_authors_tuples]
+                counts = Counter(itertools.chain.from_iterable(doc_author_ids))
+                record["items"] += sum(counts.values())
+            acceptable_author_count = check_author_count(counts)
+            if acceptable_author_count is False:
+                warnings.warn("Number of authors in document set must be greater than one. "
+                              "AuthorRank not fit to the data, please try again.", UserWarning)
+            else:
+                # process each document, create the edges with the appropriate weights
+                if reporter is not None:
+                    reporter.start("documents", len(doc_author_ids), span=0.5)
+                with _phase(profile, "extend_graph") as record:
+                    for doc in range(0, len(doc_author_ids)):
+                        record["items"] += self._extend_graph(doc_author_ids, doc)
+                        if reporter is not None:
+                            reporter.update(doc + 1)
+
+                # sort the edges for processing
+                with _phase(profile, "sort") as record:
+                    src, dst = self._edges_all.src, self._edges_all.dst
+                    edges_all_sorted = sorted(range(len(self._edges_all)), key=lambda i: (src[i], dst[i]))
+                    gb_object = itertools.groupby(edges_all_sorted, key=lambda i: (src[i], dst[i]))
+                    record["items"] += len(edges_all_sorted)
+
+                # progress is tracked in edges, as the number of groups is not known in advance
+                if reporter is not None:
+                    reporter.finish()
+                    reporter.start("edges", len(edges_all_sorted), offset=0.5, span=0.5)
+                weighed = 0
+                with _phase(profile, "weigh_graph") as record:
+                    for k, v in gb_object:
+                        weighed += self._weigh_graph((k, v), counts)
+                        if reporter is not None:
+                            reporter.update(weighed)
+                    record["items"] += len(self._normalized)
+
+                # keep the sparse representation of the graph used for scoring
+                n_authors = len(self._authors)
+                self._counts = np.array([counts[i] for i in range(n_authors)], dtype=np.int64)
+                self._matrix = sparse.csr_matrix(
+                    (
+                        list(self._normalized.values()),
+                        ([k[0] for k in self._normalized], [k[1] for k in self._normalized])
+                    ),
+                    shape=(n_authors, n_authors)
+                )
+                self._numerators = sparse.diags(self._counts.astype(float)).dot(self._matrix).tocsr()
+
+                if reporter is not None:
+                    reporter.finish()
+
+                self._is_fit = True
+        finally:
+            # end the line of the progress bar, even when the graph is not fit
+            if reporter is not None:
+                reporter.close()
+
+    def fit(self, documents: Iterable[dict], authorship_key: str = "authors",
+            keys: Iterable[str] = None, progress_bar: Union[bool, Callable, ProgressReporter] = False,
+            engine: str = "sparse", n_jobs: int = 1, profile: Profile = None,
+            large_documents: str = "expand", max_document_authors: int = 500,
+            hash_uids: bool = False, build_graph: bool = True) -> Optional['nx.classes.digraph.DiGraph']:
+
+        """
+        Creates a directed graph object from the input documents which are
+        represented as dictionaries. With the sparse engine, the documents are
+        consumed one at a time and may be provided by any iterable, such as a
+        generator or read_documents.
+        :param documents: an iterable of dictionaries which represent documents.
         :param authorship_key: the key in the document which contains a list
         of dictionaries representing authors.
-        :param keys: a set that contains the keys to be used to create a UID
-        for authors.
+        :param keys: the keys to be used to create a UID for authors. The values
+        of a set are taken in sorted order, those of a list or tuple in the order
+        given. The documents are not modified.
         :param progress_bar: a boolean that indicates whether or not a progress
-        bar should be emitted, default False.
-        :return: a NetworkX DiGraph object.
+        bar should be emitted, default False. A function may be given instead,
+        which is called with the name of the stage, the number of items done and
+        the total number of items (None if unknown), or a ProgressReporter to
+        control how often progress is reported.
+        :param engine: the approach used to weigh the edges of the graph, either
+        "sparse" (default), which accumulates the edge weights in a SciPy sparse
+        matrix, or "python", which creates, sorts and groups one edge per ordered
+        pair of co-authors.
+        :param n_jobs: the number of processes across which the sparse engine
+        expands and sums co-author pairs, default 1. -1 uses all CPUs. The
+        results are identical to those of a single process.
+        :param profile: an optional Profile in which the time spent in each
+        phase of fitting is recorded.
+        :param large_documents: how the sparse engine handles documents with more
+        than max_document_authors authors, such as consortium papers: "expand"
+        (default) expands them into every pair of co-authors like any other
+        document, "clique" adds their contribution to the graph exactly, in
+        closed form, without expanding them into pairs, and "sample" links each
+        of their authors to a random sample of max_document_authors - 1
+        co-authors, such that the expected weight of each edge is exact.
+        :param max_document_authors: the number of authors above which a document
+        is handled according to large_documents, default 500.
+        :param hash_uids: a boolean to indicate whether or not to keep the author
+        UIDs of the sparse engine in a HashedAuthorTable, which hashes them to
+        64-bit keys and stores each distinct author in tens of bytes, rather than
+        as a tuple and a dictionary entry, for very large author pools. Looking
+        up authors by UID, such as for personalization, is slower. Default False.
+        :param build_graph: a boolean to indicate whether or not to build and
+        return the NetworkX graph, default True. Without it, the graph is only
+        built if the graph attribute is accessed, which saves the time and
+        memory of a NetworkX graph when only scores are needed.
+        :return: a NetworkX DiGraph object, or None if build_graph is False.
         """
 
+        if engine not in ENGINES:
+            raise ValueError("engine must be one of %s, got %r." % (", ".join(ENGINES), engine))
+        n_jobs = _effective_n_jobs(n_jobs)
+        if engine != "sparse" and n_jobs != 1:
+            raise ValueError("n_jobs is only supported by the sparse engine.")
+        _check_large_documents(large_documents, max_document_authors)
+        if engine != "sparse" and large_documents != "expand":
+            raise ValueError("large_documents is only supported by the sparse engine.")
+        if engine != "sparse" and hash_uids:
+            raise ValueError("hash_uids is only supported by the sparse engine.")
+
+        # discard any previously fit documents
+        self._reset()
+        if hash_uids:
+            self._authors = HashedAuthorTable()
+        self._large_documents = large_documents
+        self._max_document_authors = max_document_authors
+
         # if keys are not provided, set a default
         # see https://florimond.dev/blog/articles/2018/08/python-mutable-defaults-are-the-source-of-all-evil/
         if keys is None:
             keys = {"first_name", "last_name"}
+        self._authorship_key = authorship_key
+        self._keys = keys
 
-        # get the authorship from each of the documents
-        # gets a list of lists
-        doc_authors = [i[authorship_key] for i in documents]
+        total = len(documents) if isinstance(documents, Sized) else None
 
+        with _run(profile, "fit"):
+            if engine == "sparse":
+                self._fit_sparse(documents, authorship_key, keys, _progress_reporter(progress_bar), total, n_jobs,
+                                 profile)
+            else:
+                with _phase(profile, "extract_uids") as record:
+                    doc_authors_tuples = list(_author_uids(documents, authorship_key, keys))
+                    record["items"] += len(doc_authors_tuples)
+                self._fit_python(doc_authors_tuples, _progress_reporter(progress_bar), profile)
+            if build_graph:
+                return self._build_graph(profile)
 
-        # remove keys and values that are not used as part of an author UID
-        for doc in doc_authors:
-            for author in doc:
-                unwanted_keys = set(author) - set(keys)
-                for unwanted_key in unwanted_keys:
-                    del author[unwanted_key]
+    def partial_fit(self, documents: Iterable[dict], authorship_key: str = None,
+                    keys: Iterable[str] = None, progress_bar: Union[bool, Callable, ProgressReporter] = False,
+                    n_jobs: int = 1, profile: Profile = None, large_documents: str = None,
+                    max_document_authors: int = None,
+                    build_graph: bool = True) -> Optional['nx.classes.digraph.DiGraph']:
+        """
+        Adds a list of input documents to the directed graph, updating the
+        document counts of their authors and the summed exclusivity of their
+        edges, and reweighing only the edges of their authors. Fitting documents
+        A and then partially fitting documents B results in the same graph as
+        fitting A and B together.
+        :param documents: a list of dictionaries which represent documents.
+        :param authorship_key: the key in the document which contains a list
+        of dictionaries representing authors, default the key used in fit.
+        :param keys: the keys to be used to create a UID for authors, default
+        the keys used in fit.
+        :param progress_bar: a boolean that indicates whether or not a progress
+        bar should be emitted, default False. A function may be given instead,
+        which is called with the name of the stage, the number of items done and
+        the total number of items (None if unknown), or a ProgressReporter to
+        control how often progress is reported.
+        :param n_jobs: the number of processes across which co-author pairs are
+        expanded and summed, default 1. -1 uses all CPUs.
+        :param profile: an optional Profile in which the time spent in each
+        phase of fitting is recorded.
+        :param large_documents: how documents with more than max_document_authors
+        authors are handled, default the policy used in fit.
+        :param max_document_authors: the number of authors above which a document
+        is large, default the number used in fit.
+        :param build_graph: a boolean to indicate whether or not to build, if it
+        has yet to be, and return the NetworkX graph, default True.
+        :return: a NetworkX DiGraph object, or None if build_graph is False.
+        """
 
-        # create a UID for each author based on the remaining keys
-        doc_authors_tuples = [[tuple(d.values()) for d in doc] for doc in doc_authors]
-        # unique combination of key values will serve as keys for each author
-        # self._author_list = list(itertools.chain.from_iterable(doc_authors))
+        n_jobs = _effective_n_jobs(n_jobs)
+        if large_documents is None:
+            large_documents = self._large_documents
+        if max_document_authors is None:
+            max_document_authors = self._max_document_authors
+        _check_large_documents(large_documents, max_document_authors)
+        self._large_documents = large_documents
+        self._max_document_authors = max_document_authors
+        if authorship_key is None:
+            authorship_key = self._authorship_key
+        if keys is None:
+            keys = self._keys if self._keys is not None else {"first_name", "last_name"}
+        self._authorship_key = authorship_key
+        self._keys = keys
 
-        # author_uid_tuples = [tuple(d.values()) for d in self._author_list]
-        # get overall counts of each author
-        author_list = list(itertools.chain.from_iterable(doc_authors_tuples))
-        counts = Counter(author_list)
-        acceptable_author_count = check_author_count(counts)
-        if acceptable_author_count is False:
-            warnings.warn("Number of authors in document set must be greater than one. "
-                          "AuthorRank not fit to the data, please try again.", UserWarning)
-        else:
-            # process each document, create the edges with the appropriate weights
-            for doc in range(0, len(doc_authors)):
-                self._extend_graph(doc_authors_tuples, doc, progress_bar)
+        total = len(documents) if isinstance(documents, Sized) else None
+        with _run(profile, "partial_fit"):
+            self._fit_sparse(documents, authorship_key, keys, _progress_reporter(progress_bar), total, n_jobs,
+                             profile)
+            if build_graph:
+                return self._build_graph(profile)
 
-            # sort the edges for processing
-            edges_all_sorted = sorted(self._edges_all, key=lambda x: str(x["edge"]))
-            gb_object = itertools.groupby(edges_all_sorted, key=lambda x: x["edge"])
+    def remove_documents(self, documents: Iterable[dict], progress_bar: Union[bool, Callable, ProgressReporter] = False,
+                         n_jobs: int = 1, profile: Profile = None) -> None:
+        """
+        Removes documents that were added with fit or partial_fit from the
+        graph, subtracting their authors' document counts and the exclusivity
+        of their edges, and reweighing only the edges of their authors. Authors
+        left without documents are removed from the graph. Fitting documents A
+        and B and then removing documents B results in the same graph as
+        fitting A, such as when a window of documents slides forward in time.
+        The authorship key, keys and large document policy used to add the
+        documents are used to remove them.
+        :param documents: an iterable of dictionaries which represent documents.
+        :param progress_bar: a boolean that indicates whether or not a progress
+        bar should be emitted, default False. A function may be given instead,
+        which is called with the name of the stage, the number of items done and
+        the total number of items (None if unknown), or a ProgressReporter to
+        control how often progress is reported.
+        :param n_jobs: the number of processes across which co-author pairs are
+        expanded and summed, default 1. -1 uses all CPUs.
+        :param profile: an optional Profile in which the time spent in each
+        phase of removing the documents is recorded.
+        :return: None
+        """
 
-            self._counter = 0
-            self._gb_object_len = sum(1 for x in copy.deepcopy(gb_object))
+        n_jobs = _effective_n_jobs(n_jobs)
+        keys = self._keys if self._keys is not None else {"first_name", "last_name"}
+        total = len(documents) if isinstance(documents, Sized) else None
+        with _run(profile, "remove_documents"):
+            self._fit_sparse(documents, self._authorship_key, keys, _progress_reporter(progress_bar), total, n_jobs,
+                             profile, subtract=True)
 
-            for k, v in gb_object:
-                self._weigh_graph((k, v), progress_bar, counts)
+    def _scoring_matrix(self) -> Tuple[sparse.csr_matrix, Optional[tuple]]:
+        """
+        Returns the matrix that PageRank is run on and the cliques, if any,
+        that are added to it in closed form.
+        :return: a tuple which contains a SciPy CSR matrix and either None or a
+        tuple of a clique incidence matrix and the weight of each clique.
+        """
 
-            # create the directed graph
-            edge_list = [(k[0], k[1], v) for k, v in self._normalized.items()]
-            self.graph.add_weighted_edges_from(edge_list)
+        if len(self._clique_weights) > 0:
+            # the document counts of authors cancel out, so the summed exclusivity is scored directly
+            incidence = _resize(self._cliques, len(self._authors), square=False)
+            return self._numerators, (incidence, self._clique_weights)
 
-            self._is_fit = True
+        return self._matrix, None
 
-        return self.graph
+    def _rank(self, alpha: float, personalization: dict, max_iter: int, tol: float, warm: bool = False,
+              profile: Profile = None) -> dict:
+        """
+        Returns the PageRank scores of the graph for a set of PageRank parameters,
+        computing them only if they have not been computed since the graph last
+        changed.
+        :param alpha: the PageRank damping parameter.
+        :param personalization: a dictionary keyed by author UID with teleport
+        weights, or None for uniform weights.
+        :param max_iter: the maximum number of PageRank power iterations.
+        :param tol: the PageRank error tolerance used to check convergence.
+        :param warm: a boolean to indicate whether or not to start from the scores
+        of the previous scoring run.
+        :param profile: a Profile with a current run, or None.
+        :return: a dictionary with the array of scores, in author id order, and
+        once computed, the order of all of the scores.
+        """
+
+        key = _rank_key(alpha, personalization, max_iter, tol)
+        cached = self._rank_cache.get(key)
+        with _phase(profile, "pagerank") as record:
+            if cached is None:
+                vector = None
+                if personalization is not None:
+                    vector = np.zeros(len(self._authors))
+                    for author, weight in personalization.items():
+                        if author in self._authors:
+                            vector[self._authors.get(author)] = weight
+                nstart = None
+                if warm and self._last_scores is not None:
+                    nstart = start_vector(self._last_scores, len(self._authors))
+                matrix, cliques = self._scoring_matrix()
+                rank, convergence = pagerank(matrix, alpha=alpha, personalization=vector, max_iter=max_iter,
+                                             tol=tol, nstart=nstart, full_output=True, cliques=cliques)
+                cached = self._rank_cache[key] = {"rank": rank, "order": None, "convergence": convergence}
+                self._last_scores = rank
+                record["cached"] = False
+            else:
+                record["cached"] = True
+            # cached scores report the convergence of the run that computed them
+            record.update(cached["convergence"])
+            record["items"] += len(cached["rank"])
 
-    def top_authors(self, n: int = 10, normalize_scores: bool = False) -> Tuple[List, List]:
+        return cached
+
+    def top_authors(self, n: int = 10, normalize_scores: bool = False, alpha: float = 0.85,
+                    personalization: dict = None, max_iter: int = 100, tol: float = 1.0e-6,
+                    warm_start: bool = False, profile: Profile = None) -> Tuple[List, List]:
         """
         Calculates the top N authors in an AuthorRank graph and returns them
-        in sorted order.
+        in sorted order. Scores are computed by power iteration directly on the
+        sparse adjacency matrix of the graph, and are cached until the graph
+        changes.
         :param n: an integer to specify the maximum number of authors to be
         returned.
         :param normalize_scores: a boolean to indicate whether or not to normalize
         the scores between 0 and 1.
+        :param alpha: the PageRank damping parameter.
+        :param personalization: a dictionary keyed by author UID with teleport
+        weights, default uniform.
+        :param max_iter: the maximum number of PageRank power iterations.
+        :param tol: the PageRank error tolerance used to check convergence.
+        :param warm_start: a boolean to indicate whether or not to start PageRank
+        from the scores of the previous scoring run, such as before a call to
+        partial_fit. Authors added since then start with the mean previous score.
+        :param profile: an optional Profile in which the time spent computing and
+        selecting the scores, and the PageRank iterations and final residual,
+        are recorded.
         :return: a tuple which contains two lists, one for authors and the other
         for their scores.
         """
@@ -166,17 +1259,332 @@ class Graph:
             return list(), list()
 
         else:
-            top_authors, top_scores = top(self.graph, n=n, normalize_scores=normalize_scores)
+            with _run(profile, "top_authors"):
+                cached = self._rank(alpha, personalization, max_iter, tol, warm_start, profile)
+                with _phase(profile, "select_top") as record:
+                    top_authors, top_scores = select_top(
+                        cached["rank"], self._authors, n=n, normalize_scores=normalize_scores, order=cached["order"]
+                    )
+                    record["items"] += len(top_authors)
 
             return top_authors, top_scores
 
+    def scores(self, alpha: float = 0.85, personalization: dict = None,
+               max_iter: int = 100, tol: float = 1.0e-6, warm_start: bool = False,
+               profile: Profile = None) -> Tuple[List, List]:
+        """
+        Returns the full ranking of the authors in an AuthorRank graph, in sorted
+        order. The ranking is cached until the graph changes, after which calls to
+        top_authors with the same PageRank parameters only slice it.
+        :param alpha: the PageRank damping parameter.
+        :param personalization: a dictionary keyed by author UID with teleport
+        weights, default uniform.
+        :param max_iter: the maximum number of PageRank power iterations.
+        :param tol: the PageRank error tolerance used to check convergence.
+        :param warm_start: a boolean to indicate whether or not to start PageRank
+        from the scores of the previous scoring run, such as before a call to
+        partial_fit. Authors added since then start with the mean previous score.
+        :param profile: an optional Profile in which the time spent computing and
+        selecting the scores, and the PageRank iterations and final residual,
+        are recorded.
+        :return: a tuple which contains two lists, one for authors and the other
+        for their scores.
+        """
+
+        if self._is_fit is False:
+            warnings.warn("AuthorRank must first be fit on a set of documents "
+                          "prior to calling scores.", UserWarning)
+            return list(), list()
+
+        with _run(profile, "scores"):
+            cached = self._rank(alpha, personalization, max_iter, tol, warm_start, profile)
+            with _phase(profile, "select_top") as record:
+                if cached["order"] is None:
+                    cached["order"] = top_n(cached["rank"], len(cached["rank"]))
+                ranking = select_top(cached["rank"], self._authors, n=len(cached["rank"]), order=cached["order"])
+                record["items"] += len(cached["rank"])
+
+        return ranking
+
+    def personalized_top_authors(self, personalizations: Iterable[Union[dict, Iterable]], n: int = 10,
+                                 normalize_scores: bool = False, alpha: float = 0.85, max_iter: int = 100,
+                                 tol: float = 1.0e-6, profile: Profile = None) -> List[Tuple[List, List]]:
+        """
+        Calculates the top N authors of the graph for many personalizations at
+        once, such as the prestige of authors relative to each of several sets
+        of seed authors or topics. The personalizations are scored in blocks by
+        a single power iteration over the transition matrix of the graph, rather
+        than one PageRank run each, and their scores are cached, so that calling
+        top_authors with one of them returns its cached scores.
+        :param personalizations: an iterable of personalizations, each either a
+        dictionary keyed by author UID with teleport weights, or an iterable of
+        seed author UIDs, which are weighted equally.
+        :param n: an integer to specify the maximum number of authors to be
+        returned for each personalization.
+        :param normalize_scores: a boolean to indicate whether or not to normalize
+        the scores between 0 and 1.
+        :param alpha: the PageRank damping parameter.
+        :param max_iter: the maximum number of PageRank power iterations.
+        :param tol: the PageRank error tolerance used to check convergence.
+        :param profile: an optional Profile in which the time spent computing and
+        selecting the scores is recorded.
+        :return: a list with a tuple for each personalization, which contains
+        two lists, one for authors and the other for their scores.
+        Personalizations without any author of the graph have no top authors.
+        """
+
+        personalizations = [p if isinstance(p, dict) else dict.fromkeys(p, 1.) for p in personalizations]
+        if self._is_fit is False:
+            warnings.warn("AuthorRank must first be fit on a set of documents "
+                          "prior to calling personalized_top_authors.", UserWarning)
+            return [(list(), list()) for _ in personalizations]
+
+        with _run(profile, "personalized_top_authors"):
+            with _phase(profile, "pagerank") as record:
+                # the teleport weights of each personalization that has not been scored yet
+                keys = [_rank_key(alpha, p, max_iter, tol) for p in personalizations]
+                vectors, unknown = dict(), 0
+                for key, personalization in zip(keys, personalizations):
+                    if key in self._rank_cache or key in vectors:
+                        continue
+                    ids = [self._authors.get(author) for author in personalization]
+                    weights = {i: w for i, w in zip(ids, personalization.values()) if i is not None and w != 0}
+                    if not weights:
+                        unknown += 1
+                        continue
+                    vectors[key] = weights
+
+                pending = list(vectors)
+                matrix, cliques = self._scoring_matrix()
+                for start in range(0, len(pending), PERSONALIZATION_BLOCK):
+                    block = pending[start:start + PERSONALIZATION_BLOCK]
+                    p = np.zeros((len(self._authors), len(block)))
+                    for column, key in enumerate(block):
+                        p[list(vectors[key]), column] = list(vectors[key].values())
+                    rank, convergence = pagerank_many(matrix, p, alpha=alpha, max_iter=max_iter, tol=tol,
+                                                      full_output=True, cliques=cliques)
+                    for column, key in enumerate(block):
+                        self._rank_cache[key] = {
+                            "rank": np.ascontiguousarray(rank[:, column]), "order": None,
+                            "convergence": convergence[column]
+                        }
+                    record["items"] += rank.size
+                record["cached"] = len(keys) - len(pending)
+
+            with _phase(profile, "select_top") as record:
+                results = list()
+                for key in keys:
+                    cached = self._rank_cache.get(key)
+                    if cached is None:
+                        results.append((list(), list()))
+                        continue
+                    results.append(select_top(cached["rank"], self._authors, n=n, normalize_scores=normalize_scores,
+                                              order=cached["order"]))
+                    record["items"] += len(results[-1][0])
+
+        if unknown > 0:
+            warnings.warn("%d personalizations have no authors in the graph and were not scored." % unknown,
+                          UserWarning)
+
+        return results
+
+    def save(self, path: str) -> None:
+        """
+        Saves the graph to a binary file, from which it can be loaded without
+        refitting. The file holds the CSR arrays of the normalized and summed
+        edge weights and of the cliques of large documents, the document count
+        of each author, a string table of
+        the author UIDs and any cached PageRank scores computed without
+        personalization.
+        :param path: the path to the file.
+        :return: None
+        """
+
+        offsets, encoded = self._authors.encode()
+        arrays = {
+            "counts": self._counts,
+            "uid_offsets": offsets,
+            "uids": encoded,
+        }
+        cliques = _resize(self._cliques, len(self._authors), square=False)
+        arrays["clique_weights"] = self._clique_weights
+        for name, matrix in (("matrix", self._matrix), ("numerators", self._numerators), ("cliques", cliques)):
+            if name != "cliques":
+                matrix = _resize(matrix, len(self._authors))
+            arrays.update({name + "_indptr": matrix.indptr, name + "_indices": matrix.indices, name + "_data": matrix.data})
+
+        ranks = list()
+        for (alpha, max_iter, tol, personalization), cached in self._rank_cache.items():
+            if personalization is not None:
+                continue
+            name = "rank_%d" % len(ranks)
+            arrays[name] = cached["rank"]
+            if cached["order"] is not None:
+                arrays[name + "_order"] = cached["order"]
+            ranks.append({"alpha": alpha, "max_iter": max_iter, "tol": tol, "name": name,
+                          "convergence": cached["convergence"]})
+        if self._last_scores is not None:
+            arrays["last_scores"] = self._last_scores
+
+        keys = self._keys
+        header = {
+            "is_fit": self._is_fit,
+            "n_authors": len(self._authors),
+            "authorship_key": self._authorship_key,
+            "keys": None if keys is None else _key_order(keys),
+            "ordered_keys": not isinstance(keys, (set, frozenset)),
+            "large_documents": self._large_documents,
+            "max_document_authors": self._max_document_authors,
+            "hash_uids": isinstance(self._authors, HashedAuthorTable),
+            "ranks": ranks,
+        }
+        write_arrays(path, header, arrays)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'Graph':
+        """
+        Loads a graph saved with save. Scores can be computed, or served from the
+        saved PageRank scores, as soon as the graph is loaded: the author UIDs
+        are decoded as they are returned and the NetworkX graph is only built
+        if the graph attribute is accessed.
+        :param path: the path to the file.
+        :param mmap: a boolean to indicate whether or not to memory-map the
+        arrays read-only rather than read them into memory, so that several
+        processes that load the same file share one copy, default True.
+        :return: a Graph object.
+        """
+
+        header, arrays = read_arrays(path, mmap=mmap)
+        n_authors = header["n_authors"]
+
+        ar_graph = cls()
+        ar_graph._graph = None
+        ar_graph._is_fit = header["is_fit"]
+        ar_graph._authorship_key = header["authorship_key"]
+        keys = header["keys"]
+        ar_graph._keys = keys if keys is None or header["ordered_keys"] else set(keys)
+        table = HashedAuthorTable if header.get("hash_uids", False) else AuthorTable
+        ar_graph._authors = table.from_encoded(arrays["uid_offsets"], arrays["uids"])
+        ar_graph._counts = arrays["counts"]
+        ar_graph._matrix, ar_graph._numerators = (
+            sparse.csr_matrix(
+                (arrays[name + "_data"], arrays[name + "_indices"], arrays[name + "_indptr"]),
+                shape=(n_authors, n_authors), copy=False
+            )
+            for name in ("matrix", "numerators")
+        )
+
+        ar_graph._large_documents = header["large_documents"]
+        ar_graph._max_document_authors = header["max_document_authors"]
+        ar_graph._clique_weights = arrays["clique_weights"]
+        ar_graph._cliques = sparse.csr_matrix(
+            (arrays["cliques_data"], arrays["cliques_indices"], arrays["cliques_indptr"]),
+            shape=(len(ar_graph._clique_weights), n_authors), copy=False
+        )
+
+        for rank in header["ranks"]:
+            ar_graph._rank_cache[(rank["alpha"], rank["max_iter"], rank["tol"], None)] = {
+                "rank": arrays[rank["name"]],
+                "order": arrays.get(rank["name"] + "_order"),
+                "convergence": rank["convergence"],
+            }
+        ar_graph._last_scores = arrays.get("last_scores")
+
+        return ar_graph
+
     def as_json(self) -> dict:
         """
         Returns the directed graph in JSON format, containing information
         about nodes and their relationships to one another in the form of edges.
-        A wrapper around the NetworkX functionality.
+        Follows the NetworkX node-link format.
         :return: a JSON format for the provided graph
         """
 
-        return nx.readwrite.json_graph.node_link_data(self.graph)
+        nodes, links = list(), list()
+        if self._is_fit:
+            # translate author ids to UIDs only in the output
+            authors = self._authors
+            matrix = self._weights().tocoo()
+            nodes = [{"id": author} for author in authors]
+            links = [
+                {"weight": w, "source": authors[u], "target": authors[v]}
+                for u, v, w in zip(matrix.row.tolist(), matrix.col.tolist(), matrix.data.tolist())
+            ]
+
+        return {"directed": True, "multigraph": False, "graph": {}, "nodes": nodes, "links": links}
+
+    def write_json(self, f: TextIO, scores: bool = False, normalize_scores: bool = False, n: int = None,
+                   alpha: float = 0.85, personalization: dict = None, max_iter: int = 100,
+                   tol: float = 1.0e-6) -> None:
+        """
+        Writes the directed graph to a file-like object in the same NetworkX
+        node-link format as as_json, one node and one author's links at a time,
+        so that the graph is never held in memory as a dictionary or string.
+        :param f: a file-like object opened for writing text.
+        :param scores: a boolean to indicate whether or not to add the AuthorRank
+        score of each author to its node as "score".
+        :param normalize_scores: a boolean to indicate whether or not to normalize
+        the scores of the written authors between 0 and 1.
+        :param n: if provided, only the top n authors are written, in sorted order,
+        along with the links between them.
+        :param alpha: the PageRank damping parameter.
+        :param personalization: a dictionary keyed by author UID with teleport
+        weights, default uniform.
+        :param max_iter: the maximum number of PageRank power iterations.
+        :param tol: the PageRank error tolerance used to check convergence.
+        :return: None
+        """
+
+        # an empty graph is written, without scores, if AuthorRank has not been fit
+        authors = self._authors
+        rank = None
+        if not self._is_fit:
+            if scores or n is not None:
+                warnings.warn("AuthorRank must first be fit on a set of documents "
+                              "prior to writing scores or top authors.", UserWarning)
+            scores = False
+            selected = np.zeros(0, dtype=np.int64)
+        else:
+            if scores or n is not None:
+                rank = self._rank(alpha, personalization, max_iter, tol)["rank"]
+            selected = top_n(rank, n) if n is not None else np.arange(len(authors))
+
+        f.write('{"directed": true, "multigraph": false, "graph": {}, "nodes": [')
+
+        if scores:
+            written = rank[selected]
+            if normalize_scores and len(written) > 0:
+                minimum, maximum = written.min(), written.max()
+                written = (written - minimum) / (maximum - minimum) if maximum > minimum else np.ones(len(written))
+
+        for i, author_id in enumerate(selected.tolist()):
+            node = {"id": authors[author_id]}
+            if scores:
+                node["score"] = float(written[i])
+            f.write((", " if i else "") + json.dumps(node))
+
+        f.write('], "links": [')
+
+        # write the links of each author in id order, as in as_json, a block of authors at a time
+        is_selected = np.zeros(len(authors), dtype=bool)
+        is_selected[selected] = True
+        rows = np.flatnonzero(is_selected)
+        separator = ""
+        for offset in range(0, len(rows), WRITE_BLOCK):
+            block = rows[offset:offset + WRITE_BLOCK]
+            matrix = self._weights(block)
+            for i, row in enumerate(block.tolist()):
+                start, end = matrix.indptr[i], matrix.indptr[i + 1]
+                cols, weights = matrix.indices[start:end], matrix.data[start:end]
+                keep = is_selected[cols]
+                if not keep.any():
+                    continue
+                source = json.dumps(authors[row])
+                links = [
+                    '{"weight": %s, "source": %s, "target": %s}' % (json.dumps(w), source, json.dumps(authors[col]))
+                    for col, w in zip(cols[keep].tolist(), weights[keep].tolist())
+                ]
+                f.write(separator + ", ".join(links))
+                separator = ", "
 
+        f.write("]}")
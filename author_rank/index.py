@@ -0,0 +1,323 @@
+# imports
+import array
+import bisect
+from author_rank.graph import Graph
+from author_rank.score import top_n
+from author_rank.utils import normalize_name
+import numpy as np
+from scipy import sparse
+from typing import Hashable, Iterable, List, Tuple
+import warnings
+
+
+def _ranking(ar_graph: Graph, index: str, alpha: float, personalization: dict, max_iter: int,
+             tol: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the cached AuthorRank scores of a graph and the order of its
+    authors from highest to lowest score, warning if the graph is not fit.
+    :param ar_graph: a Graph.
+    :param index: the name of the index being created, for the warning.
+    :param alpha: the PageRank damping parameter.
+    :param personalization: a dictionary keyed by author UID with teleport
+    weights, default uniform.
+    :param max_iter: the maximum number of PageRank power iterations.
+    :param tol: the PageRank error tolerance used to check convergence.
+    :return: a tuple which contains an array of scores and an array of author
+    ids, both empty if the graph is not fit.
+    """
+
+    if not ar_graph._is_fit:
+        warnings.warn("AuthorRank must first be fit on a set of documents "
+                      "prior to creating an %s." % index, UserWarning)
+        return np.zeros(0), np.zeros(0, dtype=np.int64)
+
+    cached = ar_graph._rank(alpha, personalization, max_iter, tol)
+    if cached["order"] is None:
+        cached["order"] = top_n(cached["rank"], len(cached["rank"]))
+
+    return cached["rank"], cached["order"]
+
+
+def _trigrams(name: str) -> set:
+    """
+    Returns the trigrams of a normalized name, padded with spaces so that the
+    first and last letters of the name form trigrams of their own.
+    :param name: a normalized name.
+    :return: a set of three-character strings.
+    """
+
+    padded = "  %s " % name
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AuthorIndex:
+    """
+    An index of a fitted AuthorRank graph for looking up the rank, score and
+    strongest collaborators of authors by UID in constant time, one author or
+    many at a time. The index is a snapshot: it should be rebuilt after the
+    graph is updated with partial_fit.
+    :param ar_graph: a fitted Graph.
+    :param alpha: the PageRank damping parameter.
+    :param personalization: a dictionary keyed by author UID with teleport
+    weights, default uniform.
+    :param max_iter: the maximum number of PageRank power iterations.
+    :param tol: the PageRank error tolerance used to check convergence.
+    """
+
+    def __init__(self, ar_graph: Graph, alpha: float = 0.85, personalization: dict = None,
+                 max_iter: int = 100, tol: float = 1.0e-6):
+        self._authors = ar_graph._authors
+        self._scores, order = _ranking(ar_graph, "AuthorIndex", alpha, personalization, max_iter, tol)
+        n_authors = len(self._scores)
+
+        # the rank of each author id, starting at 1
+        self._ranks = np.zeros(n_authors, dtype=np.int64)
+        if n_authors > 0:
+            self._ranks[order] = np.arange(1, n_authors + 1)
+
+        # the normalized edge weights of each author, without self-edges, sorted in descending
+        # order of weight and then by author id, so that the top collaborators are a slice of a row
+        weights = ar_graph._weights().tocoo() if n_authors > 0 else sparse.coo_matrix((0, 0))
+        keep = weights.row != weights.col
+        row, col, data = weights.row[keep], weights.col[keep], weights.data[keep]
+        order = np.lexsort((col, -data, row))
+        self._collaborators = col[order]
+        self._weights = data[order]
+        self._indptr = np.concatenate([[0], np.cumsum(np.bincount(row, minlength=n_authors))])
+
+    def __len__(self) -> int:
+        return len(self._ranks)
+
+    def __contains__(self, uid: Hashable) -> bool:
+        return self._authors.get(uid) is not None and len(self._ranks) > 0
+
+    def _id(self, uid: Hashable) -> int:
+        """
+        Returns the id of an author UID.
+        :param uid: an author UID.
+        :return: the integer author id.
+        """
+
+        author_id = self._authors.get(uid)
+        if author_id is None or author_id >= len(self._ranks):
+            raise KeyError(uid)
+        return author_id
+
+    def _ids(self, uids: Iterable[Hashable]) -> np.ndarray:
+        """
+        Returns the ids of several author UIDs, or -1 for unknown authors.
+        :param uids: an iterable of author UIDs.
+        :return: an integer array of author ids.
+        """
+
+        get, n_authors = self._authors.get, len(self._ranks)
+        ids = np.fromiter((get(uid, -1) for uid in uids), dtype=np.int64)
+        ids[ids >= n_authors] = -1
+        return ids
+
+    def rank(self, uid: Hashable) -> int:
+        """
+        Returns the rank of an author, where the author with the highest score
+        has a rank of 1.
+        :param uid: an author UID.
+        :return: the rank of the author.
+        """
+
+        return int(self._ranks[self._id(uid)])
+
+    def score(self, uid: Hashable) -> float:
+        """
+        Returns the AuthorRank score of an author.
+        :param uid: an author UID.
+        :return: the score of the author.
+        """
+
+        return float(self._scores[self._id(uid)])
+
+    def ranks(self, uids: Iterable[Hashable]) -> np.ndarray:
+        """
+        Returns the ranks of several authors at once.
+        :param uids: an iterable of author UIDs.
+        :return: an integer array of ranks, with a rank of 0 for unknown authors.
+        """
+
+        ids = self._ids(uids)
+        ranks = np.zeros(len(ids), dtype=np.int64)
+        ranks[ids >= 0] = self._ranks[ids[ids >= 0]]
+        return ranks
+
+    def scores(self, uids: Iterable[Hashable]) -> np.ndarray:
+        """
+        Returns the AuthorRank scores of several authors at once.
+        :param uids: an iterable of author UIDs.
+        :return: an array of scores, with a score of NaN for unknown authors.
+        """
+
+        ids = self._ids(uids)
+        scores = np.full(len(ids), np.nan)
+        scores[ids >= 0] = self._scores[ids[ids >= 0]]
+        return scores
+
+    def collaborators(self, uid: Hashable, n: int = 10) -> Tuple[List, List]:
+        """
+        Returns the strongest collaborators of an author, in descending order
+        of the normalized weight of the edge from the author to them.
+        :param uid: an author UID.
+        :param n: the maximum number of collaborators to be returned.
+        :return: a tuple which contains two lists, one for collaborators and the
+        other for the weights of the edges to them.
+        """
+
+        return self._top_collaborators(self._id(uid), n)
+
+    def collaborators_many(self, uids: Iterable[Hashable], n: int = 10) -> List[Tuple[List, List]]:
+        """
+        Returns the strongest collaborators of several authors at once.
+        :param uids: an iterable of author UIDs.
+        :param n: the maximum number of collaborators to be returned per author.
+        :return: a list with a tuple of collaborators and weights for each
+        author, empty for unknown authors.
+        """
+
+        return [
+            self._top_collaborators(author_id, n) if author_id >= 0 else (list(), list())
+            for author_id in self._ids(uids).tolist()
+        ]
+
+    def _top_collaborators(self, author_id: int, n: int) -> Tuple[List, List]:
+        """
+        Returns the strongest collaborators of an author id.
+        :param author_id: an integer author id.
+        :param n: the maximum number of collaborators to be returned.
+        :return: a tuple which contains two lists, one for collaborators and the
+        other for the weights of the edges to them.
+        """
+
+        start = self._indptr[author_id]
+        end = min(self._indptr[author_id + 1], start + max(n, 0))
+
+        return self._authors.uids(self._collaborators[start:end].tolist()), self._weights[start:end].tolist()
+
+
+class NameIndex:
+    """
+    An index of the names of the authors of a fitted AuthorRank graph, for
+    resolving search input to author UIDs without scanning every author.
+    Names are normalized with normalize_name. Prefix search matches the start
+    of any word of a name, such as "hund" or "kyle hund" for the UID
+    ("Kyle", "Hundman"), and fuzzy search matches names by the trigrams they
+    share with the query. Both return candidates with their AuthorRank score
+    so that results can be ranked. The index is a snapshot: it should be
+    rebuilt after the graph is updated with partial_fit.
+    :param ar_graph: a fitted Graph.
+    :param alpha: the PageRank damping parameter.
+    :param personalization: a dictionary keyed by author UID with teleport
+    weights, default uniform.
+    :param max_iter: the maximum number of PageRank power iterations.
+    :param tol: the PageRank error tolerance used to check convergence.
+    """
+
+    def __init__(self, ar_graph: Graph, alpha: float = 0.85, personalization: dict = None,
+                 max_iter: int = 100, tol: float = 1.0e-6):
+        self._authors = ar_graph._authors
+        self._scores, _ = _ranking(ar_graph, "NameIndex", alpha, personalization, max_iter, tol)
+
+        # every suffix of each normalized name that starts at a word, sorted, so that
+        # the names with a given prefix are a contiguous range found by bisection
+        self._names = [normalize_name(self._authors[i]) for i in range(len(self._scores))]
+        suffixes = list()
+        for author_id, name in enumerate(self._names):
+            start = 0
+            while start >= 0:
+                suffixes.append((name[start:], author_id))
+                start = name.find(" ", start)
+                start = start + 1 if start >= 0 else -1
+        suffixes.sort()
+        self._keys = [key for key, _ in suffixes]
+        self._key_ids = np.fromiter((author_id for _, author_id in suffixes), dtype=np.int64, count=len(suffixes))
+
+        # the trigram index is only built on the first fuzzy search
+        self._trigrams = None
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def search(self, prefix: str, n: int = 10) -> Tuple[List, List]:
+        """
+        Returns the authors with a word of their name that starts with the
+        normalized prefix, in descending order of AuthorRank score.
+        :param prefix: the search input, such as the start of a last name or a
+        first name followed by the start of a last name.
+        :param n: the maximum number of authors to be returned.
+        :return: a tuple which contains two lists, one for authors and the
+        other for their scores.
+        """
+
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return list(), list()
+
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + chr(0x10ffff), start)
+        author_ids = np.unique(self._key_ids[start:end])
+
+        author_ids = author_ids[top_n(self._scores[author_ids], n)]
+
+        return self._authors.uids(author_ids.tolist()), self._scores[author_ids].tolist()
+
+    def fuzzy_search(self, query: str, n: int = 10, threshold: float = 0.3) -> Tuple[List, List, List]:
+        """
+        Returns the authors whose normalized name is most similar to the
+        normalized query, measured by the Jaccard similarity of their
+        trigrams, which tolerates misspellings and reordered words. Authors
+        with the same similarity are ordered by AuthorRank score.
+        :param query: the search input.
+        :param n: the maximum number of authors to be returned.
+        :param threshold: the minimum similarity, from 0 to 1, of the authors
+        to be returned.
+        :return: a tuple which contains three lists, one for authors, one for
+        their scores and one for the similarity of their names to the query.
+        """
+
+        query = normalize_name(query)
+        if not query or not len(self):
+            return list(), list(), list()
+        if self._trigrams is None:
+            self._index_trigrams()
+        keys, indptr, postings, counts = self._trigrams
+
+        # count the trigrams that each author shares with the query from the postings of its trigrams
+        query_trigrams = _trigrams(query)
+        matches = [postings[indptr[keys[t]]:indptr[keys[t] + 1]] for t in query_trigrams if t in keys]
+        shared = np.bincount(np.concatenate(matches + [postings[:0]]), minlength=len(counts))
+        author_ids = np.flatnonzero(shared)
+        similarity = shared[author_ids] / (len(query_trigrams) + counts[author_ids] - shared[author_ids])
+
+        keep = similarity >= threshold
+        author_ids, similarity = author_ids[keep], similarity[keep]
+        # rank by similarity, then by score, with a key that keeps both orders
+        order = np.lexsort((-self._scores[author_ids], -similarity))
+        author_ids, similarity = author_ids[order][:max(n, 0)], similarity[order][:max(n, 0)]
+
+        return self._authors.uids(author_ids.tolist()), self._scores[author_ids].tolist(), similarity.tolist()
+
+    def _index_trigrams(self) -> None:
+        """
+        Builds an inverted index from each trigram to the ids of the authors
+        whose normalized name contains it, as CSR arrays.
+        :return: None
+        """
+
+        keys, counts = dict(), np.zeros(len(self._names), dtype=np.int64)
+        rows, cols = array.array("q"), array.array("q")
+        for author_id, name in enumerate(self._names):
+            trigrams = [keys.setdefault(trigram, len(keys)) for trigram in _trigrams(name)]
+            counts[author_id] = len(trigrams)
+            rows.extend(trigrams)
+            cols.extend([author_id] * len(trigrams))
+
+        # a stable sort by trigram keeps the author ids of each trigram in ascending order
+        rows, cols = np.frombuffer(rows, dtype=np.int64), np.frombuffer(cols, dtype=np.int64)
+        order = np.argsort(rows, kind="stable")
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(keys)))])
+        self._trigrams = (keys, indptr, cols[order].astype(np.int32), counts)
@@ -0,0 +1,136 @@
+# imports
+import contextlib
+import time
+import tracemalloc
+from typing import Callable, Iterable, Iterator
+
+
+class Profile:
+    """
+    Records where an AuthorRank run spends its time, for an opt-in look into
+    fit, partial_fit, top_authors and scores. Each run is broken down into
+    phases with their wall time, number of calls and items processed and,
+    optionally, the peak memory allocated while they ran. The time of a
+    phase excludes that of any phase nested within it, so that the times of
+    the phases of a run add up to no more than its total time.
+    :param memory: a boolean to indicate whether or not to record peak
+    allocations with tracemalloc, which slows Python code down.
+    :param callback: an optional function, such as a metrics hook, called
+    with the dictionary of each run when it completes.
+    """
+
+    def __init__(self, memory: bool = False, callback: Callable = None):
+        self.memory = memory
+        self.callback = callback
+        self.runs = list()
+        self._frames = list()
+
+    @contextlib.contextmanager
+    def run(self, operation: str) -> Iterator[dict]:
+        """
+        Records a run of an operation, such as fit.
+        :param operation: the name of the operation.
+        :return: a context manager which yields the dictionary of the run.
+        """
+
+        tracing = self.memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+
+        record = {"operation": operation, "seconds": 0., "phases": dict()}
+        if self.memory:
+            record["peak_bytes"] = 0
+        try:
+            with self._frame(record, exclusive=False):
+                yield record
+        finally:
+            if tracing:
+                tracemalloc.stop()
+
+        self.runs.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[dict]:
+        """
+        Records a phase of the current run. Phases with the same name are
+        added together.
+        :param name: the name of the phase.
+        :return: a context manager which yields the dictionary of the phase.
+        """
+
+        run = self._frames[0]["record"]
+        record = run["phases"].get(name)
+        if record is None:
+            record = run["phases"][name] = {"seconds": 0., "calls": 0, "items": 0}
+            if self.memory:
+                record["peak_bytes"] = 0
+
+        record["calls"] += 1
+        with self._frame(record, exclusive=True):
+            yield record
+
+    def as_dict(self) -> dict:
+        """
+        Returns the recorded runs as a dictionary that can be serialized to JSON.
+        :return: a dictionary with a list of runs, each with its operation, total
+        seconds and a dictionary of phases.
+        """
+
+        return {"runs": self.runs}
+
+    @contextlib.contextmanager
+    def _frame(self, record: dict, exclusive: bool) -> Iterator[None]:
+        """
+        Measures the time and peak allocations of a run or phase.
+        :param record: the dictionary to which the measurements are added.
+        :param exclusive: a boolean to indicate whether or not to exclude the
+        time of nested phases.
+        :return: a context manager.
+        """
+
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._frames:
+                # keep the peak of the enclosing frame before resetting it
+                parent = self._frames[-1]
+                parent["peak"] = max(parent["peak"], peak - parent["allocated"])
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+
+        frame = {"record": record, "nested": 0., "allocated": current if self.memory else 0, "peak": 0}
+        self._frames.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._frames.pop()
+            record["seconds"] += elapsed - frame["nested"] if exclusive else elapsed
+            if self._frames:
+                self._frames[-1]["nested"] += elapsed
+            if self.memory:
+                peak = max(frame["peak"], tracemalloc.get_traced_memory()[1] - frame["allocated"])
+                record["peak_bytes"] = max(record["peak_bytes"], peak)
+
+
+def profiled(iterable: Iterable, profile: Profile, name: str) -> Iterator:
+    """
+    Records the time spent producing each item of an iterable, such as a
+    generator, as a phase, and counts the items.
+    :param iterable: an iterable.
+    :param profile: a Profile with a current run.
+    :param name: the name of the phase.
+    :return: an iterator of the items of the iterable.
+    """
+
+    iterator = iter(iterable)
+    while True:
+        with profile.phase(name) as record:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            record["items"] += 1
+        yield item
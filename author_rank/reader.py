@@ -0,0 +1,150 @@
+# imports
+import json
+from typing import Iterator, TextIO
+
+
+def _is_json_lines(path: str) -> bool:
+    """
+    Determines whether a file holds JSON Lines, one document per line,
+    based on its extension.
+    :param path: the path to the file.
+    :return: a boolean indicating whether or not the file is JSON Lines.
+    """
+
+    return path.lower().endswith((".jsonl", ".ndjson", ".jsonlines"))
+
+
+class _JSONStream:
+    """
+    Reads JSON values from a file-like object a chunk at a time, so that the
+    elements of a large array can be decoded one by one.
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read(self) -> bool:
+        """
+        Appends the next chunk of the file to the buffer, discarding the part
+        of the buffer that has already been decoded. Chunks grow with the
+        buffer so that a value larger than a chunk is decoded in linear time.
+        :return: a boolean indicating whether or not more data was read.
+        """
+
+        if self._eof:
+            return False
+        data = self._f.read(max(self._chunk_size, len(self._buffer) - self._pos))
+        if not data:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character without consuming it.
+        :return: the next character, or an empty string at the end of the file.
+        """
+
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._read():
+                return self._buffer[self._pos:self._pos + 1]
+
+    def expect(self, characters: str) -> str:
+        """
+        Consumes the next character, which must be one of the given characters.
+        :param characters: the allowed characters.
+        :return: the consumed character.
+        """
+
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError("Expected one of %r in JSON document, found %r." % (characters, character))
+        self._pos += 1
+        return character
+
+    def value(self) -> object:
+        """
+        Decodes and consumes the next JSON value, reading more of the file until
+        the value is complete.
+        :return: the decoded value.
+        """
+
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # a value that ends the buffer may continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._read()
+
+
+def _iter_json_array(f: TextIO, key: str, chunk_size: int) -> Iterator[dict]:
+    """
+    Yields the elements of a JSON array one at a time, where the array is
+    either the top-level value of the file or the value of a top-level key.
+    :param f: a file-like object containing JSON.
+    :param key: the top-level key which contains the array, if the top-level
+    value is an object.
+    :param chunk_size: the number of characters read from the file at a time.
+    :return: an iterator of the elements of the array.
+    """
+
+    stream = _JSONStream(f, chunk_size)
+
+    if stream.peek() == "{":
+        # skip the values of other keys until the array is found
+        stream.expect("{")
+        while True:
+            if stream.peek() == "}":
+                raise KeyError(key)
+            name = stream.value()
+            stream.expect(":")
+            if name == key:
+                break
+            stream.value()
+            if stream.expect(",}") == "}":
+                raise KeyError(key)
+
+    stream.expect("[")
+    if stream.peek() == "]":
+        return
+    while True:
+        yield stream.value()
+        if stream.expect(",]") == "]":
+            return
+
+
+def read_documents(path: str, key: str = "documents", chunk_size: int = 2 ** 16) -> Iterator[dict]:
+    """
+    Reads documents from a JSON or JSON Lines file one at a time, without
+    loading the whole file into memory, for use with Graph.fit.
+    :param path: the path to the file. Files with a .jsonl, .ndjson or
+    .jsonlines extension are read as one document per line, other files as a
+    JSON array of documents.
+    :param key: for JSON files whose top-level value is an object, such as
+    data/author_network.json, the key which contains the array of documents.
+    :param chunk_size: the number of characters read from a JSON file at a time.
+    :return: an iterator of dictionaries which represent documents.
+    """
+
+    with open(path, "r") as f:
+        if _is_json_lines(path):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f, key, chunk_size)
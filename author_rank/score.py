@@ -1,38 +1,411 @@
 # imports
 from author_rank.utils import normalize
-import networkx as nx
-from typing import List, Tuple
+import numpy as np
+from scipy import sparse
+import sys
+from typing import Callable, List, Sequence, Tuple, TYPE_CHECKING, Union
+if TYPE_CHECKING:
+    import networkx as nx
 
 
-def top_authors(graph: nx.DiGraph, n: int = 5, normalize_scores: bool = False) -> Tuple[List, List]:
+def _is_networkx_graph(graph) -> bool:
+    """
+    Checks whether an object is a NetworkX DiGraph without importing NetworkX,
+    which cannot have created one if it has not been imported.
+    :param graph: an object.
+    :return: a boolean.
+    """
+
+    nx = sys.modules.get("networkx")
+    return nx is not None and isinstance(graph, nx.DiGraph)
+
+
+def _not_converged(max_iter: int) -> Exception:
+    """
+    Returns the exception raised when PageRank fails to converge, importing
+    NetworkX, which defines it, only then.
+    :param max_iter: the maximum number of PageRank power iterations.
+    :return: a NetworkX PowerIterationFailedConvergence exception.
+    """
+
+    import networkx as nx
+    return nx.PowerIterationFailedConvergence(max_iter)
+
+
+def adjacency_matrix(graph: 'nx.DiGraph') -> Tuple[sparse.csr_matrix, List]:
+    """
+    Converts an AuthorRank graph into a weighted sparse adjacency matrix.
+    :param graph: an AuthorRank graph (NetworkX DiGraph object).
+    :return: a tuple which contains a SciPy CSR matrix, where entry (i, j) is
+    the weight of the edge from author i to author j, and the list of authors
+    corresponding to its rows and columns.
+    """
+
+    authors = list(graph)
+    index = {author: i for i, author in enumerate(authors)}
+    rows, cols, weights = list(), list(), list()
+    for u, v, w in graph.edges(data="weight", default=1.):
+        rows.append(index[u])
+        cols.append(index[v])
+        weights.append(w)
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(weights, dtype=float), (rows, cols)), shape=(len(authors), len(authors))
+    )
+
+    return matrix, authors
+
+
+def _transition(matrix: sparse.spmatrix,
+                cliques: Tuple[sparse.spmatrix, np.ndarray] = None) -> Tuple[Callable, np.ndarray]:
+    """
+    Creates the transition operator of PageRank for a weighted sparse
+    adjacency matrix, with each row divided by the out-weight of its node.
+    :param matrix: a square SciPy sparse matrix, where entry (i, j) is the
+    weight of the edge from node i to node j.
+    :param cliques: optionally, cliques of nodes whose edges are added to the
+    matrix in closed form, as in pagerank.
+    :return: a tuple which contains a function that propagates a vector of
+    scores, or a matrix with one vector of scores per column, along the edges,
+    and a boolean array that is True for dangling nodes.
+    """
+
+    n_nodes = matrix.shape[0]
+    matrix = sparse.csr_matrix(matrix, dtype=float)
+    out_weight = np.asarray(matrix.sum(axis=1)).ravel()
+    if cliques is not None:
+        incidence = sparse.csr_matrix(cliques[0], dtype=float)
+        weights = np.asarray(cliques[1], dtype=float)
+        incidence_t = incidence.T.tocsr()
+        self_weight = incidence_t.dot(weights)
+        clique_sizes = np.asarray(incidence.sum(axis=1)).ravel()
+        out_weight = out_weight + incidence_t.dot(weights * clique_sizes) - self_weight
+    is_dangling = out_weight <= 0
+    inverse = np.divide(1., out_weight, out=np.zeros(n_nodes), where=~is_dangling)
+    transition = sparse.diags(inverse).dot(matrix).T.tocsr()
+
+    def propagate(x: np.ndarray) -> np.ndarray:
+        step = transition.dot(x)
+        if cliques is not None:
+            # broadcast the per-node values over the columns of x, if any
+            shape = (-1,) + (1,) * (x.ndim - 1)
+            scaled = x * inverse.reshape(shape)
+            step += incidence_t.dot(weights.reshape(shape) * incidence.dot(scaled)) - self_weight.reshape(shape) * scaled
+        return step
+
+    return propagate, is_dangling
+
+
+def pagerank(matrix: sparse.spmatrix, alpha: float = 0.85, personalization: np.ndarray = None,
+             max_iter: int = 100, tol: float = 1.0e-6, nstart: np.ndarray = None,
+             full_output: bool = False,
+             cliques: Tuple[sparse.spmatrix, np.ndarray] = None) -> Union[np.ndarray, Tuple[np.ndarray, dict]]:
+    """
+    Computes PageRank scores by power iteration directly on a weighted sparse
+    adjacency matrix, following the conventions of networkx.pagerank.
+    :param matrix: a square SciPy sparse matrix, where entry (i, j) is the
+    weight of the edge from node i to node j.
+    :param alpha: the damping parameter.
+    :param personalization: an array with the teleport weight of each node,
+    default uniform. Dangling nodes are redistributed in the same proportions.
+    :param max_iter: the maximum number of power iterations.
+    :param tol: the error tolerance used to check convergence, scaled by the
+    number of nodes.
+    :param nstart: an array with the starting score of each node, such as the
+    scores of a previous run, default uniform.
+    :param full_output: a boolean to indicate whether or not to also return a
+    dictionary with the number of iterations and the final residual.
+    :param cliques: optionally, cliques of nodes whose edges are added to the
+    matrix in closed form, without being expanded into pairs: a tuple which
+    contains a sparse incidence matrix C, with one row per clique and the
+    number of times each node appears in it, and an array w with the weight of
+    each clique. C^T diag(w) C - diag(C^T w) is added to the matrix.
+    :return: an array of PageRank scores that sums to 1, and if full_output is
+    True, a dictionary of convergence information.
+    """
+
+    n_nodes = matrix.shape[0]
+    if n_nodes == 0:
+        x = np.zeros(0)
+        return (x, {"iterations": 0, "residual": 0.}) if full_output else x
+
+    propagate, is_dangling = _transition(matrix, cliques)
+
+    if personalization is None:
+        p = np.full(n_nodes, 1. / n_nodes)
+    else:
+        p = np.asarray(personalization, dtype=float)
+        if p.sum() == 0:
+            raise ZeroDivisionError("personalization must contain at least one non-zero weight.")
+        p = p / p.sum()
+
+    if nstart is None:
+        x = np.full(n_nodes, 1. / n_nodes)
+    else:
+        x = np.asarray(nstart, dtype=float)
+        if x.sum() == 0:
+            raise ZeroDivisionError("nstart must contain at least one non-zero score.")
+        x = x / x.sum()
+
+    for iteration in range(1, max_iter + 1):
+        x_last = x
+        x = alpha * (propagate(x_last) + x_last[is_dangling].sum() * p) + (1 - alpha) * p
+        residual = np.abs(x - x_last).sum()
+        if residual < n_nodes * tol:
+            return (x, {"iterations": iteration, "residual": float(residual)}) if full_output else x
+
+    raise _not_converged(max_iter)
+
+
+def pagerank_many(matrix: sparse.spmatrix, personalization: np.ndarray, alpha: float = 0.85,
+                  max_iter: int = 100, tol: float = 1.0e-6, full_output: bool = False,
+                  cliques: Tuple[sparse.spmatrix, np.ndarray] = None) -> Union[np.ndarray, Tuple[np.ndarray, list]]:
+    """
+    Computes the personalized PageRank scores of a graph for many
+    personalization vectors at once, by power iteration on a matrix with one
+    vector of scores per column, so that the transition matrix is built once
+    and each iteration is a single sparse-dense product. Each column stops
+    iterating once it converges, so that its scores are those that pagerank
+    computes with its personalization alone.
+    :param matrix: a square SciPy sparse matrix, where entry (i, j) is the
+    weight of the edge from node i to node j.
+    :param personalization: an array with one column per personalization
+    vector and the teleport weight of each node in its rows. Dangling nodes
+    are redistributed in the same proportions.
+    :param alpha: the damping parameter.
+    :param max_iter: the maximum number of power iterations.
+    :param tol: the error tolerance used to check convergence, scaled by the
+    number of nodes.
+    :param full_output: a boolean to indicate whether or not to also return a
+    list with the number of iterations and the final residual of each column.
+    :param cliques: optionally, cliques of nodes whose edges are added to the
+    matrix in closed form, as in pagerank.
+    :return: an array of PageRank scores with one column per personalization
+    vector, each of which sums to 1, and if full_output is True, a list of
+    dictionaries of convergence information.
+    """
+
+    n_nodes = matrix.shape[0]
+    p = np.asarray(personalization, dtype=float).reshape(n_nodes, -1)
+    if (p.sum(axis=0) == 0).any():
+        raise ZeroDivisionError("personalization must contain at least one non-zero weight in every column.")
+    p = p / p.sum(axis=0)
+    convergence = [{"iterations": 0, "residual": 0.} for _ in range(p.shape[1])]
+    if n_nodes == 0 or p.shape[1] == 0:
+        return (p, convergence) if full_output else p
+
+    propagate, is_dangling = _transition(matrix, cliques)
+
+    x = np.full(p.shape, 1. / n_nodes)
+    dangling = is_dangling.astype(float)
+    active = np.arange(p.shape[1])
+    for iteration in range(1, max_iter + 1):
+        # only the columns that have yet to converge are iterated, in place where possible
+        subset = len(active) < x.shape[1]
+        x_last, p_active = (x[:, active], p[:, active]) if subset else (x, p)
+        x_next = propagate(x_last)
+        x_next += dangling.dot(x_last) * p_active
+        x_next *= alpha
+        x_next += (1 - alpha) * p_active
+        residual = np.abs(x_next - x_last).sum(axis=0)
+        if subset:
+            x[:, active] = x_next
+        else:
+            x = x_next
+        converged = residual < n_nodes * tol
+        for column, r in zip(active[converged].tolist(), residual[converged].tolist()):
+            convergence[column] = {"iterations": iteration, "residual": r}
+        active = active[~converged]
+        if len(active) == 0:
+            return (x, convergence) if full_output else x
+
+    raise _not_converged(max_iter)
+
+
+def block_pagerank(matrix: sparse.spmatrix, blocks: np.ndarray, alpha: float = 0.85, max_iter: int = 100,
+                   tol: float = 1.0e-6) -> np.ndarray:
+    """
+    Computes the PageRank scores of many independent graphs at once, by power
+    iteration on a block-diagonal matrix that holds one graph per block. The
+    teleport and dangling weights of each graph stay within its block, and
+    each block stops iterating once it converges, so that its scores are those
+    that pagerank computes for its graph alone.
+    :param matrix: a square, block-diagonal SciPy sparse matrix, where entry
+    (i, j) is the weight of the edge from node i to node j.
+    :param blocks: an integer array of block boundaries, such that the nodes
+    of block b are blocks[b] to blocks[b + 1] - 1. Every block must be non-empty.
+    :param alpha: the damping parameter.
+    :param max_iter: the maximum number of power iterations.
+    :param tol: the error tolerance used to check the convergence of each
+    block, scaled by the number of nodes in the block.
+    :return: an array of PageRank scores that sums to 1 within each block.
+    """
+
+    n_nodes = matrix.shape[0]
+    sizes = np.diff(blocks)
+    starts = np.asarray(blocks[:-1])
+    if n_nodes == 0:
+        return np.zeros(0)
+
+    # transition matrix, with each row divided by the out-weight of its node
+    matrix = sparse.csr_matrix(matrix, dtype=float)
+    out_weight = np.asarray(matrix.sum(axis=1)).ravel()
+    is_dangling = out_weight <= 0
+    inverse = np.divide(1., out_weight, out=np.zeros(n_nodes), where=~is_dangling)
+    transition = sparse.diags(inverse).dot(matrix).T.tocsr()
+
+    # uniform teleport weights within each block
+    block_of = np.repeat(np.arange(len(sizes)), sizes)
+    p = 1. / sizes[block_of]
+    x = p.copy()
+
+    active = np.ones(len(sizes), dtype=bool)
+    for _ in range(max_iter):
+        x_last = x
+        dangling = np.add.reduceat(np.where(is_dangling, x_last, 0.), starts)
+        x = alpha * (transition.dot(x_last) + dangling[block_of] * p) + (1 - alpha) * p
+        residual = np.add.reduceat(np.abs(x - x_last), starts)
+        # converged blocks keep the scores of the iteration at which they converged
+        x = np.where(active[block_of], x, x_last)
+        active &= ~(residual < sizes * tol)
+        if not active.any():
+            return x
+
+    raise _not_converged(max_iter)
+
+
+def warm_start(previous: np.ndarray, n_nodes: int = None) -> np.ndarray:
+    """
+    Creates a PageRank starting vector from the scores of a previous run on
+    an earlier version of a graph. Nodes that were not scored previously,
+    either marked as NaN or beyond the end of the previous scores, start with
+    the mean of the previous scores.
+    :param previous: an array of previous scores.
+    :param n_nodes: the number of nodes in the current graph, default the
+    length of the previous scores.
+    :return: an array of starting scores that sums to 1.
+    """
+
+    if n_nodes is None:
+        n_nodes = len(previous)
+
+    x = np.full(n_nodes, np.nan)
+    x[:min(len(previous), n_nodes)] = previous[:n_nodes]
+    scored = ~np.isnan(x)
+    x[~scored] = x[scored].mean() if scored.any() else 1.
+
+    return x / x.sum()
+
+
+def top_n(scores: np.ndarray, n: int) -> np.ndarray:
+    """
+    Returns the positions of the n highest scores, in descending order of
+    score, without sorting the full array. Ties are broken by position.
+    :param scores: an array of scores.
+    :param n: the maximum number of positions to be returned.
+    :return: an integer array of positions.
+    """
+
+    if n <= 0 or len(scores) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    candidates = np.arange(len(scores))
+    if n < len(scores):
+        # keep every score tied with the n-th highest so ties resolve by position
+        threshold = scores[np.argpartition(-scores, n - 1)[n - 1]]
+        candidates = np.flatnonzero(scores >= threshold)
+
+    order = np.lexsort((candidates, -scores[candidates]))
+
+    return candidates[order][:n]
+
+
+def top_authors(graph: Union['nx.DiGraph', sparse.spmatrix], n: int = 5, normalize_scores: bool = False,
+                alpha: float = 0.85, personalization: Union[dict, np.ndarray] = None,
+                max_iter: int = 100, tol: float = 1.0e-6, nstart: Union[dict, np.ndarray] = None,
+                authors: Sequence = None) -> Tuple[List, List]:
 
     """
     Returns the top n authors according to their author_rank scores from the
     constructed graph as well as their scores, in the form of a tuple.
-    :param graph: an AuthorRank graph (NetworkX DiGraph object).
+    :param graph: an AuthorRank graph (NetworkX DiGraph object), or its weighted
+    sparse adjacency matrix.
     :param n: an integer to specify the number of maximum
     authors to be returned.
     :param normalize_scores: a boolean to indicate whether or not to normalize
     the scores between 0 and 1.
+    :param alpha: the PageRank damping parameter.
+    :param personalization: a dictionary keyed by author, or an array in the
+    order of the authors, with teleport weights. Default uniform.
+    :param max_iter: the maximum number of PageRank power iterations.
+    :param tol: the PageRank error tolerance used to check convergence.
+    :param nstart: a dictionary keyed by author, or an array in the order of
+    the authors, with starting scores, such as the scores of a previous run.
+    Authors without a starting score start with the mean of the provided
+    scores. Default uniform.
+    :param authors: the authors corresponding to the rows of the matrix, required
+    when graph is a sparse matrix.
     :return: a tuple which contains two lists, one for authors and the other
     for their scores.
     """
 
+    if _is_networkx_graph(graph):
+        matrix, authors = adjacency_matrix(graph)
+    else:
+        if authors is None:
+            raise ValueError("authors must be provided when scoring a sparse matrix.")
+        matrix = graph
+
+    if isinstance(personalization, dict) or isinstance(nstart, dict):
+        index = {author: i for i, author in enumerate(authors)}
+
+    if isinstance(personalization, dict):
+        vector = np.zeros(len(authors))
+        for author, weight in personalization.items():
+            if author in index:
+                vector[index[author]] = weight
+        personalization = vector
+
+    if isinstance(nstart, dict):
+        vector = np.full(len(authors), np.nan)
+        for author, score in nstart.items():
+            if author in index:
+                vector[index[author]] = score
+        nstart = warm_start(vector)
+
     # apply the PageRank algorithm to the graph
-    rank = nx.pagerank(graph)
+    rank = pagerank(matrix, alpha=alpha, personalization=personalization, max_iter=max_iter, tol=tol, nstart=nstart)
+
+    return select_top(rank, authors, n=n, normalize_scores=normalize_scores)
 
-    # sort the results
-    sorted_rank = sorted(rank, key=rank.get, reverse=True)
-    sorted_rank = sorted_rank[0:n]
-    sorted_scores = [rank[auth] for auth in sorted_rank]
+
+def select_top(rank: np.ndarray, authors: Sequence, n: int = 5, normalize_scores: bool = False,
+               order: np.ndarray = None) -> Tuple[List, List]:
+    """
+    Returns the top n authors and their scores from a vector of author_rank
+    scores, in the form of a tuple.
+    :param rank: an array of scores in the order of the authors.
+    :param authors: the authors corresponding to the scores.
+    :param n: an integer to specify the number of maximum
+    authors to be returned.
+    :param normalize_scores: a boolean to indicate whether or not to normalize
+    the scores between 0 and 1.
+    :param order: optionally, the positions of all of the scores in descending
+    order, in which case no selection is needed.
+    :return: a tuple which contains two lists, one for authors and the other
+    for their scores.
+    """
+
+    # select the top results
+    positions = order[:max(n, 0)] if order is not None else top_n(rank, n)
+    sorted_rank = [authors[i] for i in positions]
+    sorted_scores = rank[positions].tolist()
 
     # normalize the scores if the option is specified
-    if normalize_scores:
+    if normalize_scores and len(sorted_scores) > 0:
         minimum = min(sorted_scores)
         maximum = max(sorted_scores)
         sorted_scores = [normalize(minimum, maximum, s) for s in sorted_scores]
 
     return sorted_rank, sorted_scores
 
-
-
@@ -0,0 +1,264 @@
+# imports
+import asyncio
+from author_rank.graph import Graph, _rank_key
+from author_rank.score import select_top, top_n
+from concurrent.futures import Executor
+import functools
+from typing import Callable, Hashable, Iterable, List, Tuple
+
+
+def _top_authors(ar_graph: Graph, **kwargs) -> Tuple[List, List]:
+    """
+    Calls top_authors on a graph and then sorts its full ranking, so that
+    later requests with the same PageRank parameters are only a slice of it.
+    :param ar_graph: a Graph.
+    :param kwargs: the parameters of Graph.top_authors.
+    :return: a tuple which contains two lists, one for authors and the other
+    for their scores.
+    """
+
+    top = ar_graph.top_authors(**kwargs)
+    cached = ar_graph._rank_cache.get(
+        _rank_key(kwargs["alpha"], kwargs["personalization"], kwargs["max_iter"], kwargs["tol"])
+    )
+    if cached is not None and cached["order"] is None:
+        cached["order"] = top_n(cached["rank"], len(cached["rank"]))
+
+    return top
+
+
+def _score_personalizations(ar_graph: Graph, personalizations: List[dict], alpha: float, max_iter: int,
+                            tol: float) -> None:
+    """
+    Computes, caches and sorts the scores of a graph for several
+    personalizations together, with Graph.personalized_top_authors.
+    :param ar_graph: a Graph.
+    :param personalizations: a list of dictionaries keyed by author UID with
+    teleport weights.
+    :param alpha: the PageRank damping parameter.
+    :param max_iter: the maximum number of PageRank power iterations.
+    :param tol: the PageRank error tolerance used to check convergence.
+    :return: None
+    """
+
+    ar_graph.personalized_top_authors(personalizations, n=0, alpha=alpha, max_iter=max_iter, tol=tol)
+    for personalization in personalizations:
+        cached = ar_graph._rank_cache.get(_rank_key(alpha, personalization, max_iter, tol))
+        if cached is not None and cached["order"] is None:
+            cached["order"] = top_n(cached["rank"], len(cached["rank"]))
+
+
+class RankingService:
+    """
+    An asyncio facade around a fitted Graph for serving AuthorRank from an
+    async application, such as a web API. Fitting, loading and scoring run in
+    an executor so that they do not block the event loop, and concurrent
+    requests for the same scores are coalesced into a single computation. A
+    newly fitted or loaded graph replaces the served graph atomically:
+    requests that started before the swap finish with the previous graph.
+    Served graphs are never modified in place, so scoring can run in several
+    threads at once. Coalesced requests receive the same result, which should
+    not be modified. Personalized requests that arrive while others are being
+    scored are scored together in the next batch, with
+    Graph.personalized_top_authors.
+    :param ar_graph: an optional fitted Graph to serve.
+    :param executor: the concurrent.futures executor in which blocking calls
+    run, default the event loop's default executor.
+    """
+
+    def __init__(self, ar_graph: Graph = None, executor: Executor = None):
+        self._graph = ar_graph
+        self._executor = executor
+        # a new generation starts with every swap, so that requests are only coalesced within one
+        self._generation = 0
+        self._pending = dict()
+        # personalizations waiting for the next batch, and the task that scores the batches, by PageRank parameters
+        self._waiting = dict()
+        self._batchers = dict()
+
+    @property
+    def graph(self) -> Graph:
+        """
+        The Graph currently being served.
+        :return: a Graph, or None if no graph has been fit or loaded.
+        """
+
+        return self._graph
+
+    def swap(self, ar_graph: Graph) -> None:
+        """
+        Replaces the served graph. Requests in progress finish with the
+        previous graph. The graph must not be modified after it is swapped in.
+        :param ar_graph: a fitted Graph.
+        :return: None
+        """
+
+        self._graph = ar_graph
+        self._generation += 1
+
+    async def _run(self, function: Callable, *args, **kwargs):
+        """
+        Runs a blocking function in the executor.
+        :param function: the function.
+        :return: the result of the function.
+        """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(function, *args, **kwargs))
+
+    async def fit(self, documents: Iterable[dict], **kwargs) -> None:
+        """
+        Fits a new Graph to a set of documents in the executor and serves it
+        once it is fit, leaving the served graph untouched until then. The
+        NetworkX graph is not built unless build_graph is True.
+        :param documents: an iterable of dictionaries which represent documents.
+        :param kwargs: the other parameters of Graph.fit.
+        :return: None
+        """
+
+        kwargs.setdefault("build_graph", False)
+        ar_graph = Graph()
+        await self._run(ar_graph.fit, documents, **kwargs)
+        self.swap(ar_graph)
+
+    async def load(self, path: str, mmap: bool = True) -> None:
+        """
+        Loads a Graph saved with Graph.save in the executor and serves it.
+        :param path: the path to the file.
+        :param mmap: a boolean to indicate whether or not to memory-map the arrays.
+        :return: None
+        """
+
+        self.swap(await self._run(Graph.load, path, mmap=mmap))
+
+    async def _coalesced(self, function: Callable, key: Hashable, **kwargs):
+        """
+        Calls a function with the served graph in the executor, or waits for
+        the result of an identical call that is already in progress.
+        :param function: a function, such as a Graph method, called with the
+        served graph as its first argument.
+        :param key: a hashable key of the function and its arguments.
+        :param kwargs: the arguments of the call.
+        :return: the result of the function.
+        """
+
+        if self._graph is None:
+            raise RuntimeError("A graph must be fit, loaded or swapped in before it can be scored.")
+
+        key = (self._generation, key)
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._run(function, self._graph, **kwargs))
+            self._pending[key] = future
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+
+        # a cancelled request does not cancel the computation that other requests wait for
+        return await asyncio.shield(future)
+
+    async def _personalized(self, personalization: dict, alpha: float, max_iter: int, tol: float) -> None:
+        """
+        Waits until the scores of the served graph for a personalization are
+        cached, adding it to the next batch of personalizations to be scored
+        unless it is already waiting or being scored.
+        :param personalization: a dictionary keyed by author UID with teleport
+        weights.
+        :param alpha: the PageRank damping parameter.
+        :param max_iter: the maximum number of PageRank power iterations.
+        :param tol: the PageRank error tolerance used to check convergence.
+        :return: None
+        """
+
+        group = (self._generation, alpha, max_iter, tol)
+        key = (self._generation, "personalized", _rank_key(alpha, personalization, max_iter, tol))
+        future = self._pending.get(key)
+        if future is None:
+            future = self._pending[key] = asyncio.get_running_loop().create_future()
+            self._waiting.setdefault(group, list()).append((key, personalization))
+            if group not in self._batchers:
+                self._batchers[group] = asyncio.ensure_future(self._score_batches(group, self._graph))
+
+        await asyncio.shield(future)
+
+    async def _score_batches(self, group: tuple, ar_graph: Graph) -> None:
+        """
+        Scores the personalizations waiting with the same PageRank parameters
+        in batches, until none are left waiting.
+        :param group: the generation of the graph and the PageRank parameters.
+        :param ar_graph: the Graph that was served when the first batch started.
+        :return: None
+        """
+
+        _, alpha, max_iter, tol = group
+        try:
+            while self._waiting.get(group):
+                batch = self._waiting.pop(group)
+                try:
+                    await self._run(_score_personalizations, ar_graph, [p for _, p in batch], alpha, max_iter, tol)
+                except Exception as e:
+                    for key, _ in batch:
+                        self._pending.pop(key).set_exception(e)
+                else:
+                    for key, _ in batch:
+                        self._pending.pop(key).set_result(None)
+        finally:
+            del self._batchers[group]
+
+    async def top_authors(self, n: int = 10, normalize_scores: bool = False, alpha: float = 0.85,
+                          personalization: dict = None, max_iter: int = 100,
+                          tol: float = 1.0e-6) -> Tuple[List, List]:
+        """
+        Returns the top N authors of the served graph, as Graph.top_authors.
+        Once the scores of a set of PageRank parameters have been computed,
+        their sorted ranking is sliced in the event loop without waiting for
+        the executor. Personalizations without any author of the graph have
+        no top authors.
+        :param n: an integer to specify the maximum number of authors to be
+        returned.
+        :param normalize_scores: a boolean to indicate whether or not to normalize
+        the scores between 0 and 1.
+        :param alpha: the PageRank damping parameter.
+        :param personalization: a dictionary keyed by author UID with teleport
+        weights, default uniform.
+        :param max_iter: the maximum number of PageRank power iterations.
+        :param tol: the PageRank error tolerance used to check convergence.
+        :return: a tuple which contains two lists, one for authors and the other
+        for their scores.
+        """
+
+        ar_graph, rank_key = self._graph, _rank_key(alpha, personalization, max_iter, tol)
+        cached = ar_graph._rank_cache.get(rank_key) if ar_graph is not None and ar_graph._is_fit else None
+        if cached is not None and cached["order"] is not None:
+            return select_top(cached["rank"], ar_graph._authors, n=n, normalize_scores=normalize_scores,
+                              order=cached["order"])
+
+        if personalization is not None and ar_graph is not None and ar_graph._is_fit:
+            await self._personalized(personalization, alpha, max_iter, tol)
+            cached = ar_graph._rank_cache.get(rank_key)
+            if cached is None:
+                return list(), list()
+            return select_top(cached["rank"], ar_graph._authors, n=n, normalize_scores=normalize_scores,
+                              order=cached["order"])
+
+        kwargs = {"n": n, "normalize_scores": normalize_scores, "alpha": alpha, "personalization": personalization,
+                  "max_iter": max_iter, "tol": tol}
+
+        return await self._coalesced(_top_authors, ("top_authors", rank_key, n, normalize_scores), **kwargs)
+
+    async def scores(self, alpha: float = 0.85, personalization: dict = None, max_iter: int = 100,
+                     tol: float = 1.0e-6) -> Tuple[List, List]:
+        """
+        Returns the full ranking of the authors of the served graph, as
+        Graph.scores.
+        :param alpha: the PageRank damping parameter.
+        :param personalization: a dictionary keyed by author UID with teleport
+        weights, default uniform.
+        :param max_iter: the maximum number of PageRank power iterations.
+        :param tol: the PageRank error tolerance used to check convergence.
+        :return: a tuple which contains two lists, one for authors and the other
+        for their scores.
+        """
+
+        kwargs = {"alpha": alpha, "personalization": personalization, "max_iter": max_iter, "tol": tol}
+
+        return await self._coalesced(Graph.scores, ("scores", _rank_key(alpha, personalization, max_iter, tol)),
+                                     **kwargs)
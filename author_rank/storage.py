@@ -0,0 +1,84 @@
+# imports
+import json
+import numpy as np
+import struct
+from typing import Dict, Tuple
+
+
+# the first bytes of a saved graph, followed by the format version and the length of the header
+MAGIC = b"AUTHRANK"
+VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sIQ")
+
+
+def write_arrays(path: str, header: dict, arrays: Dict[str, np.ndarray]) -> None:
+    """
+    Writes a set of named arrays, and a JSON header describing them, to a
+    single binary file. Each array is stored in little-endian byte order at an
+    offset aligned to 64 bytes, so that it can be memory-mapped in place.
+    :param path: the path to the file.
+    :param header: a dictionary, that can be serialized to JSON, stored with
+    the arrays.
+    :param arrays: a dictionary of arrays keyed by name.
+    :return: None
+    """
+
+    arrays = {name: np.ascontiguousarray(a, dtype=np.dtype(a.dtype).newbyteorder("<")) for name, a in arrays.items()}
+
+    # the offsets of the arrays are relative to the end of the header
+    layout, offset = dict(), 0
+    for name, a in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset += a.nbytes
+
+    encoded = json.dumps(dict(header, arrays=layout)).encode("utf-8")
+    # pad the header so that the arrays start on an aligned offset
+    start = -(-(_PREAMBLE.size + len(encoded)) // ALIGNMENT) * ALIGNMENT
+    encoded += b" " * (start - _PREAMBLE.size - len(encoded))
+
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(encoded)))
+        f.write(encoded)
+        for name, a in arrays.items():
+            f.seek(start + layout[name]["offset"])
+            f.write(a.tobytes())
+
+
+def read_arrays(path: str, mmap: bool = True) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """
+    Reads the header and arrays written by write_arrays.
+    :param path: the path to the file.
+    :param mmap: a boolean to indicate whether or not to memory-map the arrays
+    read-only rather than read them into memory. Memory-mapped arrays are
+    shared by every process that maps the same file.
+    :return: a tuple which contains the header and a dictionary of arrays keyed
+    by name.
+    """
+
+    with open(path, "rb") as f:
+        magic, version, length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError("%s is not a saved AuthorRank graph." % path)
+        if version > VERSION:
+            raise ValueError("%s was saved in format version %d, which is newer than the supported "
+                             "version %d." % (path, version, VERSION))
+        header = json.loads(f.read(length).decode("utf-8"))
+        start = _PREAMBLE.size + length
+
+        layout = header.pop("arrays")
+        if mmap:
+            buffer = np.memmap(f, dtype=np.uint8, mode="r")
+        else:
+            f.seek(0)
+            buffer = np.frombuffer(f.read(), dtype=np.uint8)
+
+    arrays = dict()
+    for name, spec in layout.items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        offset = start + spec["offset"]
+        arrays[name] = buffer[offset:offset + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    return header, arrays
@@ -1,6 +1,24 @@
 from collections import Counter
-from python_utils.terminal import get_terminal_size
+import re
 import sys
+import time
+from typing import Callable, Hashable, TextIO
+import unicodedata
+
+
+# runs of punctuation and whitespace, which separate the words of a normalized name
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _terminal_size() -> tuple:
+    """
+    Returns the width and height of the terminal, importing python-utils only
+    when a progress bar is first drawn.
+    :return: a tuple of the width and height of the terminal.
+    """
+
+    from python_utils.terminal import get_terminal_size
+    return get_terminal_size()
 
 
 def normalize(minimum: float, maximum: float, value: float) -> float:
@@ -25,6 +43,24 @@ def normalize(minimum: float, maximum: float, value: float) -> float:
     return z
 
 
+def normalize_name(name: Hashable) -> str:
+    """
+    Normalizes an author name, or an author UID, for searching: the values of
+    a UID are joined with spaces, accents are removed, the name is case-folded
+    and punctuation is replaced by single spaces. For example, the UID
+    ("José", "O'Brien") is normalized to "jose o brien".
+    :param name: a string, or a tuple of values such as an author UID.
+    :return: the normalized name.
+    """
+
+    if isinstance(name, tuple):
+        name = " ".join(str(value) for value in name)
+    name = unicodedata.normalize("NFKD", str(name))
+    name = "".join(c for c in name if not unicodedata.combining(c)).casefold()
+
+    return " ".join(_NON_WORD.sub(" ", name).split())
+
+
 def emit_progress_bar(progress: str, index: int, total: int, percent_offset: float = 1e-9) -> str:
     """
     A progress bar that is continuously updated in Python's standard
@@ -39,7 +75,7 @@ def emit_progress_bar(progress: str, index: int, total: int, percent_offset: flo
     :return: progress string.
     """
 
-    w, h = get_terminal_size()
+    w, h = _terminal_size()
     if percent_offset > 1e-9:
         w = w * 0.5
     sys.stdout.write("\r")
@@ -63,11 +99,123 @@ def emit_progress_bar(progress: str, index: int, total: int, percent_offset: flo
     return progress
 
 
+class ProgressReporter:
+    """
+    A progress reporter that is cheap enough to be updated for every item of
+    a long-running process. Updates are throttled: the progress bar is redrawn,
+    and the callback called, only once at least a step of the current stage has
+    been completed and at least an interval has passed since the last update,
+    as well as when a stage finishes. The clock is read at most once per step
+    and the terminal width once, when the reporter is created.
+    :param display: a boolean to indicate whether or not to draw a progress bar.
+    :param callback: an optional function, such as a logger or metrics hook,
+    called on each update with the name of the stage, the number of items done
+    and the total number of items of the stage (None if unknown).
+    :param interval: the minimum number of seconds between updates.
+    :param step: the minimum fraction of a stage between updates.
+    :param stream: the stream to which the progress bar is written, default stdout.
+    """
+
+    def __init__(self, display: bool = True, callback: Callable = None, interval: float = 0.1,
+                 step: float = 0.01, stream: TextIO = None):
+        self.display = display
+        self.callback = callback
+        self.interval = interval
+        self.step = step
+        self._stream = stream if stream is not None else sys.stdout
+        self._width = max(int(_terminal_size()[0]) - 14, 10) if display else 0
+        self._stage = None
+        self._total = None
+        self._offset = 0.
+        self._span = 1.
+        self._stride = 1
+        self._next = 0
+        self._last = float("-inf")
+        self._drawn = False
+
+    def start(self, stage: str, total: int = None, offset: float = 0., span: float = 1.) -> None:
+        """
+        Starts tracking a stage of the process.
+        :param stage: the name of the stage.
+        :param total: the number of items in the stage, if known.
+        :param offset: the fraction of the whole process completed before the stage.
+        :param span: the fraction of the whole process taken by the stage.
+        :return: None
+        """
+
+        self._stage = stage
+        self._total = total
+        self._offset = offset
+        self._span = span
+        self._stride = max(int(total * self.step), 1) if total else 1
+        self._next = 0
+
+    def update(self, done: int) -> None:
+        """
+        Reports the number of items of the current stage that are done.
+        :param done: the number of items done.
+        :return: None
+        """
+
+        if done < self._next:
+            return
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            self._next = done + self._stride
+            return
+        self._emit(done, now)
+
+    def finish(self, done: int = None) -> None:
+        """
+        Reports that the current stage is done, regardless of throttling.
+        :param done: the number of items done, default the total of the stage.
+        :return: None
+        """
+
+        self._emit(self._total if done is None else done, time.monotonic())
+
+    def close(self) -> None:
+        """
+        Ends the line of the progress bar, if one was drawn since the reporter
+        was created or last closed.
+        :return: None
+        """
+
+        if self._drawn:
+            self._stream.write("\n")
+            self._stream.flush()
+            self._drawn = False
+
+    def _emit(self, done: int, now: float) -> None:
+        """
+        Calls the callback and redraws the progress bar.
+        :param done: the number of items done.
+        :param now: the current time, from time.monotonic.
+        :return: None
+        """
+
+        self._last = now
+        self._next = done + self._stride
+
+        if self.callback is not None:
+            self.callback(self._stage, done, self._total)
+
+        if self.display:
+            if self._total:
+                percent = self._offset + self._span * min(done / self._total, 1.)
+                filled = int(self._width * percent)
+                self._stream.write("\r[ %s%s ] %.2f%%" % ("=" * filled, " " * (self._width - filled), percent * 100))
+            else:
+                self._stream.write("\r[ %s ] %d" % (self._stage, done))
+            self._stream.flush()
+            self._drawn = True
+
+
 def check_author_count(counter: Counter) -> bool:
     """
     Takes a set of documents and counts the number of authors. If less than
     2, returns False otherwise True.
-    :param counter: a Counter object for author counts.
+    :param counter: a Counter object (or any mapping keyed by author) for author counts.
     :return: a boolean indicating whether or not the document set can be
     analyzed (True for yes, no for False).
     """
@@ -0,0 +1,121 @@
+# imports
+from author_rank.graph import Graph, _check_large_documents, _effective_n_jobs, _sums
+from collections import deque
+import itertools
+from typing import Any, Iterable, Iterator, List, Tuple
+import warnings
+
+
+def sliding_windows(documents: Iterable[dict], timestamp_key: str, window: Any, step: Any = None,
+                    start: Any = None, n: int = 10, normalize_scores: bool = False,
+                    authorship_key: str = "authors", keys: Iterable[str] = None, alpha: float = 0.85,
+                    personalization: dict = None, max_iter: int = 100, tol: float = 1.0e-6,
+                    warm_start: bool = True, large_documents: str = "expand", max_document_authors: int = 500,
+                    n_jobs: int = 1, ar_graph: Graph = None) -> Iterator[Tuple[Any, Any, List, List]]:
+    """
+    Calculates the top authors of each window of time over a stream of dated
+    documents, such as the last five years by quarter, without fitting a graph
+    for every window. The documents are split into periods of length step.
+    As the window slides forward by a step, the author counts and summed edge
+    exclusivity of the entering period are added to the graph and those of
+    the leaving period, kept since it entered, are subtracted, and the graph
+    is re-scored starting from the scores of the previous window.
+    :param documents: an iterable of dictionaries which represent documents,
+    in ascending order of timestamp, such as a generator or read_documents.
+    :param timestamp_key: the key in the document which contains its timestamp,
+    such as a year, a number of seconds or a datetime. For calendar periods,
+    such as quarters, use the number of the period, e.g. year * 4 + quarter.
+    :param window: the length of each window, a whole multiple of step, e.g.
+    a number, or a timedelta for datetime timestamps.
+    :param step: the amount by which the window slides forward, default the
+    length of the window.
+    :param start: the timestamp at which the first period starts, default the
+    timestamp of the first document.
+    :param n: an integer to specify the maximum number of authors returned
+    for each window.
+    :param normalize_scores: a boolean to indicate whether or not to normalize
+    the scores between 0 and 1.
+    :param authorship_key: the key in the document which contains a list
+    of dictionaries representing authors.
+    :param keys: the keys to be used to create a UID for authors.
+    :param alpha: the PageRank damping parameter.
+    :param personalization: a dictionary keyed by author UID with teleport
+    weights, default uniform.
+    :param max_iter: the maximum number of PageRank power iterations.
+    :param tol: the PageRank error tolerance used to check convergence.
+    :param warm_start: a boolean to indicate whether or not to start PageRank
+    from the scores of the previous window.
+    :param large_documents: how documents with more than max_document_authors
+    authors are handled, as in Graph.fit.
+    :param max_document_authors: the number of authors above which a document
+    is large.
+    :param n_jobs: the number of processes across which co-author pairs are
+    expanded and summed, default 1. -1 uses all CPUs.
+    :param ar_graph: an optional Graph that holds the graph of the current
+    window, so that it can be inspected between windows. It is cleared first.
+    :return: an iterator of tuples, one per window, which contain the start and
+    end of the window, the top authors of the window and their scores. Windows
+    are yielded for every step from the first period to that of the last
+    document, so that the first windows may extend before start.
+    """
+
+    if step is None:
+        step = window
+    if not step > step * 0:
+        raise ValueError("step must be positive, got %r." % (step,))
+    if window % step:
+        raise ValueError("window must be a whole multiple of step, got %r and %r." % (window, step))
+    _check_large_documents(large_documents, max_document_authors)
+    n_jobs = _effective_n_jobs(n_jobs)
+    if keys is None:
+        keys = {"first_name", "last_name"}
+
+    if ar_graph is None:
+        ar_graph = Graph()
+    ar_graph._reset()
+    ar_graph._authorship_key = authorship_key
+    ar_graph._keys = keys
+    ar_graph._large_documents = large_documents
+    ar_graph._max_document_authors = max_document_authors
+    policy = {"large_documents": large_documents, "max_document_authors": max_document_authors}
+    n_periods = window // step
+
+    def period(document: dict) -> int:
+        # the number of the period of a document, counted in steps from start
+        nonlocal start, previous
+        timestamp = document[timestamp_key]
+        if start is None:
+            start = timestamp
+        if timestamp < start or (previous is not None and timestamp < previous):
+            raise ValueError("Documents must be in ascending order of %r, starting at %r; got %r after %r."
+                             % (timestamp_key, start, timestamp, previous))
+        previous = timestamp
+        return (timestamp - start) // step
+
+    # the partial sums of each period in the current window, oldest first
+    periods, previous, current = deque(), None, 0
+    for number, group in itertools.groupby(documents, key=period):
+        partial_sums = list(_sums(group, authorship_key, keys, n_jobs, **policy))
+
+        # periods without documents still move the window forward
+        while current <= number:
+            periods.append(partial_sums if current == number else list())
+            with warnings.catch_warnings():
+                # windows with fewer than two authors are reported as empty
+                warnings.simplefilter("ignore", UserWarning)
+                if len(periods) > n_periods:
+                    leaving = periods.popleft()
+                    if leaving:
+                        ar_graph._apply_sums(leaving, subtract=True)
+                if periods[-1]:
+                    ar_graph._apply_sums(periods[-1])
+
+            top_authors, top_scores = list(), list()
+            if ar_graph._is_fit:
+                top_authors, top_scores = ar_graph.top_authors(
+                    n=n, normalize_scores=normalize_scores, alpha=alpha, personalization=personalization,
+                    max_iter=max_iter, tol=tol, warm_start=warm_start
+                )
+            end = start + (current + 1) * step
+            yield end - window, end, top_authors, top_scores
+            current += 1
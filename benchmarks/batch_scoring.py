@@ -0,0 +1,38 @@
+# imports
+import author_rank as ar
+from corpus import generate_documents
+import random
+import time
+
+
+# a corpus and a thousand topic queries, each matching a random subset of its documents
+documents = generate_documents(n_documents=50000, n_authors=40000, mean_authors=4., seed=23)
+rng = random.Random(29)
+subsets = [rng.sample(range(len(documents)), rng.randint(20, 500)) for _ in range(1000)]
+
+
+def graph_per_subset() -> list:
+    # the pattern of examples/cord.py: fit a Graph to the documents of each query, then rank
+    results = list()
+    for subset in subsets:
+        ar_graph = ar.Graph()
+        ar_graph.fit(documents=[documents[i] for i in subset])
+        results.append(ar_graph.top_authors(n=10))
+    return results
+
+
+def batch() -> list:
+    return ar.batch_top_authors(documents, subsets, n=10)
+
+
+print("%d documents, %d subsets" % (len(documents), len(subsets)))
+print("%24s %12s" % ("", "time (s)"))
+results = dict()
+for name, function in [("Graph per subset", graph_per_subset), ("batch_top_authors", batch)]:
+    t0 = time.perf_counter()
+    results[name] = function()
+    print("%24s %12.2f" % (name, time.perf_counter() - t0))
+
+# authors tied with the tenth may differ, as ties are broken by the order in which authors are numbered
+same = sum(max(abs(x - y) for x, y in zip(a[1], b[1])) < 1e-12 for a, b in zip(results["Graph per subset"], results["batch_top_authors"]))
+print("subsets with the same top 10 scores: %d of %d" % (same, len(subsets)))
@@ -0,0 +1,75 @@
+# imports
+import itertools
+import random
+from typing import List
+
+
+DISTRIBUTIONS = ("exponential", "heavy_tailed")
+
+
+def authors_per_document(rng: random.Random, distribution: str, mean_authors: float,
+                         max_authors: int, tail_index: float = 1.2) -> int:
+    """
+    Draws the number of authors of a document.
+    :param rng: a random number generator.
+    :param distribution: "exponential", where large author lists are very rare,
+    or "heavy_tailed", a Pareto distribution that produces occasional consortium
+    papers with hundreds or thousands of authors.
+    :param mean_authors: the approximate mean number of authors per document.
+    :param max_authors: the maximum number of authors per document.
+    :param tail_index: the shape of the Pareto distribution, smaller values
+    produce more large author lists.
+    :return: the number of authors.
+    """
+
+    if distribution == "exponential":
+        k = 1 + int(rng.expovariate(1. / (mean_authors - 1)))
+    elif distribution == "heavy_tailed":
+        # scale the Pareto distribution so that its mean is close to mean_authors
+        scale = mean_authors * (tail_index - 1) / tail_index
+        k = max(int(scale * rng.paretovariate(tail_index)), 1)
+    else:
+        raise ValueError("distribution must be one of %s, got %r." % (", ".join(DISTRIBUTIONS), distribution))
+
+    return min(k, max_authors)
+
+
+def generate_documents(n_documents: int, n_authors: int, mean_authors: float = 4.,
+                       seed: int = 777, authorship_key: str = "authors",
+                       distribution: str = "exponential", max_authors: int = 3000) -> List[dict]:
+    """
+    Generates a synthetic corpus of documents for benchmarking. Authors are
+    drawn from a pool of n_authors with a skewed (Zipf-like) popularity, so that
+    a small number of authors appear on many documents, as in real corpora.
+    :param n_documents: the number of documents to be generated.
+    :param n_authors: the size of the pool of authors.
+    :param mean_authors: the mean number of authors per document.
+    :param seed: a seed so that corpora are reproducible.
+    :param authorship_key: the key in each document which contains its authors.
+    :param distribution: the distribution of the number of authors per document,
+    "exponential" or "heavy_tailed".
+    :param max_authors: the maximum number of authors per document.
+    :return: a list of dictionaries which represent documents.
+    """
+
+    rng = random.Random(seed)
+    pool = list(range(n_authors))
+    cumulative = list(itertools.accumulate(1. / (i + 1) for i in pool))
+    max_authors = min(max_authors, n_authors)
+
+    documents = list()
+    for _ in range(n_documents):
+        k = authors_per_document(rng, distribution, mean_authors, max_authors)
+        if k > n_authors // 10:
+            # large author lists are drawn uniformly, as few authors would repeat
+            authors = set(rng.sample(pool, k))
+        else:
+            authors = set(rng.choices(pool, cum_weights=cumulative, k=k))
+        documents.append({
+            authorship_key: [
+                {"first_name": "First%d" % a, "last_name": "Last%d" % a, "affiliation": {"name": "Org%d" % (a % 97)}}
+                for a in authors
+            ]
+        })
+
+    return documents
@@ -0,0 +1,48 @@
+# imports
+import author_rank as ar
+from corpus import generate_documents
+import numpy as np
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def startup(code: str, repeat: int = 15) -> tuple:
+    """
+    Returns the median wall time of running code in a new interpreter, in milliseconds,
+    and the heavy dependencies that it imported.
+    """
+
+    report = "; import sys; print(','.join(m for m in %r if m in sys.modules))" % (HEAVY,)
+    times, loaded = list(), ""
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        loaded = subprocess.run([sys.executable, "-c", code + report], check=True, stdout=subprocess.PIPE,
+                                universal_newlines=True).stdout.strip()
+        times.append(time.perf_counter() - t0)
+    return 1000 * float(np.median(times)), loaded
+
+
+HEAVY = ("numpy", "scipy", "networkx", "python_utils")
+
+with tempfile.TemporaryDirectory() as directory:
+    # a saved ranking, as loaded by command-line tools and batch workers
+    path = os.path.join(directory, "graph.bin")
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=generate_documents(n_documents=20000, n_authors=20000, mean_authors=4., seed=3))
+    ar_graph.scores()
+    ar_graph.save(path)
+
+    runs = [
+        ("python", "pass"),
+        ("import author_rank", "import author_rank"),
+        ("access Graph", "import author_rank; author_rank.Graph"),
+        ("load and top_authors", "import author_rank; author_rank.Graph.load(%r).top_authors()" % path),
+        ("import networkx", "import networkx"),
+    ]
+    print("%24s %16s  %s" % ("", "median (ms)", "heavy imports"))
+    for name, code in runs:
+        elapsed, loaded = startup(code)
+        print("%24s %16.1f  %s" % (name, elapsed, loaded or "-"))
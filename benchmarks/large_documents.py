@@ -0,0 +1,50 @@
+# imports
+import author_rank as ar
+from corpus import generate_documents
+import numpy as np
+import time
+import tracemalloc
+
+
+# a heavy-tailed corpus, with occasional consortium papers of hundreds of authors
+documents = generate_documents(
+    n_documents=10000, n_authors=20000, mean_authors=6., distribution="heavy_tailed", max_authors=2000, seed=3
+)
+lengths = np.array([len(d["authors"]) for d in documents])
+max_document_authors = 200
+print("%d documents, %d with more than %d authors, up to %d authors" % (
+    len(documents), (lengths > max_document_authors).sum(), max_document_authors, lengths.max()
+))
+
+
+def fit(large_documents: str) -> ar.Graph:
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=documents, large_documents=large_documents, max_document_authors=max_document_authors)
+    ar_graph.top_authors(n=100)
+    return ar_graph
+
+
+print("%8s %10s %12s %14s %14s %12s" % ("policy", "fit (s)", "peak (MB)", "max abs diff", "L1 diff", "top 100"))
+exact_scores, exact_top = None, None
+for policy in ar.graph.LARGE_DOCUMENT_POLICIES:
+    t0 = time.perf_counter()
+    ar_graph = fit(policy)
+    seconds = time.perf_counter() - t0
+
+    # compare the scores of every author and the top 100 authors to those of the exact expansion
+    authors, scores = ar_graph.scores()
+    scores = dict(zip(authors, scores))
+    top = set(ar_graph.top_authors(n=100)[0])
+    if exact_scores is None:
+        exact_scores, exact_top = scores, top
+    difference = np.array([scores[a] - exact_scores[a] for a in exact_scores])
+    del ar_graph
+
+    tracemalloc.start()
+    fit(policy)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print("%8s %10.3f %12.1f %14.2e %14.2e %12d" % (
+        policy, seconds, peak / 2 ** 20, np.abs(difference).max(), np.abs(difference).sum(), len(top & exact_top)
+    ))
@@ -0,0 +1,50 @@
+# imports
+import author_rank as ar
+from corpus import generate_documents
+import numpy as np
+import random
+import time
+
+
+def latency(function, queries: list) -> float:
+    """
+    Returns the median time of a search function over a list of queries, in milliseconds.
+    """
+
+    times = list()
+    for query in queries:
+        t0 = time.perf_counter()
+        function(query)
+        times.append(time.perf_counter() - t0)
+    return 1000 * float(np.median(times))
+
+
+# a corpus with hundreds of thousands of authors
+documents = generate_documents(n_documents=400000, n_authors=1000000, mean_authors=4., seed=17)
+ar_graph = ar.Graph()
+ar_graph.fit(documents=documents, keys=["first_name", "last_name"])
+del documents
+ar_graph.scores()
+
+t0 = time.perf_counter()
+index = ar.NameIndex(ar_graph)
+print("%d authors, name index built in %.2f s" % (len(index), time.perf_counter() - t0))
+
+rng = random.Random(5)
+uids = [ar_graph._authors[rng.randrange(len(index))] for _ in range(50)]
+prefixes = ["%s last%s" % (first.lower(), last[4:6]) for first, last in uids]
+misspelled = ["%s %s" % (last, first[:-1]) for first, last in uids]
+
+
+def scan(prefix: str) -> list:
+    # the linear scan over every author that the index replaces
+    return [uid for uid in ar_graph._authors if ar.utils.normalize_name(uid).startswith(prefix)]
+
+
+print("%24s %16s" % ("", "median (ms)"))
+print("%24s %16.3f" % ("linear scan", latency(scan, prefixes[:5])))
+print("%24s %16.3f" % ("search", latency(index.search, prefixes)))
+t0 = time.perf_counter()
+index.fuzzy_search(misspelled[0])
+print("%24s %16.3f" % ("first fuzzy_search", 1000 * (time.perf_counter() - t0)))
+print("%24s %16.3f" % ("fuzzy_search", latency(index.fuzzy_search, misspelled)))
@@ -0,0 +1,39 @@
+# imports
+import author_rank as ar
+from corpus import generate_documents
+import random
+import time
+
+
+# a graph and two hundred sets of seed authors, such as the experts on each of many topics
+documents = generate_documents(n_documents=100000, n_authors=80000, mean_authors=4., seed=31)
+ar_graph = ar.Graph()
+ar_graph.fit(documents=documents)
+authors = ar_graph.scores()[0]
+rng = random.Random(37)
+seeds = [rng.sample(authors, rng.randint(1, 20)) for _ in range(200)]
+
+
+def one_at_a_time() -> list:
+    results = list()
+    for seed in seeds:
+        ar_graph._invalidate()
+        results.append(ar_graph.top_authors(n=10, personalization=dict.fromkeys(seed, 1.)))
+    return results
+
+
+def batched() -> list:
+    ar_graph._invalidate()
+    return ar_graph.personalized_top_authors(seeds, n=10)
+
+
+print("%d authors, %d personalizations" % (len(authors), len(seeds)))
+print("%28s %12s" % ("", "time (s)"))
+results = dict()
+for name, function in [("top_authors per seed set", one_at_a_time), ("personalized_top_authors", batched)]:
+    t0 = time.perf_counter()
+    results[name] = function()
+    print("%28s %12.2f" % (name, time.perf_counter() - t0))
+
+same = sum(a == b for a, b in zip(results["top_authors per seed set"], results["personalized_top_authors"]))
+print("seed sets with the same top 10: %d of %d" % (same, len(seeds)))
@@ -0,0 +1,198 @@
+# imports
+import argparse
+import author_rank as ar
+from corpus import generate_documents
+import datetime
+import itertools
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List
+
+
+# corpus scales: number of documents and size of the pool of authors
+SCALES = {
+    "small": {"n_documents": 2000, "n_authors": 2000},
+    "medium": {"n_documents": 20000, "n_authors": 20000},
+    "large": {"n_documents": 200000, "n_authors": 200000},
+}
+
+# shapes of the author lists: the distribution of the number of authors per document
+SHAPES = {
+    "typical": {"distribution": "exponential", "mean_authors": 4.},
+    "heavy_tailed": {"distribution": "heavy_tailed", "mean_authors": 6., "max_authors": 1000},
+}
+
+
+def measure(function: Callable, memory: bool = True) -> dict:
+    """
+    Runs a function and measures its wall time and, optionally, the peak
+    memory allocated while it runs. Since tracing allocations slows Python
+    code down, the time is measured in a separate, untraced run. For functions
+    that return a graph or an author table, the memory that it still holds is
+    also reported per distinct author.
+    :param function: a function without arguments.
+    :param memory: a boolean to indicate whether or not to measure peak memory.
+    :return: a dictionary with the wall time in seconds, peak memory in MB and
+    retained bytes per author.
+    """
+
+    t0 = time.perf_counter()
+    function()
+    result = {"seconds": time.perf_counter() - t0, "peak_mb": None, "bytes_per_author": None}
+
+    if memory:
+        tracemalloc.start()
+        value = function()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_mb"] = peak / 2 ** 20
+        authors = value._authors if isinstance(value, ar.Graph) else value
+        if isinstance(authors, ar.AuthorTable) and len(authors) > 0:
+            result["bytes_per_author"] = retained / len(authors)
+
+    return result
+
+
+def fit(documents: List[dict], **kwargs) -> ar.Graph:
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=documents, **kwargs)
+    return ar_graph
+
+
+def fit_with_progress(documents: List[dict], **kwargs) -> ar.Graph:
+    # draw the progress bar to os.devnull to measure its overhead rather than the terminal's
+    with open(os.devnull, "w") as f:
+        return fit(documents, progress_bar=ar.ProgressReporter(stream=f), **kwargs)
+
+
+def intern_authors(documents: List[dict], table: ar.AuthorTable) -> ar.AuthorTable:
+    # the author table alone, as built by fit in chunks of distinct UIDs
+    uids = ar.graph._author_uids(documents, "authors", {"first_name", "last_name"})
+    for _ in range(0, len(documents), 10000):
+        table.intern_many({uid: None for doc in itertools.islice(uids, 10000) for uid in doc})
+    return table
+
+
+def export(ar_graph: ar.Graph) -> None:
+    with open(os.devnull, "w") as f:
+        json.dump(ar_graph.as_json(), f)
+
+
+def export_stream(ar_graph: ar.Graph) -> None:
+    with open(os.devnull, "w") as f:
+        ar_graph.write_json(f)
+
+
+def load(path: str) -> None:
+    ar.Graph.load(path).top_authors(n=100)
+
+
+def operations(documents: List[dict], scale: str, n_jobs: int = -1) -> dict:
+    """
+    Returns the operations benchmarked for a corpus.
+    :param documents: the corpus.
+    :param scale: the name of the scale of the corpus.
+    :param n_jobs: the number of processes of the fit_parallel operation.
+    :return: a dictionary of operation names and functions without arguments.
+    """
+
+    ar_graph = fit(documents)
+    # scores are cached on a graph, so each measured run scores a newly fitted graph
+    fitted = [fit(documents) for _ in range(2)]
+
+    # the saved graph includes its scores, so that loading measures the time to serve top_authors
+    ar_graph.top_authors(n=100)
+    path = os.path.join(tempfile.mkdtemp(), "graph.bin")
+    ar_graph.save(path)
+
+    cases = {
+        "fit": lambda: fit(documents),
+        "fit_progress": lambda: fit_with_progress(documents),
+        "fit_graphless": lambda: fit(documents, build_graph=False),
+        "fit_parallel": lambda: fit(documents, n_jobs=n_jobs),
+        "fit_hashed": lambda: fit(documents, hash_uids=True),
+        "author_table": lambda: intern_authors(documents, ar.AuthorTable()),
+        "author_table_hashed": lambda: intern_authors(documents, ar.HashedAuthorTable()),
+        "score": lambda: fitted.pop().top_authors(n=100),
+        "export_json": lambda: export(ar_graph),
+        "export_stream": lambda: export_stream(ar_graph),
+        "save": lambda: ar_graph.save(path),
+        "load": lambda: load(path),
+    }
+    if scale == "small":
+        # the Python engine is quadratic in the number of authors per document
+        cases["fit_python"] = lambda: fit(documents, engine="python")
+        cases["fit_python_progress"] = lambda: fit_with_progress(documents, engine="python")
+
+    return cases
+
+
+def compare(results: List[dict], baseline_path: str) -> None:
+    """
+    Prints the ratio of each result to the matching result in a baseline
+    results file, such as one from a previous release.
+    :param results: the results of this run.
+    :param baseline_path: the path to a previous results file.
+    :return: None
+    """
+
+    with open(baseline_path, "r") as f:
+        baseline = {(r["scale"], r["shape"], r["operation"]): r for r in json.load(f)["results"]}
+
+    print("\n%8s %14s %19s %12s %12s" % ("scale", "shape", "operation", "time ratio", "peak ratio"))
+    for r in results:
+        b = baseline.get((r["scale"], r["shape"], r["operation"]))
+        if b is None:
+            continue
+        peak = "" if not (r["peak_mb"] and b["peak_mb"]) else "%.2f" % (r["peak_mb"] / b["peak_mb"])
+        print("%8s %14s %19s %12.2f %12s" % (r["scale"], r["shape"], r["operation"], r["seconds"] / b["seconds"], peak))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark AuthorRank across corpus scales and author-list shapes.")
+    parser.add_argument("--scales", nargs="+", default=["small", "medium"], choices=sorted(SCALES))
+    parser.add_argument("--shapes", nargs="+", default=sorted(SHAPES), choices=sorted(SHAPES))
+    parser.add_argument("--output", default="results.json", help="the path of the JSON results file.")
+    parser.add_argument("--compare", default=None, help="the path of a previous results file to compare against.")
+    parser.add_argument("--no-memory", action="store_true", help="skip measuring peak memory.")
+    parser.add_argument("--n-jobs", type=int, default=-1,
+                        help="the number of processes of the fit_parallel operation, -1 for all CPUs.")
+    args = parser.parse_args()
+
+    results = list()
+    print("%8s %14s %19s %10s %12s %12s" % ("scale", "shape", "operation", "time (s)", "peak (MB)", "B/author"))
+    for scale in args.scales:
+        for shape in args.shapes:
+            documents = generate_documents(**SCALES[scale], **SHAPES[shape])
+            n_mentions = sum(len(d["authors"]) for d in documents)
+            for operation, function in operations(documents, scale, args.n_jobs).items():
+                result = measure(function, memory=not args.no_memory)
+                result.update({
+                    "scale": scale, "shape": shape, "operation": operation,
+                    "documents": len(documents), "author_mentions": n_mentions,
+                })
+                results.append(result)
+                peak = "" if result["peak_mb"] is None else "%.1f" % result["peak_mb"]
+                per_author = "" if result["bytes_per_author"] is None else "%.0f" % result["bytes_per_author"]
+                print("%8s %14s %19s %10.3f %12s %12s" % (scale, shape, operation, result["seconds"], peak,
+                                                         per_author))
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "version": ar.__version__,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "date": datetime.datetime.now().isoformat(),
+            "results": results,
+        }, f, indent=2)
+
+    if args.compare is not None:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# imports
+import asyncio
+import author_rank as ar
+from concurrent.futures import ThreadPoolExecutor
+from corpus import generate_documents
+import numpy as np
+import random
+import time
+
+
+# a served graph, the corpus of the graph that replaces it during the run, and the requests of the clients
+documents = generate_documents(n_documents=100000, n_authors=80000, mean_authors=4., seed=41)
+updated_documents = generate_documents(n_documents=100000, n_authors=80000, mean_authors=4., seed=43)
+rate, n_requests = 500., 2000
+rng = random.Random(47)
+
+
+def serve() -> ar.Graph:
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=documents)
+    return ar_graph
+
+
+authors = serve().scores()[0]
+seeds = [{a: 1. for a in rng.sample(authors[:1000], 3)} for _ in range(100)]
+requests = [
+    {"n": rng.choice([5, 10, 20]), "personalization": rng.choice(seeds) if rng.random() < .5 else None}
+    for _ in range(n_requests)
+]
+
+
+async def heartbeat(lags: list, stop: asyncio.Event) -> None:
+    # the delay of a task that wakes up every millisecond measures how long the event loop is blocked
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(.001)
+        lags.append(time.perf_counter() - t0 - .001)
+
+
+async def load_test(top_authors, swap=None) -> dict:
+    # requests arrive at a fixed rate, whether or not earlier requests have completed, and the
+    # latency of each is measured from its arrival, so that time spent waiting for the loop counts
+    latencies, lags, stop = list(), list(), asyncio.Event()
+
+    async def request(arrival: float, kwargs: dict) -> None:
+        await top_authors(**kwargs)
+        latencies.append(time.perf_counter() - arrival)
+
+    monitor = asyncio.ensure_future(heartbeat(lags, stop))
+    tasks, t0 = list(), time.perf_counter()
+    for i, kwargs in enumerate(requests):
+        arrival = t0 + i / rate
+        await asyncio.sleep(max(arrival - time.perf_counter(), 0))
+        if swap is not None and i == n_requests // 2:
+            tasks.append(asyncio.ensure_future(swap()))
+        tasks.append(asyncio.ensure_future(request(arrival, kwargs)))
+    await asyncio.gather(*tasks)
+    seconds = time.perf_counter() - t0
+    stop.set()
+    await monitor
+
+    latencies = 1000 * np.array(latencies)
+    return {"p50": np.percentile(latencies, 50), "p99": np.percentile(latencies, 99),
+            "throughput": n_requests / seconds, "max lag": 1000 * max(lags, default=0.)}
+
+
+async def blocking() -> dict:
+    # scoring directly in the event loop, which blocks every other request
+    ar_graph = serve()
+
+    async def top_authors(**kwargs):
+        return ar_graph.top_authors(**kwargs)
+
+    return await load_test(top_authors)
+
+
+async def service() -> dict:
+    ranking_service = ar.RankingService(serve(), executor=ThreadPoolExecutor(max_workers=1))
+    return await load_test(ranking_service.top_authors)
+
+
+async def service_with_swap() -> dict:
+    ranking_service = ar.RankingService(serve(), executor=ThreadPoolExecutor(max_workers=1))
+    return await load_test(ranking_service.top_authors, swap=lambda: ranking_service.fit(updated_documents))
+
+
+print("%d requests at %d per second, half of them personalized with one of %d seed sets" % (
+    n_requests, rate, len(seeds)
+))
+print("%30s %10s %10s %16s %14s" % ("", "p50 (ms)", "p99 (ms)", "requests / s", "max lag (ms)"))
+for name, run in [("blocking", blocking), ("RankingService", service),
+                  ("RankingService, refit and swap", service_with_swap)]:
+    result = asyncio.run(run())
+    print("%30s %10.2f %10.2f %16.1f %14.1f" % (
+        name, result["p50"], result["p99"], result["throughput"], result["max lag"]
+    ))
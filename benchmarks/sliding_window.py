@@ -0,0 +1,37 @@
+# imports
+import author_rank as ar
+from corpus import generate_documents
+import time
+
+
+# ten years of documents by quarter, ranked over windows of the last five years
+n_quarters, window = 40, 20
+documents = generate_documents(n_documents=120000, n_authors=60000, mean_authors=4., seed=11)
+for i, document in enumerate(documents):
+    document["quarter"] = i * n_quarters // len(documents)
+
+
+def refit() -> list:
+    # fit a graph from scratch for every window
+    series = list()
+    for end in range(1, n_quarters + 1):
+        ar_graph = ar.Graph()
+        ar_graph.fit(documents=[d for d in documents if end - window <= d["quarter"] < end])
+        series.append(ar_graph.top_authors(n=10)[0])
+    return series
+
+
+def slide() -> list:
+    return [authors for _, _, authors, _ in ar.sliding_windows(documents, "quarter", window=window, step=1, n=10)]
+
+
+print("%d documents, %d windows of %d quarters" % (len(documents), n_quarters, window))
+print("%24s %12s" % ("", "time (s)"))
+results = dict()
+for name, function in [("refit every window", refit), ("sliding_windows", slide)]:
+    t0 = time.perf_counter()
+    results[name] = function()
+    print("%24s %12.2f" % (name, time.perf_counter() - t0))
+
+same = sum(set(a) == set(b) for a, b in zip(results["refit every window"], results["sliding_windows"]))
+print("windows with the same top 10 authors: %d of %d" % (same, n_quarters))
@@ -0,0 +1,37 @@
+# imports
+import author_rank as ar
+from corpus import generate_documents
+import copy
+import time
+import tracemalloc
+
+
+def fit(documents: list) -> None:
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=documents, keys={"name"})
+
+
+def deepcopy_then_fit(documents: list) -> None:
+    fit(copy.deepcopy(documents))
+
+
+# a corpus the size of the CORD-19 2020-07-16 metadata used in examples/cord.py, where
+# each author has a full name and metadata that fit previously deleted from the documents
+documents = [
+    {"authors": [{"name": "%s %s" % (a["first_name"], a["last_name"]), "affiliation": a["affiliation"]}
+                 for a in d["authors"]]}
+    for d in generate_documents(n_documents=190000, n_authors=400000, mean_authors=6., seed=19)
+]
+
+print("%24s %12s" % ("", "time (s)"))
+for name, function in [("deepcopy, then fit", deepcopy_then_fit), ("fit", fit)]:
+    t0 = time.time()
+    function(documents)
+    print("%24s %12.2f" % (name, time.time() - t0))
+
+# the memory held by the copy of the corpus, in addition to the memory used by fit
+tracemalloc.start()
+documents_copy = copy.deepcopy(documents)
+size, _ = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+print("memory of the deepcopy: %.1f MB" % (size / 2 ** 20))
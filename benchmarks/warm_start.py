@@ -0,0 +1,41 @@
+# imports
+import author_rank as ar
+from corpus import generate_documents
+import numpy as np
+import time
+
+
+# a large base corpus followed by small hourly batches of new documents,
+# some of which introduce new authors
+base = generate_documents(n_documents=50000, n_authors=20000, seed=1)
+batches = [generate_documents(n_documents=250, n_authors=21000, seed=s) for s in range(2, 7)]
+
+# the default tolerance and a tighter one, as used when comparing rankings deep into the tail
+tolerances = [1.0e-6, 1.0e-10]
+
+ar_graph = ar.Graph()
+ar_graph.fit(documents=base)
+matrix, authors = ar.score.adjacency_matrix(ar_graph.graph)
+previous = {tol: ar.score.pagerank(matrix, tol=tol) for tol in tolerances}
+print("base graph: %d authors, %d edges" % (len(authors), matrix.nnz))
+
+print("%8s %8s %12s %12s %12s %12s" % ("batch", "tol", "cold iters", "warm iters", "cold (s)", "warm (s)"))
+for i, batch in enumerate(batches):
+    ar_graph.partial_fit(documents=batch)
+    previous_authors = authors
+    matrix, authors = ar.score.adjacency_matrix(ar_graph.graph)
+
+    for tol in tolerances:
+        # align the previous scores with the updated graph, new authors are marked as NaN
+        scores = dict(zip(previous_authors, previous[tol]))
+        nstart = ar.score.warm_start(np.array([scores.get(a, np.nan) for a in authors]))
+
+        t0 = time.time()
+        _, cold = ar.score.pagerank(matrix, tol=tol, full_output=True)
+        t1 = time.time()
+        previous[tol], warm = ar.score.pagerank(matrix, tol=tol, nstart=nstart, full_output=True)
+        t2 = time.time()
+
+        print("%8d %8.0e %12d %12d %12.4f %12.4f" % (
+            i + 1, tol, cold["iterations"], warm["iterations"], t1 - t0, t2 - t1
+        ))
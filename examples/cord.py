@@ -44,10 +44,9 @@ top = ar_graph.top_authors(
 for i, j in zip(top[0], top[1]):
     print(i, j)
 
-# export the data
-G_json = ar_graph.as_json()
+# export the data, writing the graph one node and link at a time
 with open("../visualization/data/cord_graph.json", 'w') as f_out:
-    json.dump(G_json, f_out)
+    ar_graph.write_json(f_out)
 
 scores_json = dict()
 for t in zip(top[0], top[1]):
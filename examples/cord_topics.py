@@ -0,0 +1,28 @@
+import author_rank as ar
+import pandas as pd
+
+
+# read in the data
+cord_df = pd.read_csv("../data/CORD-19/2020-07-16/metadata.csv", low_memory=False)
+titles = cord_df["title"].astype(str).str.lower()
+authors_by_document = cord_df["authors"].astype(str).apply(
+    lambda row: [r.strip() for r in row.split(";")]
+)
+
+documents = [
+    {"authors": [{"name": auth} for auth in doc]}  # cord 19 has full name as represented on document
+    for doc in authors_by_document
+]
+
+# the documents whose titles match each topic
+topics = ["bronchiolitis", "influenza", "vaccine", "ventilator", "transmission"]
+subsets = [titles.index[titles.str.contains(topic)].tolist() for topic in topics]
+
+# rank the authors of every topic at once, rather than fitting a graph per topic
+results = ar.batch_top_authors(documents, subsets, n=10, normalize_scores=True, keys={"name"})
+
+# print the results
+for topic, (authors, scores) in zip(topics, results):
+    print(topic)
+    for i, j in zip(authors, scores):
+        print("   ", i, j)
@@ -1,6 +1,7 @@
 # imports
 import author_rank as ar
 import json
+import sys
 
 
 # read in sample json
@@ -19,3 +20,6 @@ ar_graph.fit(
 export = ar_graph.as_json()
 
 print(json.dumps(export, indent=4))
+
+# or write them to a file-like object one node and link at a time, along with their scores
+ar_graph.write_json(sys.stdout, scores=True)
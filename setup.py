@@ -12,5 +12,9 @@ setup(
     keywords=['author_rank', 'PageRank', 'network', 'graph', 'edges', 'nodes', 'authorship', 'AuthorRank'],
     classifiers=[],
     license='MIT',
-    install_requires=['networkx', 'python-utils', 'scipy']
+    python_requires='>=3.7',
+    install_requires=['networkx', 'numpy>=1.17', 'python-utils', 'scipy'],
+    entry_points={
+        'console_scripts': ['author-rank=author_rank.cli:main']
+    }
 )
@@ -1,11 +1,21 @@
 # imports
+import asyncio
 import author_rank as ar
+import copy
 from author_rank.utils import emit_progress_bar, normalize
+import io
 import json
+import networkx as nx
+import numpy as np
 import os
 import pytest
 import random
+from scipy import sparse
+import subprocess
+import sys
 import time
+import warnings
+import zlib
 
 
 @pytest.fixture()
@@ -299,3 +309,1087 @@ def test_speed(mls_data) -> None:
     spread = t1 - t0
     assert spread < 320.
 
+
+
+def test_sparse_engine_weights(sample_data, zero_division_data) -> None:
+    """
+    Test to ensure that the sparse fit engine produces the same edges and
+    normalized edge weights as the original Python engine.
+    :param sample_data: the sample data
+    :param zero_division_data: the sample data that manifests a ZeroDivisionError
+    :return: None
+    """
+
+    datasets = [sample_data['documents'], zero_division_data["documents"]]
+
+    for d in datasets:
+
+        # fit the same documents with each engine
+        graphs = dict()
+        for engine in ar.graph.ENGINES:
+            ar_graph = ar.Graph()
+            ar_graph.fit(
+                documents=copy.deepcopy(d),
+                engine=engine
+            )
+            graphs[engine] = {(u, v): w for u, v, w in ar_graph.graph.edges(data="weight")}
+
+        assert graphs["sparse"].keys() == graphs["python"].keys()
+        for edge, weight in graphs["python"].items():
+            assert graphs["sparse"][edge] == pytest.approx(weight)
+
+
+def test_invalid_engine(sample_data) -> None:
+    """
+    Test to ensure that an unknown fit engine raises a ValueError.
+    :param sample_data: the sample data
+    :return: None
+    """
+
+    ar_graph = ar.Graph()
+
+    with pytest.raises(ValueError):
+        ar_graph.fit(
+            documents=sample_data['documents'],
+            engine="fortran"
+        )
+
+
+def test_pagerank_matches_networkx(sample_data) -> None:
+    """
+    Test to ensure that the native sparse PageRank scores match the scores
+    computed by NetworkX, with and without PageRank parameters.
+    :param sample_data: the sample data
+    :return: None
+    """
+
+    ar_graph = ar.Graph()
+    ar_graph.fit(
+        documents=sample_data['documents']
+    )
+
+    authors, scores = ar_graph.top_authors(n=len(ar_graph.graph))
+    rank = nx.pagerank(ar_graph.graph)
+    assert len(authors) == len(rank)
+    for author, score in zip(authors, scores):
+        assert score == pytest.approx(rank[author])
+
+    # personalize the ranking towards two of the authors
+    personalization = {authors[3]: 1., authors[5]: 2.}
+    authors, scores = ar_graph.top_authors(
+        n=len(ar_graph.graph), alpha=0.7, personalization=personalization
+    )
+    rank = nx.pagerank(ar_graph.graph, alpha=0.7, personalization=personalization)
+    for author, score in zip(authors, scores):
+        assert score == pytest.approx(rank[author])
+
+
+def test_top_n_ties() -> None:
+    """
+    Test to ensure that top-n selection returns scores in descending order and
+    breaks ties by position.
+    :return: None
+    """
+
+    scores = np.array([0.1, 0.3, 0.2, 0.3, 0.05, 0.2])
+
+    assert ar.score.top_n(scores, 3).tolist() == [1, 3, 2]
+    assert ar.score.top_n(scores, 4).tolist() == [1, 3, 2, 5]
+    assert ar.score.top_n(scores, 10).tolist() == [1, 3, 2, 5, 0, 4]
+    assert ar.score.top_n(scores, 0).tolist() == []
+
+
+def test_score_cache(sample_data, zero_division_data, monkeypatch) -> None:
+    """
+    Test to ensure that PageRank scores are computed once per set of PageRank
+    parameters, reused across calls to top_authors and scores, and recomputed
+    after the graph is fit again.
+    :param sample_data: the sample data
+    :param zero_division_data: the sample data that manifests a ZeroDivisionError
+    :param monkeypatch: the pytest monkeypatch fixture
+    :return: None
+    """
+
+    calls = list()
+
+    def counting_pagerank(*args, **kwargs):
+        calls.append(kwargs)
+        return ar.score.pagerank(*args, **kwargs)
+
+    monkeypatch.setattr(ar.graph, "pagerank", counting_pagerank)
+
+    ar_graph = ar.Graph()
+    ar_graph.fit(
+        documents=sample_data['documents']
+    )
+
+    authors, scores = ar_graph.scores()
+    assert len(authors) == len(ar_graph.graph)
+    assert scores == sorted(scores, reverse=True)
+
+    # different n and normalization reuse the cached ranking
+    assert ar_graph.top_authors(n=5) == (authors[:5], scores[:5])
+    ar_graph.top_authors(n=15, normalize_scores=True)
+    assert len(calls) == 1
+
+    # different PageRank parameters are computed separately
+    ar_graph.top_authors(alpha=0.5)
+    ar_graph.top_authors(alpha=0.5)
+    assert len(calls) == 2
+
+    # fitting the graph again invalidates the cache
+    ar_graph.fit(
+        documents=zero_division_data['documents']
+    )
+    ar_graph.top_authors()
+    assert len(calls) == 3
+
+
+def test_partial_fit(sample_data, zero_division_data) -> None:
+    """
+    Test to ensure that fitting documents A and then partially fitting
+    documents B results in the same graph and scores as fitting A and B
+    together, and that fit discards previously fit documents.
+    :param sample_data: the sample data
+    :param zero_division_data: the sample data that manifests a ZeroDivisionError
+    :return: None
+    """
+
+    docs = sample_data['documents'] + zero_division_data['documents']
+
+    # fit all of the documents at once
+    full = ar.Graph()
+    full.fit(documents=copy.deepcopy(docs))
+    full_edges = {(u, v): w for u, v, w in full.graph.edges(data="weight")}
+    full_top = full.top_authors(n=20)
+
+    for engine in ar.graph.ENGINES:
+        for split in [1, len(sample_data['documents']), len(docs) - 1]:
+            ar_graph = ar.Graph()
+            ar_graph.fit(documents=copy.deepcopy(docs[:split]), engine=engine)
+            ar_graph.top_authors()
+            ar_graph.partial_fit(documents=copy.deepcopy(docs[split:]))
+
+            edges = {(u, v): w for u, v, w in ar_graph.graph.edges(data="weight")}
+            assert edges.keys() == full_edges.keys()
+            for edge, weight in full_edges.items():
+                assert edges[edge] == pytest.approx(weight)
+
+            top = ar_graph.top_authors(n=20)
+            assert top[1] == pytest.approx(full_top[1])
+
+    # fitting again replaces, rather than extends, the graph
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=copy.deepcopy(docs))
+    ar_graph.fit(documents=copy.deepcopy(sample_data['documents']))
+    single = ar.Graph()
+    single.fit(documents=copy.deepcopy(sample_data['documents']))
+    assert set(ar_graph.graph.edges) == set(single.graph.edges)
+    assert ar_graph.top_authors() == single.top_authors()
+
+
+def test_warm_start(sample_data, zero_division_data) -> None:
+    """
+    Test to ensure that starting PageRank from the scores of a previous run
+    converges to the same scores in fewer iterations, and that authors added
+    since then start with the mean previous score.
+    :param sample_data: the sample data
+    :param zero_division_data: the sample data that manifests a ZeroDivisionError
+    :return: None
+    """
+
+    # authors that were not previously scored start with the mean score
+    nstart = ar.score.warm_start(np.array([0.2, np.nan, 0.4]), n_nodes=4)
+    assert nstart.tolist() == pytest.approx([0.2, 0.3, 0.4, 0.3] / np.sum([0.2, 0.3, 0.4, 0.3]))
+
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=copy.deepcopy(sample_data['documents']))
+    ar_graph.top_authors(tol=1.0e-10)
+    ar_graph.partial_fit(documents=copy.deepcopy(zero_division_data['documents'][:2]))
+
+    cold = ar_graph.top_authors(n=20, tol=1.0e-10)
+    ar_graph._invalidate()
+    warm = ar_graph.top_authors(n=20, tol=1.0e-10, warm_start=True)
+    assert warm[1] == pytest.approx(cold[1])
+
+    # the previous scores start closer to the solution than a uniform vector
+    matrix, authors = ar.score.adjacency_matrix(ar_graph.graph)
+    scores = dict(zip(*ar_graph.scores(tol=1.0e-10)))
+    _, cold_info = ar.score.pagerank(matrix, tol=1.0e-10, full_output=True)
+    nstart = np.array([scores[author] for author in authors])
+    _, warm_info = ar.score.pagerank(matrix, tol=1.0e-10, nstart=nstart, full_output=True)
+    assert warm_info["iterations"] < cold_info["iterations"]
+
+
+def test_read_documents(sample_data, tmp_path, monkeypatch) -> None:
+    """
+    Test to ensure that documents are streamed from JSON and JSON Lines files
+    in the same form as when the files are loaded whole, and that fitting a
+    stream of documents in small chunks produces the same graph as fitting a list.
+    :param sample_data: the sample data
+    :param tmp_path: the pytest tmp_path fixture
+    :param monkeypatch: the pytest monkeypatch fixture
+    :return: None
+    """
+
+    # decode values across many chunk boundaries
+    for chunk_size in [1, 7, 2 ** 16]:
+        docs = list(ar.read_documents("data/author_network.json", chunk_size=chunk_size))
+        assert docs == sample_data["documents"]
+
+    # an array under a key that follows other keys, a top-level array and JSON Lines
+    nested = tmp_path / "nested.json"
+    nested.write_text(json.dumps({"meta": {"tags": ["]", "}"], "count": 12345}, "documents": sample_data["documents"]}))
+    assert list(ar.read_documents(str(nested), chunk_size=5)) == sample_data["documents"]
+
+    flat = tmp_path / "flat.json"
+    flat.write_text(json.dumps(sample_data["documents"]))
+    assert list(ar.read_documents(str(flat), chunk_size=5)) == sample_data["documents"]
+
+    lines = tmp_path / "documents.jsonl"
+    lines.write_text("\n".join(json.dumps(d) for d in sample_data["documents"]) + "\n")
+    assert list(ar.read_documents(str(lines))) == sample_data["documents"]
+
+    with pytest.raises(KeyError):
+        list(ar.read_documents(str(nested), key="papers"))
+
+    # fit a generator of documents, a few documents at a time
+    monkeypatch.setattr(ar.graph, "CHUNK_PAIRS", 20)
+    streamed = ar.Graph()
+    streamed.fit(documents=ar.read_documents(str(lines)), progress_bar=True)
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=copy.deepcopy(sample_data["documents"]))
+    assert streamed.graph.edges.keys() == ar_graph.graph.edges.keys()
+    for u, v, w in ar_graph.graph.edges(data="weight"):
+        assert streamed.graph[u][v]["weight"] == pytest.approx(w)
+    assert streamed.top_authors()[0] == ar_graph.top_authors()[0]
+
+
+def test_uids_do_not_mutate(sample_data) -> None:
+    """
+    Test to ensure that fitting leaves the documents unchanged, and that
+    author UIDs are created in a deterministic key order.
+    :param sample_data: the sample data
+    :return: None
+    """
+
+    docs = sample_data['documents']
+    original = copy.deepcopy(docs)
+
+    for engine in ar.graph.ENGINES:
+        ar_graph = ar.Graph()
+        ar_graph.fit(documents=docs, engine=engine)
+        assert docs == original
+
+    # the values of a set of keys are taken in sorted order
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=docs, keys={"last_name", "first_name"})
+    assert ("Kyle", "Hundman") in ar_graph.graph
+
+    # the values of a sequence of keys are taken in the order given
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=docs, keys=["last_name", "first_name"])
+    assert ("Hundman", "Kyle") in ar_graph.graph
+
+
+def test_author_table(sample_data) -> None:
+    """
+    Test to ensure that the author table maps UIDs to contiguous integer ids
+    in order of first appearance and back, and that the graph exported from
+    the table and the edge arrays matches the NetworkX graph.
+    :param sample_data: the sample data
+    :return: None
+    """
+
+    table = ar.AuthorTable()
+    author_ids, lengths = table.intern_documents([[("a",), ("b",)], [], [("b",), ("c",), ("a",)]])
+    assert author_ids.dtype == np.int32
+    assert author_ids.tolist() == [0, 1, 1, 2, 0]
+    assert lengths.tolist() == [2, 0, 3]
+    assert len(table) == 3
+    assert table.uids([2, 0]) == [("c",), ("a",)]
+    assert table.ids([("b",), ("a",)]).tolist() == [1, 0]
+    assert table.get(("d",)) is None
+    assert table.intern(("d",)) == 3
+
+    for engine in ar.graph.ENGINES:
+        ar_graph = ar.Graph()
+        ar_graph.fit(documents=sample_data['documents'], engine=engine)
+        export = ar_graph.as_json()
+
+        assert {node["id"] for node in export["nodes"]} == set(ar_graph.graph)
+        links = {(link["source"], link["target"]): link["weight"] for link in export["links"]}
+        assert links == {(u, v): w for u, v, w in ar_graph.graph.edges(data="weight")}
+
+
+def test_parallel_fit(sample_data, zero_division_data, monkeypatch) -> None:
+    """
+    Test to ensure that fitting documents across several processes results
+    in exactly the same graph as fitting them in a single process.
+    :param sample_data: the sample data
+    :param zero_division_data: the sample data that manifests a ZeroDivisionError
+    :param monkeypatch: the pytest monkeypatch fixture
+    :return: None
+    """
+
+    # split the documents into many chunks
+    monkeypatch.setattr(ar.graph, "CHUNK_PAIRS", 20)
+    docs = sample_data['documents'] + zero_division_data['documents']
+
+    serial = ar.Graph()
+    serial.fit(documents=docs)
+    parallel = ar.Graph()
+    parallel.fit(documents=docs, n_jobs=2)
+
+    assert list(parallel._authors) == list(serial._authors)
+    assert parallel._counts.tolist() == serial._counts.tolist()
+    assert (parallel._matrix != serial._matrix).nnz == 0
+    assert dict(parallel.graph.edges) == dict(serial.graph.edges)
+    assert parallel.top_authors() == serial.top_authors()
+
+    # a corpus with fewer than CHUNK_PAIRS pairs is still split between the processes
+    monkeypatch.setattr(ar.graph, "CHUNK_PAIRS", 2 ** 22)
+    assert ar.graph._chunk_pairs(1, 10) == 2 ** 22
+    assert ar.graph._chunk_pairs(4, 10) == 3
+    assert len(list(ar.graph._sums(docs, "authors", {"first_name", "last_name"}))) == 1
+    assert len(list(ar.graph._sums(docs, "authors", {"first_name", "last_name"}, n_jobs=2))) >= 2
+    for documents in [docs, iter(docs)]:
+        parallel = ar.Graph()
+        parallel.fit(documents=documents, n_jobs=2)
+        assert list(parallel._authors) == list(serial._authors)
+        assert np.allclose(parallel._matrix.toarray(), serial._matrix.toarray())
+        assert parallel.top_authors() == serial.top_authors()
+
+    with pytest.raises(ValueError):
+        parallel.fit(documents=docs, engine="python", n_jobs=2)
+
+
+def test_progress_reporter(sample_data, monkeypatch) -> None:
+    """
+    Test to ensure that progress is reported to a callback, throttled, and
+    ends with every stage complete.
+    :param sample_data: the sample data
+    :param monkeypatch: the pytest monkeypatch fixture
+    :return: None
+    """
+
+    docs = sample_data['documents'] * 50
+
+    for engine in ar.graph.ENGINES:
+        updates = list()
+        ar_graph = ar.Graph()
+        ar_graph.fit(documents=docs, engine=engine, progress_bar=lambda *update: updates.append(update))
+
+        assert updates[-1] == ("documents" if engine == "sparse" else "edges", updates[-1][2], updates[-1][2])
+        assert ("documents", len(docs), len(docs)) in updates
+
+    # a step of a tenth of each stage and no interval results in at most about ten updates per stage
+    updates = list()
+    reporter = ar.ProgressReporter(display=False, callback=lambda *update: updates.append(update), interval=0., step=0.1)
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=docs, engine="python", progress_bar=reporter)
+    for stage in ("documents", "edges"):
+        done = [d for s, d, _ in updates if s == stage]
+        assert done == sorted(done)
+        assert 1 < len(done) <= 12
+
+    # the progress bar is written to the provided stream on a single line
+    stream = io.StringIO()
+    ar_graph.fit(documents=docs, progress_bar=ar.ProgressReporter(stream=stream))
+    assert stream.getvalue().endswith("100.00%\n")
+    assert stream.getvalue().count("\n") == 1
+
+    # the line is ended when the graph is not fit, and when fitting fails part way
+    single = [{"authors": [{"first_name": "Valentino", "last_name": "Constantinou"}, {"first_name": "Valentino"}]},
+              {"authors": [{"first_name": "Valentino", "last_name": "Constantinou"}]}]
+    for engine in ar.graph.ENGINES:
+        stream = io.StringIO()
+        with pytest.warns(UserWarning):
+            ar.Graph().fit(documents=single, keys=["first_name"], engine=engine,
+                           progress_bar=ar.ProgressReporter(stream=stream))
+        assert stream.getvalue().count("\n") == (1 if engine == "sparse" else 0)
+        assert stream.getvalue().endswith("\n") or stream.getvalue() == ""
+    monkeypatch.setattr(ar.graph, "CHUNK_PAIRS", 20)
+    stream = io.StringIO()
+    with pytest.raises(KeyError):
+        ar.Graph().fit(documents=docs + [{"title": "No authors"}],
+                       progress_bar=ar.ProgressReporter(stream=stream, interval=0.))
+    assert stream.getvalue().startswith("\r[") and stream.getvalue().count("\n") == 1
+    assert stream.getvalue().endswith("\n")
+
+
+def test_profile(sample_data) -> None:
+    """
+    Test to ensure that a profile records the phases of fitting and scoring,
+    and the convergence of PageRank, as a structured dictionary.
+    :param sample_data: the sample data
+    :return: None
+    """
+
+    phases = {
+        "sparse": {"extract_uids", "expand_pairs", "merge", "normalize", "build_graph"},
+        "python": {"extract_uids", "count_authors", "extend_graph", "sort", "weigh_graph", "build_graph"},
+    }
+
+    for engine in ar.graph.ENGINES:
+        runs = list()
+        profile = ar.Profile(memory=True, callback=runs.append)
+        ar_graph = ar.Graph()
+        ar_graph.fit(documents=sample_data['documents'], engine=engine, profile=profile)
+        ar_graph.top_authors(profile=profile)
+        ar_graph.top_authors(profile=profile)
+
+        stats = profile.as_dict()
+        assert json.loads(json.dumps(stats)) == stats
+        assert runs == stats["runs"]
+        assert [run["operation"] for run in runs] == ["fit", "top_authors", "top_authors"]
+
+        fit = runs[0]
+        assert set(fit["phases"]) == phases[engine]
+        assert fit["phases"]["extract_uids"]["items"] == len(sample_data['documents'])
+        assert fit["phases"]["build_graph"]["items"] == ar_graph.graph.number_of_edges()
+        assert sum(phase["seconds"] for phase in fit["phases"].values()) <= fit["seconds"]
+        assert all(phase["peak_bytes"] >= 0 for phase in fit["phases"].values())
+
+        first, second = runs[1]["phases"]["pagerank"], runs[2]["phases"]["pagerank"]
+        assert first["cached"] is False and second["cached"] is True
+        assert first["iterations"] == second["iterations"] > 0
+        assert first["residual"] < len(ar_graph.graph) * 1.0e-6
+
+    # profiling does not change the results
+    unprofiled = ar.Graph()
+    unprofiled.fit(documents=sample_data['documents'], engine="python")
+    assert ar_graph.top_authors() == unprofiled.top_authors()
+
+
+def test_save_load(sample_data, zero_division_data, tmp_path) -> None:
+    """
+    Test to ensure that a saved graph loads, with or without memory-mapping,
+    with the same authors, edges and scores, and can be updated further.
+    :param sample_data: the sample data
+    :param zero_division_data: the sample data that manifests a ZeroDivisionError
+    :param tmp_path: the pytest temporary directory fixture
+    :return: None
+    """
+
+    path = str(tmp_path / "graph.bin")
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=sample_data['documents'], keys=["last_name", "first_name"])
+    top = ar_graph.top_authors(n=100)
+    ar_graph.save(path)
+
+    for mmap in (True, False):
+        loaded = ar.Graph.load(path, mmap=mmap)
+        assert loaded.top_authors(n=100) == top
+        assert loaded.top_authors(n=100, alpha=0.5) == ar_graph.top_authors(n=100, alpha=0.5)
+        assert list(loaded._authors) == list(ar_graph._authors)
+        assert loaded.as_json() == ar_graph.as_json()
+        assert dict(loaded.graph.edges) == dict(ar_graph.graph.edges)
+
+    # saved scores are served without running PageRank
+    loaded = ar.Graph.load(path)
+    assert loaded._rank_cache and loaded._authors._encoded is not None
+    loaded.top_authors(n=3)
+    assert loaded._authors._encoded is not None
+
+    # a loaded graph can be updated like the graph it was saved from
+    loaded.partial_fit(documents=zero_division_data['documents'])
+    ar_graph.partial_fit(documents=zero_division_data['documents'])
+    assert loaded._keys == ["last_name", "first_name"]
+    assert loaded.top_authors(n=100) == ar_graph.top_authors(n=100)
+
+    # files which are not saved graphs are rejected
+    with open(path, "wb") as f:
+        f.write(b"not a graph" * 10)
+    with pytest.raises(ValueError):
+        ar.Graph.load(path)
+
+
+def test_write_json(sample_data) -> None:
+    """
+    Test to ensure that the streamed JSON export matches as_json, and that
+    scores and the top n subgraph are written as requested.
+    :param sample_data: the sample data
+    :return: None
+    """
+
+    ar_graph = ar.Graph()
+    f = io.StringIO()
+    ar_graph.write_json(f)
+    assert json.loads(f.getvalue()) == ar_graph.as_json()
+
+    ar_graph.fit(documents=sample_data['documents'])
+    f = io.StringIO()
+    ar_graph.write_json(f)
+    assert f.getvalue() == json.dumps(ar_graph.as_json())
+
+    # a subgraph of the top authors, with their normalized scores
+    top, scores = ar_graph.top_authors(n=3, normalize_scores=True)
+    f = io.StringIO()
+    ar_graph.write_json(f, scores=True, normalize_scores=True, n=3)
+    export = json.loads(f.getvalue())
+    assert [tuple(node["id"]) for node in export["nodes"]] == top
+    assert [node["score"] for node in export["nodes"]] == scores
+    expected = {
+        (u, v): w for u, v, w in ar_graph.graph.edges(data="weight") if u in top and v in top
+    }
+    assert {(tuple(link["source"]), tuple(link["target"])): link["weight"] for link in export["links"]} == expected
+
+    # graphs that are not fit, new or fit to a single author, are written empty, without scores
+    single = ar.Graph()
+    with pytest.warns(UserWarning):
+        single.fit(documents=[{"authors": [{"first_name": "Single", "last_name": "Author"}]}])
+    for unfit in (ar.Graph(), single):
+        f = io.StringIO()
+        with pytest.warns(UserWarning):
+            unfit.write_json(f, scores=True, n=3)
+        assert json.loads(f.getvalue()) == {"directed": True, "multigraph": False, "graph": {}, "nodes": [],
+                                            "links": []}
+
+
+def test_large_documents(sample_data, zero_division_data, tmp_path) -> None:
+    """
+    Test to ensure that large documents added as cliques result in the same
+    graph and scores as expanding them into pairs, and that sampling them
+    preserves the total weight of each author's edges.
+    :param sample_data: the sample data
+    :param zero_division_data: the sample data that manifests a ZeroDivisionError
+    :param tmp_path: the pytest temporary directory fixture
+    :return: None
+    """
+
+    # every document with more than two authors is large, one of which lists an author twice
+    docs = sample_data['documents'] + zero_division_data['documents']
+    docs = docs + [{"authors": docs[0]["authors"] + docs[0]["authors"][:1]}]
+
+    graphs = dict()
+    for policy in ar.graph.LARGE_DOCUMENT_POLICIES:
+        graphs[policy] = ar.Graph()
+        graphs[policy].fit(documents=docs, large_documents=policy, max_document_authors=2)
+    expanded, cliques, sampled = graphs["expand"], graphs["clique"], graphs["sample"]
+
+    assert len(cliques._clique_weights) > 0
+    edges = {(u, v): w for u, v, w in expanded.graph.edges(data="weight")}
+    clique_edges = {(u, v): w for u, v, w in cliques.graph.edges(data="weight")}
+    assert clique_edges.keys() == edges.keys()
+    assert all(clique_edges[e] == pytest.approx(w) for e, w in edges.items())
+    assert cliques.top_authors()[0] == expanded.top_authors()[0]
+    assert cliques.top_authors()[1] == pytest.approx(expanded.top_authors()[1])
+
+    # sampled edges keep the document counts and the out-weight of every author
+    assert sampled._counts.tolist() == expanded._counts.tolist()
+    assert np.asarray(sampled._weights().sum(axis=1)).ravel() == pytest.approx(
+        np.asarray(expanded._weights().sum(axis=1)).ravel()
+    )
+
+    # cliques are kept by partial_fit, save and load
+    incremental = ar.Graph()
+    incremental.fit(documents=docs[:2], large_documents="clique", max_document_authors=2)
+    incremental.partial_fit(documents=docs[2:])
+    path = str(tmp_path / "graph.bin")
+    incremental.save(path)
+    loaded = ar.Graph.load(path)
+    assert loaded.top_authors()[0] == cliques.top_authors()[0]
+    assert loaded.top_authors()[1] == pytest.approx(cliques.top_authors()[1])
+    f = io.StringIO()
+    loaded.write_json(f)
+    assert {(tuple(link["source"]), tuple(link["target"])) for link in json.loads(f.getvalue())["links"]} == set(edges)
+
+    with pytest.raises(ValueError):
+        ar.Graph().fit(documents=docs, large_documents="drop")
+    with pytest.raises(ValueError):
+        ar.Graph().fit(documents=docs, engine="python", large_documents="clique")
+
+
+def test_author_index(sample_data, zero_division_data) -> None:
+    """
+    Test to ensure that the ranks, scores and collaborators looked up from an
+    AuthorIndex match those of the graph, including for unknown authors.
+    :param sample_data: the sample data
+    :param zero_division_data: the sample data that manifests a ZeroDivisionError
+    :return: None
+    """
+
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=sample_data['documents'] + zero_division_data['documents'])
+    authors, scores = ar_graph.scores()
+    index = ar.AuthorIndex(ar_graph)
+
+    assert len(index) == len(authors)
+    assert [index.rank(a) for a in authors] == list(range(1, len(authors) + 1))
+    assert [index.score(a) for a in authors] == scores
+    unknown = ("Not", "An Author")
+    assert unknown not in index
+    assert index.ranks([authors[1], unknown]).tolist() == [2, 0]
+    assert index.scores([authors[0], unknown])[0] == scores[0]
+    assert np.isnan(index.scores([unknown])[0])
+    with pytest.raises(KeyError):
+        index.rank(unknown)
+
+    # collaborators are the author's out-edges, without the self-edge, strongest first
+    for author in authors:
+        collaborators, weights = index.collaborators(author, n=len(authors))
+        edges = {v: w for _, v, w in ar_graph.graph.out_edges(author, data="weight") if v != author}
+        assert set(collaborators) == set(edges)
+        assert weights == pytest.approx([edges[c] for c in collaborators])
+        assert weights == sorted(weights, reverse=True)
+        assert index.collaborators(author, n=2) == (collaborators[:2], weights[:2])
+    assert index.collaborators_many([authors[0], unknown], n=2) == [index.collaborators(authors[0], n=2), ([], [])]
+
+    with pytest.warns(UserWarning):
+        assert len(ar.AuthorIndex(ar.Graph())) == 0
+
+
+def test_name_index() -> None:
+    """
+    Test to ensure that authors are found by the prefix of any word of their
+    normalized name and by fuzzy matching, ordered by score.
+    :return: None
+    """
+
+    docs = [
+        {"authors": [{"first_name": "José", "last_name": "O'Brien"}, {"first_name": "Kyle", "last_name": "Hundman"}]},
+        {"authors": [{"first_name": "Kyle", "last_name": "Hundman"}, {"first_name": "Kylie", "last_name": "Smith"}]},
+        {"authors": [{"first_name": "Kyle", "last_name": "Hundman"}, {"first_name": "Jo", "last_name": "Brien"}]},
+    ]
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=docs, keys=["first_name", "last_name"])
+    scores = dict(zip(*ar_graph.scores()))
+    names = ar.NameIndex(ar_graph)
+
+    assert ar.utils.normalize_name(("José", "O'Brien")) == "jose o brien"
+    assert names.search("KYL") == (
+        [("Kyle", "Hundman"), ("Kylie", "Smith")], [scores[("Kyle", "Hundman")], scores[("Kylie", "Smith")]]
+    )
+    assert set(names.search("brien")[0]) == {("Jo", "Brien"), ("José", "O'Brien")}
+    assert names.search("jose o'b")[0] == [("José", "O'Brien")]
+    assert names.search("kyle hundman", n=1)[0] == [("Kyle", "Hundman")]
+    assert names.search("smith kylie") == ([], [])
+    assert names.search("  ") == ([], [])
+
+    authors, author_scores, similarities = names.fuzzy_search("Hundmann, Kyle")
+    assert authors[0] == ("Kyle", "Hundman")
+    assert author_scores[0] == scores[("Kyle", "Hundman")]
+    assert similarities == sorted(similarities, reverse=True) and similarities[0] < 1.
+    assert names.fuzzy_search("kyle hundman")[2][0] == 1.
+    assert names.fuzzy_search("zzz") == ([], [], [])
+
+
+def test_sliding_windows(sample_data, zero_division_data) -> None:
+    """
+    Test to ensure that removing documents results in the same graph as
+    fitting the remaining documents, and that the top authors of each sliding
+    window match those of a graph fit on the documents of the window.
+    :param sample_data: the sample data
+    :param zero_division_data: the sample data that manifests a ZeroDivisionError
+    :return: None
+    """
+
+    docs = sample_data['documents'] + zero_division_data['documents']
+    docs = docs + [{"authors": docs[0]["authors"] + docs[1]["authors"]}]
+
+    for policy in ar.graph.LARGE_DOCUMENT_POLICIES:
+        remaining = ar.Graph()
+        remaining.fit(documents=docs[3:], large_documents=policy, max_document_authors=2)
+        ar_graph = ar.Graph()
+        ar_graph.fit(documents=docs, large_documents=policy, max_document_authors=2)
+        ar_graph.top_authors()
+        ar_graph.remove_documents(documents=docs[:3])
+
+        edges = {(u, v): w for u, v, w in remaining.graph.edges(data="weight")}
+        assert {(u, v) for u, v in ar_graph.graph.edges} == edges.keys()
+        assert all(w == pytest.approx(edges[(u, v)]) for u, v, w in ar_graph.graph.edges(data="weight"))
+        assert set(ar_graph._authors) == set(remaining._authors)
+        assert dict(zip(*ar_graph.scores())) == pytest.approx(dict(zip(*remaining.scores())))
+
+    with pytest.raises(ValueError):
+        ar_graph.remove_documents(documents=docs[:3])
+
+    # each window matches a graph fit from scratch on its documents
+    dated = [dict(doc, year=2000 + i // 2) for i, doc in enumerate(docs)]
+    windows = list(ar.sliding_windows(dated, "year", window=2, step=1, n=50, warm_start=False))
+    assert [(start, end) for start, end, _, _ in windows] == [(1999 + i, 2001 + i) for i in range(len(docs) // 2)]
+    for start, end, authors, scores in windows:
+        window = ar.Graph()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            window.fit(documents=[doc for doc in dated if start <= doc["year"] < end])
+        expected = window.top_authors(n=50) if window._is_fit else ([], [])
+        assert dict(zip(authors, scores)) == pytest.approx(dict(zip(*expected)))
+
+    with pytest.raises(ValueError):
+        list(ar.sliding_windows(dated[::-1], "year", window=2))
+    with pytest.raises(ValueError):
+        list(ar.sliding_windows(dated, "year", window=3, step=2))
+
+
+def test_remove_documents_invalid() -> None:
+    """
+    Test to ensure that a built NetworkX graph loses the edges of removed
+    documents even when the remaining graph is not fit, and that documents
+    that were never added are rejected without changing the graph, even if
+    all of their authors are in the graph.
+    :return: None
+    """
+
+    def document(*names: str) -> dict:
+        return {"authors": [{"first_name": name, "last_name": "A"} for name in names]}
+
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=[document("a", "b"), document("c")])
+    assert ("a", "A") in ar_graph.graph
+    with pytest.warns(UserWarning):
+        ar_graph.remove_documents([document("a", "b")])
+    assert not ar_graph._is_fit
+    assert ar_graph.graph.number_of_edges() == 0
+    ar_graph.partial_fit([document("d", "e")])
+    expected = ar.Graph()
+    expected.fit(documents=[document("c"), document("d", "e")])
+    assert set(ar_graph.graph.edges) == set(expected.graph.edges)
+    assert (("a", "A"), ("b", "A")) not in ar_graph.graph.edges
+
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=[document("a", "b"), document("a", "c"), document("b", "d"), document("c", "d")])
+    top = ar_graph.top_authors()
+    matrix = ar_graph._matrix.copy()
+    with pytest.raises(ValueError):
+        ar_graph.remove_documents([document("b", "c")])
+    assert (ar_graph._matrix != matrix).nnz == 0
+    assert ar_graph.top_authors() == top
+
+
+def test_batch_top_authors(sample_data, zero_division_data) -> None:
+    """
+    Test to ensure that the top authors of each subset scored in a batch
+    match those of a graph fit on the subset, and that block PageRank
+    matches PageRank on each block.
+    :param sample_data: the sample data
+    :param zero_division_data: the sample data that manifests a ZeroDivisionError
+    :return: None
+    """
+
+    docs = sample_data['documents'] + zero_division_data['documents']
+    rng = random.Random(3)
+    subsets = [rng.sample(range(len(docs)), rng.randint(2, len(docs))) for _ in range(20)] + [[0], [], range(len(docs))]
+
+    for max_pairs in [ar.graph.CHUNK_PAIRS, 10]:
+        with pytest.warns(UserWarning):
+            results = ar.batch_top_authors(docs, subsets, n=50, max_pairs=max_pairs)
+        assert len(results) == len(subsets)
+        for subset, (authors, scores) in zip(subsets, results):
+            ar_graph = ar.Graph()
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                ar_graph.fit(documents=[docs[i] for i in subset])
+            expected = ar_graph.top_authors(n=50) if ar_graph._is_fit and len(subset) > 0 else ([], [])
+            assert authors == expected[0]
+            assert scores == pytest.approx(expected[1])
+    assert ar.batch_top_authors(docs, [range(len(docs))], n=3, normalize_scores=True)[0][1][0] == 1.
+
+    matrices = [ar.score.adjacency_matrix(nx.gnp_random_graph(k, .3, seed=k, directed=True))[0] for k in [2, 5, 1, 8]]
+    blocks = np.concatenate([[0], np.cumsum([m.shape[0] for m in matrices])])
+    rank = ar.score.block_pagerank(sparse.block_diag(matrices), blocks)
+    for b, m in enumerate(matrices):
+        assert rank[blocks[b]:blocks[b + 1]] == pytest.approx(ar.score.pagerank(m))
+
+
+def test_personalized_top_authors(sample_data, zero_division_data) -> None:
+    """
+    Test to ensure that personalizations scored together match those scored
+    one at a time, and that their scores are cached.
+    :param sample_data: the sample data
+    :param zero_division_data: the sample data that manifests a ZeroDivisionError
+    :return: None
+    """
+
+    docs = sample_data['documents'] + zero_division_data['documents']
+    for policy in ["expand", "clique"]:
+        ar_graph = ar.Graph()
+        ar_graph.fit(documents=docs, large_documents=policy, max_document_authors=2)
+        authors = ar_graph.scores()[0]
+        personalizations = [[authors[0]], {authors[1]: 2., authors[-1]: 1.}, [authors[0], authors[2]], [authors[0]]]
+
+        with pytest.warns(UserWarning):
+            results = ar_graph.personalized_top_authors(personalizations + [[("Not", "An Author")]], n=20)
+        assert results[-1] == ([], [])
+        assert results[0] == results[3]
+
+        single = ar.Graph()
+        single.fit(documents=docs, large_documents=policy, max_document_authors=2)
+        for personalization, (top, scores) in zip(personalizations, results):
+            if not isinstance(personalization, dict):
+                personalization = dict.fromkeys(personalization, 1.)
+            expected = single.top_authors(n=20, personalization=personalization)
+            assert top == expected[0]
+            assert scores == pytest.approx(expected[1])
+            # the scores are served from the cache
+            assert ar_graph.top_authors(n=20, personalization=personalization) == (top, scores)
+
+    matrix = ar.score.adjacency_matrix(nx.gnp_random_graph(12, .2, seed=5, directed=True))[0]
+    p = np.random.RandomState(0).rand(12, 3)
+    rank = ar.score.pagerank_many(matrix, p)
+    for column in range(3):
+        assert rank[:, column] == pytest.approx(ar.score.pagerank(matrix, personalization=p[:, column]))
+
+
+def test_ranking_service(sample_data, zero_division_data, tmp_path) -> None:
+    """
+    Test to ensure that the ranking service returns the results of the served
+    graph, coalesces identical concurrent requests and swaps graphs while
+    requests in progress finish with the previous graph.
+    :param sample_data: the sample data
+    :param zero_division_data: the sample data that manifests a ZeroDivisionError
+    :param tmp_path: the pytest temporary directory fixture
+    :return: None
+    """
+
+    docs = sample_data['documents'] + zero_division_data['documents']
+    expected = ar.Graph()
+    expected.fit(documents=docs)
+    authors = expected.scores()[0]
+    personalizations = [{authors[0]: 1.}, {authors[1]: 1., authors[2]: 2.}]
+    small = ar.Graph()
+    small.fit(documents=sample_data['documents'])
+    path = str(tmp_path / "graph.bin")
+    small.save(path)
+
+    async def requests() -> None:
+        ranking_service = ar.RankingService()
+        with pytest.raises(RuntimeError):
+            await ranking_service.top_authors()
+        await ranking_service.fit(docs)
+
+        calls = list()
+        top_authors = ranking_service.graph.top_authors
+        ranking_service.graph.top_authors = lambda **kwargs: calls.append(kwargs) or top_authors(**kwargs)
+        results = await asyncio.gather(*[ranking_service.top_authors(n=5) for _ in range(10)])
+        assert len(calls) == 1
+        assert all(result == expected.top_authors(n=5) for result in results)
+        # the sorted ranking is served from the cache
+        assert await ranking_service.top_authors(n=3) == expected.top_authors(n=3)
+        assert len(calls) == 1
+
+        results = await asyncio.gather(*[ranking_service.top_authors(n=5, personalization=p)
+                                         for p in personalizations * 3])
+        for p, (top, scores) in zip(personalizations * 3, results):
+            assert top == expected.top_authors(n=5, personalization=p)[0]
+            assert scores == pytest.approx(expected.top_authors(n=5, personalization=p)[1])
+        assert await ranking_service.scores() == expected.scores()
+
+        # a request in progress finishes with the graph it started with
+        in_progress = asyncio.ensure_future(ranking_service.top_authors(n=100, alpha=.5))
+        await ranking_service.load(path)
+        assert await in_progress == expected.top_authors(n=100, alpha=.5)
+        assert await ranking_service.top_authors(n=100) == small.top_authors(n=100)
+
+    asyncio.run(requests())
+
+
+def test_lazy_imports(sample_data, tmp_path) -> None:
+    """
+    Test to ensure that importing AuthorRank does not import its submodules
+    or their dependencies, and that loading a saved graph and scoring it
+    does not import NetworkX.
+    :param sample_data: the sample data fixture
+    :param tmp_path: the pytest temporary directory fixture
+    :return: None
+    """
+
+    path = str(tmp_path / "graph.bin")
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=sample_data["documents"])
+    ar_graph.save(path)
+
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(ar.__file__))))
+    report = "; import json, sys; print(json.dumps(sorted(m for m in sys.modules if m.split('.')[0] in %r)))" % (
+        ["author_rank", "networkx", "numpy", "python_utils", "scipy"],
+    )
+
+    def loaded(code: str) -> list:
+        output = subprocess.run([sys.executable, "-c", code + report], env=env, check=True,
+                                stdout=subprocess.PIPE, universal_newlines=True).stdout
+        return json.loads(output)
+
+    assert loaded("import author_rank") == ["author_rank"]
+
+    modules = loaded("import author_rank; author_rank.Graph.load(%r).top_authors()" % path)
+    assert "author_rank.graph" in modules and "scipy" in modules
+    assert not any(m.split(".")[0] in {"networkx", "python_utils"} for m in modules)
+
+    # nor does fitting a graph without building its NetworkX graph
+    modules = loaded("import author_rank; g = author_rank.Graph(); g.fit(author_rank.read_documents(%r), "
+                     "build_graph=False); g.top_authors()" % os.path.abspath("data/author_network.json"))
+    assert "networkx" not in modules
+
+    # names and submodules are still available from the package
+    assert ar.Graph is ar.graph.Graph
+    assert ar.sliding_windows is ar.window.sliding_windows
+    assert "RankingService" in dir(ar) and "RankingService" in ar.__all__
+    with pytest.raises(AttributeError):
+        ar.missing
+
+
+def test_cli(sample_data, tmp_path, capsys) -> None:
+    """
+    Test the author-rank command-line entry point, which streams documents
+    from a file and writes the top authors, the graph and a report of the run.
+    :param sample_data: the sample data fixture
+    :param tmp_path: the pytest temporary directory fixture
+    :param capsys: the pytest fixture that captures stdout and stderr
+    :return: None
+    """
+
+    from author_rank.cli import main
+
+    path = str(tmp_path / "documents.jsonl")
+    with open(path, "w") as f:
+        for document in sample_data["documents"]:
+            f.write(json.dumps(document) + "\n")
+
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=sample_data["documents"], keys=["first_name", "last_name"])
+    top = ar_graph.top_authors(n=3)
+
+    # top authors to stdout as a JSON array, and timings and memory to stderr
+    assert main(["data/author_network.json", "-n", "3"]) == 0
+    out, err = capsys.readouterr()
+    assert [tuple(r["author"]) for r in json.loads(out)] == top[0]
+    assert [r["score"] for r in json.loads(out)] == pytest.approx(top[1])
+    assert "fit" in err and "top_authors" in err
+
+    # JSON Lines in and out, with the graph and a report
+    output, graph, report = str(tmp_path / "top.jsonl"), str(tmp_path / "graph.bin"), str(tmp_path / "report.json")
+    assert main([path, "-n", "3", "-o", output, "--graph", graph, "--report", report, "--quiet"]) == 0
+    assert capsys.readouterr() == ("", "")
+    with open(output, "r") as f:
+        assert [tuple(json.loads(line)["author"]) for line in f] == top[0]
+    assert ar.Graph.load(graph).top_authors(n=3)[0] == top[0]
+    with open(report, "r") as f:
+        runs = json.load(f)["runs"]
+    assert [run["operation"] for run in runs] == ["fit", "top_authors", "write_top", "write_graph"]
+    assert "expand_pairs" in runs[0]["phases"]
+
+    # the graph as streamed JSON, with the python engine
+    graph = str(tmp_path / "graph.json")
+    assert main([path, "--engine", "python", "--graph", graph, "--graph-format", "json", "-q"]) == 0
+    capsys.readouterr()
+    with open(graph, "r") as f:
+        assert json.load(f) == json.loads(json.dumps(ar_graph.as_json()))
+
+    # the progress bar ends its line once, whether or not the graph is fit
+    assert main([path, "-n", "3", "--progress-bar"]) == 0
+    err = capsys.readouterr()[1]
+    assert "\n\n" not in err and err.split("\n")[1].startswith("fit")
+    single = str(tmp_path / "single.jsonl")
+    with open(single, "w") as f:
+        f.write(json.dumps({"authors": [{"first_name": "Valentino", "last_name": "Constantinou"}]}) + "\n")
+    with pytest.warns(UserWarning):
+        assert main([single, "--progress-bar"]) == 1
+    assert capsys.readouterr()[1].split("\n")[1].startswith("fit")
+
+    with pytest.raises(SystemExit):
+        main([path, "--engine", "python", "--n-jobs", "2"])
+
+
+def test_hashed_author_table(sample_data, zero_division_data, tmp_path, monkeypatch) -> None:
+    """
+    Test that graphs fit with hash_uids, which keeps author UIDs in a
+    HashedAuthorTable, score, update, save and load as graphs fit without it,
+    and that UIDs whose 64-bit keys collide are told apart.
+    :param sample_data: the sample data fixture
+    :param zero_division_data: the zero division data fixture
+    :param tmp_path: the pytest temporary directory fixture
+    :param monkeypatch: the pytest fixture that patches attributes
+    :return: None
+    """
+
+    documents = sample_data["documents"]
+    expected = ar.Graph()
+    expected.fit(documents=documents[:4])
+    expected.partial_fit(documents=documents[4:])
+    top = expected.top_authors(n=20)
+    seed = {top[0][-1]: 1.}
+
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=documents[:4], hash_uids=True)
+    ar_graph.partial_fit(documents=documents[4:])
+    assert isinstance(ar_graph._authors, ar.HashedAuthorTable)
+    assert ar_graph.top_authors(n=20) == top
+    assert ar_graph.top_authors(n=5, personalization=seed) == expected.top_authors(n=5, personalization=seed)
+    edges = {(u, v): w for u, v, w in ar_graph.graph.edges(data="weight")}
+    assert edges == pytest.approx({(u, v): w for u, v, w in expected.graph.edges(data="weight")})
+
+    path = str(tmp_path / "graph.bin")
+    ar_graph.save(path)
+    loaded = ar.Graph.load(path)
+    assert isinstance(loaded._authors, ar.HashedAuthorTable)
+    assert loaded.top_authors(n=20) == top
+    loaded.remove_documents(documents[4:])
+    expected.remove_documents(documents[4:])
+    assert loaded.top_authors(n=20) == expected.top_authors(n=20)
+
+    with pytest.raises(ValueError):
+        ar.Graph().fit(documents=documents, engine="python", hash_uids=True)
+
+    # with keys of 3 bits, most UIDs collide with an earlier one
+    monkeypatch.setattr(ar.authors, "_uid_key", lambda encoded: zlib.crc32(encoded) % 8)
+    table, reference = ar.HashedAuthorTable(), ar.AuthorTable()
+    uids = [tuple(a[k] for k in ("first_name", "last_name")) for d in zero_division_data["documents"] for a in
+            d["authors"]] + [(str(i), "Author") for i in range(100)]
+    assert table.intern_many(uids).tolist() == reference.intern_many(uids).tolist()
+    assert len(table._overflow) > 0
+    assert list(table) == list(reference)
+    reverse = list(reversed(list(reference)))
+    assert table.ids(reverse).tolist() == reference.ids(reverse).tolist()
+    assert ("Not", "Author") not in table
+    subset = table.subset([3, 1, 50])
+    assert [subset.get(reference[i]) for i in (3, 1, 50)] == [0, 1, 2]
+    assert ar.HashedAuthorTable.from_encoded(*table.encode()).get(reference[60]) == 60
+
+
+def test_build_graph(sample_data) -> None:
+    """
+    Test that a graph fit with build_graph=False scores from its sparse
+    adjacency without building a NetworkX graph, which is built with the
+    same edges when the graph attribute is first accessed and is then kept
+    up to date by partial_fit.
+    :param sample_data: the sample data fixture
+    :return: None
+    """
+
+    documents = sample_data["documents"]
+
+    for engine in ar.graph.ENGINES:
+        expected = ar.Graph()
+        expected_graph = expected.fit(documents=documents, engine=engine)
+        assert isinstance(expected_graph, nx.DiGraph)
+
+        ar_graph = ar.Graph()
+        assert ar_graph.fit(documents=documents, engine=engine, build_graph=False) is None
+        assert ar_graph._graph is None
+        assert ar_graph.top_authors(n=20) == expected.top_authors(n=20)
+        assert ar_graph.as_json() == expected.as_json()
+        assert ar_graph._graph is None
+
+        # the graph is built on first access, with the nodes and edges of a graph built by fit
+        assert list(ar_graph.graph.nodes) == list(expected_graph.nodes)
+        assert list(ar_graph.graph.edges(data="weight")) == pytest.approx(list(expected_graph.edges(data="weight")))
+
+    # a built graph is updated by partial_fit, whether or not it returns the graph
+    expected = ar.Graph()
+    expected.fit(documents=documents)
+    ar_graph = ar.Graph()
+    ar_graph.fit(documents=documents[:3], build_graph=False)
+    graph = ar_graph.graph
+    assert ar_graph.partial_fit(documents=documents[3:], build_graph=False) is None
+    assert ar_graph.graph is graph
+    edges = {(u, v): w for u, v, w in graph.edges(data="weight")}
+    assert edges == pytest.approx({(u, v): w for u, v, w in expected.graph.edges(data="weight")})
+
+    # assigning the graph replaces the view, and None has it built again
+    top = ar_graph.top_authors(n=20)
+    ar_graph.graph = nx.DiGraph()
+    assert ar_graph.graph.number_of_edges() == 0
+    assert ar_graph.top_authors(n=20) == top
+    ar_graph.graph = None
+    assert list(ar_graph.graph.edges) == list(graph.edges)